@@ -0,0 +1,17 @@
+"""
+ASGI entry point: the async telemetry ingest routes in front of the Flask app.
+
+    uvicorn asgi:app --host 0.0.0.0 --port 8000 --workers 4
+
+POST /api/telemetry and /api/telemetry/batch are served on the event loop
+(see backend/app/async_ingest.py); every other request is passed to the
+Flask app, which runs in a thread pool.
+"""
+
+from asgiref.wsgi import WsgiToAsgi
+
+from backend.app import create_app
+from backend.app.async_ingest import AsyncIngestApp
+
+flask_app = create_app()
+app = AsyncIngestApp(flask_app, fallback=WsgiToAsgi(flask_app))
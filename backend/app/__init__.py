@@ -1,15 +1,30 @@
 from flask import Flask, jsonify
-from flasgger import Swagger
 
+from .archive import init_archive
+from .bootstrap import bootstrap_database
+from .cache import init_response_cache
+from .cli import register_commands
+from .compression import init_compression
 from .config import Config
+from .docs import init_frozen_docs
 from .extensions import db
+from .ingest_buffer import init_ingest_buffer
+from .json_provider import init_json_provider
+from .partitions import init_partitioning
 from .routes import api_bp
-from .models import Company
+from .pool import init_pool
+from .positions import init_position_cache
+from .refdata import init_reference_data
+from .schema import check_indexes
+from .startup import init_startup_timer
+from .versions import init_version_store
 
 
 def create_app(config_class: type[Config] = Config) -> Flask:
     app = Flask(__name__)
     app.config.from_object(config_class)
+    timer = init_startup_timer(app)
+    init_json_provider(app)
 
 
     app.config.setdefault(
@@ -33,20 +48,41 @@ def create_app(config_class: type[Config] = Config) -> Flask:
     }
 
  
+    init_pool(app)
     db.init_app(app)
+    init_partitioning(app)
     print("SQLALCHEMY_DATABASE_URI =", app.config.get("SQLALCHEMY_DATABASE_URI"))
 
 
-    with app.app_context():
-        db.create_all()
-        if not Company.query.first():
-            default_company = Company(name="Default company")
-            db.session.add(default_company)
-            db.session.commit()
-            print("Created default company with id", default_company.id)
+    init_version_store(app)
+    init_reference_data(app)
+
+    # Schema bootstrap is `flask init-db`, run once per deploy.
+    if app.config["DB_BOOTSTRAP_ON_STARTUP"]:
+        with timer.phase("bootstrap"), app.app_context():
+            for line in bootstrap_database():
+                print(line)
+
+    if app.config["CHECK_INDEXES_ON_STARTUP"]:
+        with timer.phase("check_indexes"), app.app_context():
+            for problem in check_indexes(db.engine, db.metadata):
+                app.logger.warning("Index check: %s", problem)
 
     # Swagger
-    Swagger(app, template=swagger_template)
+    if app.config["DOCS_ENABLED"]:
+        with timer.phase("docs"):
+            if init_frozen_docs(app) is None:
+                from flasgger import Swagger
+
+                Swagger(app, template=swagger_template)
+
+    init_response_cache(app)
+    init_compression(app)
+    init_ingest_buffer(app)
+    init_archive(app)
+    with timer.phase("position_cache"):
+        init_position_cache(app)
+    register_commands(app)
 
     # API
     app.register_blueprint(api_bp, url_prefix="/api")
@@ -57,9 +93,10 @@ def create_app(config_class: type[Config] = Config) -> Flask:
             {
                 "status": "ok",
                 "message": "Mining backend is running",
-                "docs_url": "/api/docs/",
+                "docs_url": "/api/docs/" if app.config["DOCS_ENABLED"] else None,
                 "api_root": "/api",
             }
         )
 
+    timer.finish()
     return app
@@ -0,0 +1,81 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Integer, cast, func, literal, select, text
+
+from .extensions import db
+from .models import TelematicsReading
+
+BUCKETS = {"1m": 60, "5m": 300, "1h": 3600}
+
+
+def bucket_start(column, seconds: int):
+    """SQL expression flooring a DATETIME column to a bucket, in epoch seconds."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "sqlite":
+        epoch = cast(func.strftime("%s", column), Integer)
+    elif dialect in ("mysql", "mariadb"):
+        # TIMESTAMPDIFF, unlike UNIX_TIMESTAMP, ignores the session time zone.
+        epoch = func.timestampdiff(
+            text("SECOND"), literal("1970-01-01 00:00:00"), column, type_=Integer
+        )
+    else:
+        epoch = cast(func.extract("epoch", column), Integer)
+    return (epoch // seconds) * seconds
+
+
+def from_epoch(seconds: int) -> datetime:
+    return datetime.fromtimestamp(int(seconds), timezone.utc).replace(tzinfo=None)
+
+
+def speed_buckets(vehicle_id: int, seconds: int, since: datetime, until: datetime):
+    """
+    Downsample one vehicle's readings in ``[since, until)`` into time buckets.
+
+    Each returned row carries ``bucket`` (epoch seconds), ``count``,
+    ``speed_min``, ``speed_max``, ``speed_avg`` and the speed, position and
+    timestamp of the last reading in the bucket. Everything is computed by
+    the database; no ORM objects are built.
+    """
+    reading = TelematicsReading
+    bucket = bucket_start(reading.timestamp, seconds)
+    ranked = (
+        select(
+            bucket.label("bucket"),
+            func.count(reading.id).over(partition_by=bucket).label("count"),
+            func.min(reading.speed_kmh).over(partition_by=bucket).label("speed_min"),
+            func.max(reading.speed_kmh).over(partition_by=bucket).label("speed_max"),
+            func.avg(reading.speed_kmh).over(partition_by=bucket).label("speed_avg"),
+            reading.speed_kmh.label("speed_last"),
+            reading.latitude,
+            reading.longitude,
+            reading.timestamp.label("last_timestamp"),
+            func.row_number()
+            .over(
+                partition_by=bucket,
+                order_by=(reading.timestamp.desc(), reading.id.desc()),
+            )
+            .label("position"),
+        )
+        .where(
+            reading.vehicle_id == vehicle_id,
+            reading.timestamp >= since,
+            reading.timestamp < until,
+        )
+        .subquery()
+    )
+    stmt = (
+        select(
+            ranked.c.bucket,
+            ranked.c.count,
+            ranked.c.speed_min,
+            ranked.c.speed_max,
+            ranked.c.speed_avg,
+            ranked.c.speed_last,
+            ranked.c.latitude,
+            ranked.c.longitude,
+            ranked.c.last_timestamp,
+        )
+        .where(ranked.c.position == 1)
+        .order_by(ranked.c.bucket)
+    )
+    return db.session.execute(stmt).all()
@@ -0,0 +1,375 @@
+"""
+Cold-tier archive of old telemetry readings as Parquet files.
+
+``archive_readings`` moves readings older than a cutoff out of
+``telematics_readings`` into ``<TELEMETRY_ARCHIVE_DIR>/vehicle_id=<id>/
+month=<YYYY-MM>/part-<first id>-<last id>.parquet`` (zstd compressed) and
+records the cutoff as the archive watermark. ``TelemetryArchive`` reads
+them back so that the telemetry list endpoint can fall through to the
+archive when a page reaches past the watermark.
+
+Requires pyarrow; without it archiving is unavailable and reads only see
+the hot table.
+"""
+
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import and_, delete, select
+
+from .compression import decompress_payload
+from .extensions import db
+from .models import TelematicsReading, TelematicsReadingPayload
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # optional, enables the archive
+    pyarrow = None
+
+WATERMARK_FILE = "ARCHIVED_UNTIL"
+DELETE_CHUNK_SIZE = 1000
+
+
+def _schema():
+    return pyarrow.schema(
+        [
+            ("id", pyarrow.int64()),
+            ("vehicle_id", pyarrow.int64()),
+            ("driver_id", pyarrow.int64()),
+            ("shift_id", pyarrow.int64()),
+            ("timestamp", pyarrow.timestamp("us")),
+            ("latitude", pyarrow.float64()),
+            ("longitude", pyarrow.float64()),
+            ("speed_kmh", pyarrow.float64()),
+            ("driver_health_status_id", pyarrow.int64()),
+            ("raw_payload", pyarrow.string()),
+        ]
+    )
+
+
+def _month(timestamp: datetime) -> str:
+    return f"{timestamp:%Y-%m}"
+
+
+def _vehicle_dir(root: str, vehicle_id: int) -> str:
+    return os.path.join(root, f"vehicle_id={vehicle_id}")
+
+
+def read_watermark(root: str) -> datetime | None:
+    try:
+        with open(os.path.join(root, WATERMARK_FILE), encoding="utf-8") as fh:
+            return datetime.fromisoformat(fh.read().strip())
+    except FileNotFoundError:
+        return None
+
+
+def _write_atomic(path: str, write) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial = f"{path}.partial"
+    write(partial)
+    os.replace(partial, path)
+
+
+def _write_text(path: str, value: str) -> None:
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write(value)
+
+
+def _write_watermark(root: str, watermark: datetime) -> None:
+    _write_atomic(
+        os.path.join(root, WATERMARK_FILE),
+        lambda target: _write_text(target, watermark.isoformat()),
+    )
+
+
+def _write_group(root: str, vehicle_id: int, month: str, rows: list[dict]) -> str:
+    path = os.path.join(
+        _vehicle_dir(root, vehicle_id),
+        f"month={month}",
+        f"part-{rows[0]['id']}-{rows[-1]['id']}.parquet",
+    )
+    table = pyarrow.Table.from_pylist(rows, schema=_schema())
+    _write_atomic(
+        path,
+        lambda target: pyarrow.parquet.write_table(table, target, compression="zstd"),
+    )
+    return path
+
+
+def archive_readings(root: str, before: datetime, batch_size: int) -> dict:
+    """
+    Move readings with ``timestamp < before`` into the archive, one batch of
+    ``batch_size`` rows per transaction, inside an app context.
+
+    Files are written before their rows are deleted. A batch interrupted in
+    between is archived again by the next run under the same file name, and
+    readers drop duplicate ids, so no reading is lost or served twice.
+
+    A run that wrote files rewrites the watermark file at the end, which
+    tells readers to rebuild their file indexes.
+    """
+    if pyarrow is None:
+        raise RuntimeError("archiving telemetry requires pyarrow")
+    watermark = read_watermark(root)
+    if watermark is None or before > watermark:
+        # Readers look in the archive below the watermark, so raise it first.
+        watermark = before
+        _write_watermark(root, watermark)
+
+    table = TelematicsReading.__table__
+    payloads = TelematicsReadingPayload.__table__
+    columns = [table.c[name] for name in _schema().names if name != "raw_payload"]
+    rows_moved = 0
+    files = 0
+    while True:
+        rows = []
+        for row in db.session.execute(
+            select(*columns, payloads.c.codec, payloads.c.data)
+            .outerjoin(
+                payloads,
+                and_(
+                    payloads.c.reading_id == table.c.id,
+                    payloads.c.timestamp == table.c.timestamp,
+                ),
+            )
+            .where(table.c.timestamp < before)
+            .order_by(table.c.id)
+            .limit(batch_size)
+        ):
+            row = row._asdict()
+            codec, data = row.pop("codec"), row.pop("data")
+            row["raw_payload"] = (
+                decompress_payload(codec, data) if codec is not None else None
+            )
+            rows.append(row)
+        if not rows:
+            break
+
+        groups = defaultdict(list)
+        for row in rows:
+            groups[row["vehicle_id"], _month(row["timestamp"])].append(row)
+        for (vehicle_id, month), group in groups.items():
+            _write_group(root, vehicle_id, month, group)
+        files += len(groups)
+
+        ids = [row["id"] for row in rows]
+        for start in range(0, len(ids), DELETE_CHUNK_SIZE):
+            chunk = ids[start : start + DELETE_CHUNK_SIZE]
+            db.session.execute(
+                delete(payloads).where(
+                    payloads.c.reading_id.in_(chunk), payloads.c.timestamp < before
+                )
+            )
+            db.session.execute(delete(table).where(table.c.id.in_(chunk)))
+        db.session.commit()
+        rows_moved += len(rows)
+    if files:
+        _write_watermark(root, watermark)
+    return {"rows": rows_moved, "files": files, "archived_until": before}
+
+
+class TelemetryArchive:
+    """Reads archived readings of one vehicle back, month by month."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+        self._watermark = None
+        self._watermark_version = None
+        self._files = {}
+        self._files_version = None
+
+    def _version(self) -> tuple[int, int] | None:
+        # archive_readings replaces the watermark file after every run that
+        # wrote files, so its identity versions the archive's contents.
+        try:
+            stat = os.stat(os.path.join(self.root, WATERMARK_FILE))
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_ino
+
+    def watermark(self) -> datetime | None:
+        """Every reading older than this is in the archive, if any is set."""
+        version = self._version()
+        if version is None:
+            return None
+        with self._lock:
+            if version != self._watermark_version:
+                self._watermark = read_watermark(self.root)
+                self._watermark_version = version
+            return self._watermark
+
+    def _months(self, vehicle_id: int, newest_first: bool) -> list[tuple[str, str]]:
+        vehicle_dir = _vehicle_dir(self.root, vehicle_id)
+        try:
+            names = os.listdir(vehicle_dir)
+        except FileNotFoundError:
+            return []
+        months = sorted(
+            (name.partition("=")[2], os.path.join(vehicle_dir, name))
+            for name in names
+            if name.startswith("month=")
+        )
+        return months[::-1] if newest_first else months
+
+    def _read_month(self, path: str, columns: list[str], filters) -> list[dict]:
+        rows = []
+        for name in sorted(os.listdir(path)):
+            if name.endswith(".parquet"):
+                rows.extend(self._read_file(os.path.join(path, name), columns, filters))
+        return rows
+
+    def _read_file(self, path: str, columns: list[str], filters) -> list[dict]:
+        table = pyarrow.parquet.read_table(
+            path, columns=columns, filters=filters or None
+        )
+        return table.to_pylist()
+
+    def _list_files(self, vehicle_id: int) -> list[tuple[int, int, str]]:
+        files = []
+        for _, path in self._months(vehicle_id, newest_first=False):
+            for name in os.listdir(path):
+                if not (name.startswith("part-") and name.endswith(".parquet")):
+                    continue
+                first, _, last = name[len("part-") : -len(".parquet")].partition("-")
+                files.append((int(first), int(last), os.path.join(path, name)))
+        return sorted(files)
+
+    def _file_index(self, vehicle_id: int) -> list[tuple[int, int, str]]:
+        """
+        ``(first id, last id, path)`` of every archived file of the vehicle,
+        listed once per archive version rather than on every poll.
+        """
+        version = self._version()
+        with self._lock:
+            if version != self._files_version:
+                self._files = {}
+                self._files_version = version
+            files = self._files.get(vehicle_id)
+        if files is None:
+            files = self._list_files(vehicle_id)
+            with self._lock:
+                if version == self._files_version:
+                    self._files[vehicle_id] = files
+        return files
+
+    def _files_after(self, vehicle_id: int, after: int) -> list[tuple[int, str]]:
+        """``(first id, path)`` of the files holding ids above ``after``."""
+        return [
+            (first, path)
+            for first, last, path in self._file_index(vehicle_id)
+            if last > after
+        ]
+
+    def readings(
+        self,
+        vehicle_id: int,
+        columns: list[str],
+        count: int,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        before: tuple | None = None,
+        after: int | None = None,
+    ) -> list[dict]:
+        """
+        Up to ``count`` archived readings with ``since <= timestamp < until``
+        and ``(timestamp, id)`` below ``before``, newest first; or, when
+        ``after`` is given, those with an id above it in id order, as the
+        list endpoint orders them. Whole months (files, for ``after``) are
+        read in that order until enough rows have been found.
+        """
+        filters = []
+        if since is not None:
+            filters.append(("timestamp", ">=", since))
+        if until is not None:
+            filters.append(("timestamp", "<", until))
+        columns = list(dict.fromkeys(["id", "timestamp", *columns]))
+        if after is not None:
+            return self._readings_after(vehicle_id, columns, count, filters, after)
+
+        if before is not None:
+            filters.append(("timestamp", "<=", before[0]))
+        lowest = max((f[2] for f in filters if f[1] == ">="), default=None)
+        highest = min((f[2] for f in filters if f[1] in ("<", "<=")), default=None)
+
+        rows = {}
+        for month, path in self._months(vehicle_id, newest_first=True):
+            if lowest is not None and month < _month(lowest):
+                continue
+            if highest is not None and month > _month(highest):
+                continue
+            for row in self._read_month(path, columns, filters):
+                if before is None or (row["timestamp"], row["id"]) < before:
+                    rows[row["id"]] = row
+            if len(rows) >= count:
+                break
+
+        return sorted(
+            rows.values(), key=lambda r: (r["timestamp"], r["id"]), reverse=True
+        )[:count]
+
+    def _readings_after(
+        self, vehicle_id: int, columns: list[str], count: int, filters, after: int
+    ) -> list[dict]:
+        # File names carry their id range, so only files with newer ids are
+        # opened, lowest first, until no later file can hold a lower id.
+        filters = [*filters, ("id", ">", after)]
+        rows = {}
+        for first, path in self._files_after(vehicle_id, after):
+            if len(rows) >= count and first > sorted(rows)[count - 1]:
+                break
+            rows.update(
+                (row["id"], row) for row in self._read_file(path, columns, filters)
+            )
+        return [rows[row_id] for row_id in sorted(rows)[:count]]
+
+    def merge(
+        self,
+        hot: list[dict],
+        vehicle_id: int,
+        columns: list[str],
+        count: int,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        before: tuple | None = None,
+        after: int | None = None,
+    ) -> list[dict]:
+        """
+        Complete ``hot``, a page of at most ``count`` rows with ``columns``
+        read from the table with the same filters, with archived readings.
+        Newest-first pages only read the archive when they reach below the
+        watermark; ``after`` pages look for archived ids above ``after``,
+        since a late reading may have been archived before it was polled.
+        """
+        if after is None:
+            watermark = self.watermark()
+            if watermark is None or (since is not None and since >= watermark):
+                return hot
+            if len(hot) >= count and hot[-1]["timestamp"] >= watermark:
+                return hot
+
+        rows = {
+            row["id"]: row
+            for row in self.readings(
+                vehicle_id, columns, count, since, until, before, after
+            )
+        }
+        # Rows still in the table win over copies left by an interrupted run.
+        rows.update((row["id"], row) for row in hot)
+        if after is not None:
+            return [rows[row_id] for row_id in sorted(rows)[:count]]
+        merged = sorted(
+            rows.values(), key=lambda r: (r["timestamp"], r["id"]), reverse=True
+        )
+        return merged[:count]
+
+
+def init_archive(app) -> TelemetryArchive | None:
+    if pyarrow is None or not app.config["TELEMETRY_ARCHIVE_FALLTHROUGH"]:
+        return None
+    archive = TelemetryArchive(app.config["TELEMETRY_ARCHIVE_DIR"])
+    app.extensions["telemetry_archive"] = archive
+    return archive
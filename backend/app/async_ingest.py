@@ -0,0 +1,412 @@
+import asyncio
+import io
+import re
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from werkzeug.exceptions import (
+    BadRequest,
+    HTTPException,
+    RequestEntityTooLarge,
+    UnsupportedMediaType,
+)
+
+from .compression import (
+    DECOMPRESSED_ENCODINGS,
+    Inflater,
+    body_error,
+    unsupported_encoding,
+)
+from .ingest import (
+    batch_response,
+    check_batch,
+    check_foreign_keys,
+    queue_reading,
+    validate_batch,
+    validate_reading,
+)
+from .models import TelematicsReading
+from .partitions import use_reading_id_sequence
+from .payloads import bulk_insert_readings
+from .rollups import add_to_rollups
+
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "mysql": "mysql+aiomysql"}
+
+# Tables written by an ingest, for the version store.
+WRITTEN_TABLES = ("telematics_readings", "telemetry_hourly_rollups")
+
+JSON_WHITESPACE = b" \t\n\r"
+# A whole string, or a byte that opens or closes a value or a string or
+# separates array items.
+ITEM_TOKEN = re.compile(rb'"[^"\\]*+(?:\\.[^"\\]*+)*+"|[\]\[{},"]', re.DOTALL)
+STRING_TOKEN = re.compile(rb'["\\]')
+# An object or array holding no other, such as a reading, read in one go.
+FLAT_VALUE = rb'[\[{](?:[^\]\[{}"]++|"[^"\\]*+(?:\\.[^"\\]*+)*+")*+[\]}]'
+FLAT_CONTAINER = re.compile(FLAT_VALUE, re.DOTALL)
+# A flat item with the whitespace around it and the separator after it.
+FLAT_ITEM = re.compile(
+    rb"[ \t\n\r]*+(" + FLAT_VALUE + rb")[ \t\n\r]*+([,\]])", re.DOTALL
+)
+
+
+def async_database_uri(config) -> str:
+    """ASYNC_DATABASE_URI, or SQLALCHEMY_DATABASE_URI with an asyncio driver."""
+    if config.get("ASYNC_DATABASE_URI"):
+        return config["ASYNC_DATABASE_URI"]
+    url = make_url(config["SQLALCHEMY_DATABASE_URI"])
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"no asyncio driver configured for {backend}")
+    if backend == "sqlite" and url.database in (None, "", ":memory:"):
+        raise ValueError("the async ingest app cannot share an in-memory database")
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(
+        hide_password=False
+    )
+
+
+class ArraySplitter:
+    """
+    Split a JSON array arriving in chunks into the encoded bytes of its
+    items, holding only the item being read. Items are not parsed here:
+    the array is valid if ``finish`` returns True and every item parses.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._pos = 0
+        self._start = 0
+        self._state = "open"
+        self._depth = 0
+        self._in_string = False
+
+    def feed(self, data: bytes) -> list[bytes]:
+        """The items completed by ``data``."""
+        items = []
+        buffer = self._buffer
+        buffer += data
+        pos = self._pos
+        while pos < len(buffer) and self._state != "invalid":
+            if self._state == "item":
+                pos, wait = self._scan_item(buffer, pos, items)
+                if wait:
+                    break
+                continue
+            if self._state in ("first", "next"):
+                item = FLAT_ITEM.match(buffer, pos)
+                if item is not None:
+                    items.append(bytes(item.group(1)))
+                    self._state = "next" if item.group(2) == b"," else "closed"
+                    pos = item.end()
+                    continue
+            byte = buffer[pos]
+            if byte in JSON_WHITESPACE:
+                pos += 1
+            elif self._state == "open" and byte == ord("["):
+                self._state = "first"
+                pos += 1
+            elif self._state == "first" and byte == ord("]"):
+                self._state = "closed"
+                pos += 1
+            elif self._state in ("first", "next") and byte not in b",]":
+                self._state = "item"
+                self._start = pos
+            else:
+                self._state = "invalid"
+
+        # Keep only the item being read.
+        keep = self._start if self._state == "item" else pos
+        del buffer[:keep]
+        self._start -= keep
+        self._pos = pos - keep
+        return items
+
+    def _scan_item(self, buffer, pos: int, items: list) -> tuple[int, bool]:
+        """
+        Scan the item from ``pos`` past its next token; returns where to go
+        on and whether that has to wait for more data.
+        """
+        if self._in_string:
+            match = STRING_TOKEN.search(buffer, pos)
+            if match is None:
+                return len(buffer), True
+            if buffer[match.start()] == ord("\\"):
+                # Skip the escaped byte, once it has arrived.
+                if match.end() == len(buffer):
+                    return match.start(), True
+                return match.end() + 1, False
+            self._in_string = False
+            return match.end(), False
+
+        match = ITEM_TOKEN.search(buffer, pos)
+        if match is None:
+            return len(buffer), True
+        byte = buffer[match.start()]
+        if byte == ord('"'):
+            # A string that has not fully arrived is scanned as it does.
+            self._in_string = match.end() - match.start() == 1
+        elif byte in b"[{":
+            flat = FLAT_CONTAINER.match(buffer, match.start())
+            if flat is not None:
+                return flat.end(), False
+            self._depth += 1
+        elif self._depth:
+            if byte != ord(","):
+                self._depth -= 1
+        elif byte in b",]":
+            items.append(bytes(buffer[self._start : match.start()]))
+            self._state = "next" if byte == ord(",") else "closed"
+        else:
+            self._state = "invalid"
+        return match.end(), False
+
+    def finish(self) -> bool:
+        """Whether the data fed so far was exactly one array."""
+        return self._state == "closed"
+
+
+def _store_reading(session, row: dict, rollups: bool):
+    errors = check_foreign_keys([row], session)
+    if errors[0]:
+        return errors[0], None
+    reading = TelematicsReading(**row)
+    session.add(reading)
+    session.flush()
+    if rollups:
+        add_to_rollups([row], session)
+    return None, reading.id
+
+
+def _store_readings(session, rows: list[dict], rollups: bool):
+    errors = check_foreign_keys(rows, session)
+    valid_rows = [row for row, error in zip(rows, errors) if not error]
+    ids = bulk_insert_readings(valid_rows, session)
+    if rollups:
+        add_to_rollups(valid_rows, session)
+    return errors, ids, valid_rows
+
+
+class AsyncIngestApp:
+    """
+    ASGI app serving ``POST /api/telemetry`` and ``POST /api/telemetry/batch``
+    on an asyncio event loop, with the same payloads and responses as the
+    Flask routes: single readings are parsed by the Flask app's request
+    class, batches item by item as the body arrives with its JSON provider,
+    and both are validated and answered with the same helpers from
+    ``ingest``. Other requests go to ``fallback`` (typically the Flask app
+    wrapped with ``asgiref.wsgi.WsgiToAsgi``).
+
+    Readings are written through SQLAlchemy's async engine, so a request
+    waiting on the database holds no thread; concurrency is bounded by the
+    connection pool instead. The version store and position cache, which
+    may block, are updated from a worker thread. With TELEMETRY_BUFFERED single readings go to
+    the Flask app's ingest buffer, as they do there.
+    """
+
+    def __init__(self, flask_app, fallback=None):
+        self.flask_app = flask_app
+        self.config = flask_app.config
+        self.fallback = fallback
+        self.routes = {
+            ("POST", "/api/telemetry"): self.create_reading,
+            ("POST", "/api/telemetry/batch"): self.create_readings_batch,
+        }
+        self._engine = None
+        self._sessions = None
+
+    def sessions(self):
+        if self._sessions is None:
+            options = {}
+            uri = async_database_uri(self.config)
+            if make_url(uri).get_backend_name() != "sqlite":
+                options = {
+                    "pool_size": self.config["DB_POOL_SIZE"],
+                    "max_overflow": self.config["DB_POOL_MAX_OVERFLOW"],
+                    "pool_timeout": self.config["DB_POOL_TIMEOUT"],
+                    "pool_recycle": self.config["DB_POOL_RECYCLE"],
+                    "pool_pre_ping": self.config["DB_POOL_PRE_PING"],
+                }
+            self._engine = create_async_engine(uri, **options)
+            use_reading_id_sequence(self._engine.sync_engine, self.config)
+            self._sessions = async_sessionmaker(self._engine, expire_on_commit=False)
+        return self._sessions()
+
+    async def dispose(self) -> None:
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = self._sessions = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] == "http":
+            handler = self.routes.get((scope["method"], scope["path"]))
+            if handler is not None:
+                await self._handle(handler, scope, receive, send)
+                return
+        if self.fallback is not None:
+            await self.fallback(scope, receive, send)
+            return
+        await self._respond(send, {"message": "not found"}, 404)
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.dispose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _handle(self, handler, scope, receive, send) -> None:
+        try:
+            data, status = await handler(scope, self._body(scope, receive))
+        except HTTPException as exc:
+            # Rendered as Flask renders an unhandled HTTPException.
+            await self._send(send, exc.get_response())
+            return
+        await self._respond(send, data, status)
+
+    def _request(self, scope, body: bytes):
+        """The Flask request for ``body``, to parse it as the routes do."""
+        headers = dict(scope["headers"])
+        environ = {
+            "REQUEST_METHOD": scope["method"],
+            "PATH_INFO": scope["path"],
+            "CONTENT_TYPE": headers.get(b"content-type", b"").decode("latin-1"),
+            "CONTENT_LENGTH": str(len(body)),
+            "wsgi.input": io.BytesIO(body),
+        }
+        return self.flask_app.request_class(environ)
+
+    async def _body(self, scope, receive):
+        """Yield the request body as it arrives, inflated if it is compressed."""
+        max_size = self.config["REQUEST_DECOMPRESSION_MAX_BYTES"]
+        headers = dict(scope["headers"])
+        encoding = headers.get(b"content-encoding", b"").decode().strip().lower()
+        if encoding not in ("", "identity", *DECOMPRESSED_ENCODINGS):
+            raise UnsupportedMediaType(response=unsupported_encoding(encoding))
+
+        inflater = None if encoding in ("", "identity") else Inflater(max_size)
+        size = 0
+        more = True
+        while more:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                raise BadRequest("client disconnected")
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > max_size:
+                raise body_error(
+                    RequestEntityTooLarge, f"request body exceeds {max_size} bytes"
+                )
+            more = message.get("more_body", False)
+            if inflater is None:
+                yield chunk
+            else:
+                for output in inflater.inflate(chunk):
+                    yield output
+        if inflater is not None:
+            yield inflater.finish()
+
+    def _json_items(self, items: list[bytes], payload: list, max_items: int):
+        """Parse ``items`` into ``payload``, keeping at most ``max_items + 1``."""
+        loads = self.flask_app.json.loads
+        for item in items:
+            value = loads(item)
+            if len(payload) <= max_items:
+                payload.append(value)
+
+    async def _read_array(self, scope, body, max_items: int) -> list | None:
+        """
+        The JSON array of ``body``, or None where ``request.get_json(silent=
+        True)`` would give something else. Items are parsed as they arrive,
+        with the Flask app's JSON provider; past ``max_items + 1`` they are
+        only checked, which is all ``check_batch`` needs to refuse the batch.
+        """
+        valid = self._request(scope, b"").is_json
+        splitter = ArraySplitter()
+        payload = []
+        async for chunk in body:
+            if not valid:
+                continue  # read to the end, as Flask would
+            try:
+                self._json_items(splitter.feed(chunk), payload, max_items)
+            except ValueError:
+                valid = False
+        if not valid or not splitter.finish():
+            return None
+        return payload
+
+    async def _respond(self, send, data, status: int) -> None:
+        response = self.flask_app.json.response(data)
+        response.status_code = status
+        await self._send(send, response)
+
+    async def _send(self, send, response) -> None:
+        body = response.get_data()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": [
+                    (name.lower().encode("latin-1"), value.encode("latin-1"))
+                    for name, value in response.headers.items()
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    def _written(self, rows: list[dict]) -> None:
+        """
+        Publish committed readings to the version store and position cache;
+        blocking, so called through ``asyncio.to_thread``.
+        """
+        if not rows:
+            return
+        extensions = self.flask_app.extensions
+        extensions["version_store"].bump(WRITTEN_TABLES)
+        cache = extensions.get("position_cache")
+        if cache is not None:
+            cache.update(rows)
+
+    async def create_reading(self, scope, body):
+        # A single reading is small: parse it whole, as the Flask route does.
+        request = self._request(scope, b"".join([chunk async for chunk in body]))
+        with self.flask_app.app_context():
+            payload = request.get_json() or {}
+
+        buffer = self.flask_app.extensions.get("ingest_buffer")
+        if buffer is not None:
+            return queue_reading(buffer, payload)
+
+        row, error = validate_reading(payload)
+        if error:
+            return {"message": error}, 400
+
+        rollups = self.config["TELEMETRY_ROLLUPS_ON_INGEST"]
+        async with self.sessions() as session:
+            error, reading_id = await session.run_sync(_store_reading, row, rollups)
+            if error:
+                return {"message": error}, 400
+            await session.commit()
+        await asyncio.to_thread(self._written, [row])
+        return {"id": reading_id}, 201
+
+    async def create_readings_batch(self, scope, body):
+        max_items = self.config["TELEMETRY_BATCH_MAX_ITEMS"]
+        payload = await self._read_array(scope, body, max_items)
+        invalid = check_batch(payload, max_items)
+        if invalid is not None:
+            return invalid
+
+        results, indexes, rows = validate_batch(payload)
+        rollups = self.config["TELEMETRY_ROLLUPS_ON_INGEST"]
+        async with self.sessions() as session:
+            errors, ids, written = await session.run_sync(
+                _store_readings, rows, rollups
+            )
+            await session.commit()
+        await asyncio.to_thread(self._written, written)
+        return batch_response(results, indexes, errors, ids)
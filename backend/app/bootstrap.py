@@ -0,0 +1,46 @@
+from flask import current_app
+
+from .extensions import db
+from .models import Company
+from .partitions import maintain_partitions
+from .payloads import legacy_payload_tables, migrate_raw_payloads
+from .refdata import reference_data
+
+
+def bootstrap_database() -> list[str]:
+    """
+    Create missing tables and the default company, move raw payloads out
+    of a legacy readings column, and partition the telemetry tables if
+    TELEMETRY_PARTITIONING is set; inside an app context.
+
+    Run once per deployment (``flask init-db``) rather than by every worker
+    at startup; returns a line for each thing it did.
+    """
+    done = []
+    db.create_all()
+
+    reference = reference_data()
+    if reference.first_id("companies") is None:
+        default_company = Company(name="Default company")
+        db.session.add(default_company)
+        db.session.commit()
+        reference.reload()
+        done.append(f"Created default company with id {default_company.id}")
+
+    config = current_app.config
+    if legacy_payload_tables(db.engine):
+        moved = migrate_raw_payloads(config["PAYLOAD_MIGRATION_BATCH_SIZE"])["rows"]
+        done.append(f"Moved {moved} raw payloads into telematics_reading_payloads")
+
+    if config["TELEMETRY_PARTITIONING"] != "none":
+        changes = maintain_partitions(
+            db.engine,
+            config["TELEMETRY_PARTITIONING"],
+            config["TELEMETRY_PARTITIONS_AHEAD"],
+            config["TELEMETRY_RETENTION_DAYS"],
+        )
+        for name in changes["created"]:
+            done.append(f"Created telemetry partition {name}")
+        for name in changes["dropped"]:
+            done.append(f"Dropped telemetry partition {name}")
+    return done
@@ -0,0 +1,65 @@
+from sqlalchemy import insert, select, text
+
+from .extensions import db
+
+# Rows per multi-row INSERT statement on MySQL.
+MYSQL_INSERT_CHUNK = 1000
+
+
+def returns_ids(dialect) -> bool:
+    """Whether ``bulk_insert`` reports the new primary keys on ``dialect``."""
+    return (
+        dialect.insert_executemany_returning_sort_by_parameter_order
+        or dialect.name == "mysql"
+    )
+
+
+def bulk_insert(model, rows: list[dict], session=None) -> list[int] | None:
+    """
+    Insert ``rows`` into the model's table using multi-row INSERT statements.
+
+    Returns the new primary keys in input order: from RETURNING where the
+    dialect supports it for an executemany (SQLite, MariaDB), and on MySQL
+    from LAST_INSERT_ID(), unless the rows carry their own ids. Otherwise
+    returns ``None``. The caller owns the transaction. ``session`` defaults
+    to ``db.session``.
+    """
+    if not rows:
+        return []
+
+    session = session or db.session
+    table = model.__table__
+    dialect = session.get_bind().dialect
+    if dialect.insert_executemany_returning_sort_by_parameter_order:
+        result = session.execute(
+            insert(table).returning(table.c.id, sort_by_parameter_order=True), rows
+        )
+        return list(result.scalars())
+    if dialect.name == "mysql" and "id" in table.c and "id" not in rows[0]:
+        return _mysql_insert(session, table, rows)
+
+    session.execute(insert(table), rows)
+    return None
+
+
+def _mysql_insert(session, table, rows: list[dict]) -> list[int]:
+    # InnoDB allocates a multi-row INSERT, whose row count is known up front,
+    # one block of consecutive ids under every innodb_autoinc_lock_mode;
+    # LAST_INSERT_ID() is the first, the rest follow at
+    # auto_increment_increment steps.
+    step = session.execute(text("SELECT @@SESSION.auto_increment_increment")).scalar()
+    ids = []
+    for start in range(0, len(rows), MYSQL_INSERT_CHUNK):
+        chunk = rows[start : start + MYSQL_INSERT_CHUNK]
+        first = session.execute(insert(table).values(chunk)).lastrowid
+        ids.extend(range(first, first + step * len(chunk), step))
+    return ids
+
+
+def existing_ids(model, ids, session=None) -> set[int]:
+    """Return the subset of ``ids`` that exist in the model's table."""
+    ids = {i for i in ids if i is not None}
+    if not ids:
+        return set()
+    session = session or db.session
+    return set(session.execute(select(model.id).where(model.id.in_(ids))).scalars())
@@ -0,0 +1,191 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, make_response
+
+from .versions import versions_key
+
+# Headers that are recomputed for every response rather than replayed.
+SKIPPED_HEADERS = {"content-length", "etag", "set-cookie"}
+
+
+class CacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class MemoryResponseCache:
+    """LRU cache of response bodies with a TTL, local to this process."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1:]
+
+    def set(self, key: str, status: int, headers: list, body: bytes) -> None:
+        evicted = 0
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, status, headers, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        if evicted:
+            self.stats.count("evictions", evicted)
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteResponseCache:
+    """
+    LRU cache of response bodies with a TTL in a local SQLite file, shared by
+    every worker process on the host.
+    """
+
+    def __init__(self, path: str, max_entries: int, ttl: float):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._local = threading.local()
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            "key TEXT PRIMARY KEY, expires REAL NOT NULL, last_used REAL NOT NULL, "
+            "status INTEGER NOT NULL, headers TEXT NOT NULL, body BLOB NOT NULL)"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str):
+        conn = self._connect()
+        now = time.time()
+        row = conn.execute(
+            "SELECT status, headers, body FROM response_cache "
+            "WHERE key = ? AND expires >= ?",
+            (key, now),
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute(
+            "UPDATE response_cache SET last_used = ? WHERE key = ?", (now, key)
+        )
+        return row[0], json.loads(row[1]), row[2]
+
+    def set(self, key: str, status: int, headers: list, body: bytes) -> None:
+        conn = self._connect()
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO response_cache "
+            "(key, expires, last_used, status, headers, body) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, now + self.ttl, now, status, json.dumps(headers), body),
+        )
+        evicted = conn.execute(
+            "DELETE FROM response_cache WHERE expires < ? OR key IN ("
+            "SELECT key FROM response_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (now, self.max_entries),
+        ).rowcount
+        if evicted:
+            self.stats.count("evictions", evicted)
+
+    def size(self) -> int:
+        return (
+            self._connect().execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+        )
+
+
+def init_response_cache(app):
+    """Attach the response cache selected by RESPONSE_CACHE to ``app``."""
+    setting = app.config["RESPONSE_CACHE"]
+    max_entries = app.config["RESPONSE_CACHE_MAX_ENTRIES"]
+    ttl = app.config["RESPONSE_CACHE_TTL"]
+    if setting == "none":
+        return None
+    if setting.startswith("sqlite:///"):
+        cache = SQLiteResponseCache(setting[len("sqlite:///") :], max_entries, ttl)
+    else:
+        cache = MemoryResponseCache(max_entries, ttl)
+    app.extensions["response_cache"] = cache
+    return cache
+
+
+def cached(*tables):
+    """
+    Read-through cache for a GET view whose body only depends on the URL and
+    on ``tables``. Entries are keyed by the table versions, so a committed
+    write to any of ``tables`` makes them unreachable immediately.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cache = current_app.extensions.get("response_cache")
+            if cache is None:
+                return view(*args, **kwargs)
+
+            key = versions_key(tables)
+            entry = cache.get(key)
+            if entry is not None:
+                cache.stats.count("hits")
+                status, headers, body = entry
+                return current_app.response_class(body, status=status, headers=headers)
+
+            cache.stats.count("misses")
+            response = make_response(view(*args, **kwargs))
+            if (
+                response.status_code == 200
+                and not response.is_streamed
+                and response.content_length is not None
+                and response.content_length
+                <= current_app.config["RESPONSE_CACHE_MAX_BODY"]
+            ):
+                headers = [
+                    (name, value)
+                    for name, value in response.headers.items()
+                    if name.lower() not in SKIPPED_HEADERS
+                ]
+                cache.set(key, response.status_code, headers, response.get_data())
+            return response
+
+        return wrapper
+
+    return decorator
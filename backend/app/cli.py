@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta
+
+import click
+
+from .archive import archive_readings
+from .bootstrap import bootstrap_database
+from .extensions import db
+from .partitions import maintain_partitions, partition_status
+from .payloads import migrate_raw_payloads
+from .rollups import rebuild_rollups
+from .schema import check_indexes, create_missing_indexes
+
+
+def register_commands(app) -> None:
+    @app.cli.command("init-db")
+    @click.option(
+        "--create-indexes", is_flag=True, help="Also create missing declared indexes."
+    )
+    def init_db_command(create_indexes: bool) -> None:
+        """Create missing tables and the default company; run once per deploy."""
+        for line in bootstrap_database():
+            click.echo(line)
+        click.echo("Database schema is up to date.")
+
+        problems = check_indexes(db.engine, db.metadata)
+        for problem in problems:
+            click.echo(_describe_index_problem(problem))
+        if create_indexes:
+            for name in create_missing_indexes(db.engine, db.metadata, problems):
+                click.echo(f"Created index {name}")
+
+    @app.cli.command("check-indexes")
+    @click.option("--create", is_flag=True, help="Create the indexes that are missing.")
+    def check_indexes_command(create: bool) -> None:
+        """Compare the indexes from db/schema.yml with the live database."""
+        problems = check_indexes(db.engine, db.metadata)
+        if not problems:
+            click.echo("All declared indexes are present.")
+            return
+
+        for problem in problems:
+            click.echo(_describe_index_problem(problem))
+
+        if create:
+            for name in create_missing_indexes(db.engine, db.metadata, problems):
+                click.echo(f"Created index {name}")
+        else:
+            raise SystemExit(1)
+
+    @app.cli.command("rollups-rebuild")
+    @click.option("--since", type=click.DateTime(), required=True)
+    @click.option("--until", type=click.DateTime(), default=None)
+    @click.option("--vehicle-id", type=int, default=None)
+    def rollups_rebuild_command(since, until, vehicle_id) -> None:
+        """Recompute the hourly telemetry rollups for a time range."""
+        until = until or datetime.utcnow()
+        written = rebuild_rollups(since, until, vehicle_id=vehicle_id)
+        click.echo(f"Rebuilt {written} hourly rollups from {since} to {until}.")
+
+    @app.cli.command("telemetry-archive")
+    @click.option(
+        "--older-than-days",
+        type=int,
+        default=None,
+        help="Archive readings older than this (TELEMETRY_ARCHIVE_AFTER_DAYS).",
+    )
+    def telemetry_archive_command(older_than_days) -> None:
+        """Move old telemetry readings into the Parquet archive."""
+        days = older_than_days or app.config["TELEMETRY_ARCHIVE_AFTER_DAYS"]
+        before = datetime.utcnow() - timedelta(days=days)
+        try:
+            result = archive_readings(
+                app.config["TELEMETRY_ARCHIVE_DIR"],
+                before,
+                app.config["TELEMETRY_ARCHIVE_BATCH_SIZE"],
+            )
+        except RuntimeError as exc:
+            raise click.ClickException(str(exc)) from None
+        click.echo(
+            f"Archived {result['rows']} readings older than {before} "
+            f"into {result['files']} files."
+        )
+
+    @app.cli.command("payloads-migrate")
+    @click.option(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="Rows per transaction (PAYLOAD_MIGRATION_BATCH_SIZE).",
+    )
+    @click.option(
+        "--drop-column", is_flag=True, help="Drop the emptied raw_payload column."
+    )
+    def payloads_migrate_command(batch_size, drop_column: bool) -> None:
+        """Move raw_payload out of telemetry rows into the compressed table."""
+        result = migrate_raw_payloads(
+            batch_size or app.config["PAYLOAD_MIGRATION_BATCH_SIZE"], drop_column
+        )
+        if not result["tables"]:
+            click.echo("No telemetry table has a raw_payload column.")
+            return
+        click.echo(
+            f"Moved {result['rows']} payloads out of {', '.join(result['tables'])}."
+        )
+        if drop_column:
+            click.echo("Dropped the raw_payload column.")
+
+    @app.cli.command("partitions-maintain")
+    def partitions_maintain_command() -> None:
+        """Create upcoming telemetry partitions and drop expired ones."""
+        interval = app.config["TELEMETRY_PARTITIONING"]
+        if interval == "none":
+            raise click.ClickException("TELEMETRY_PARTITIONING is not set.")
+        changes = maintain_partitions(
+            db.engine,
+            interval,
+            app.config["TELEMETRY_PARTITIONS_AHEAD"],
+            app.config["TELEMETRY_RETENTION_DAYS"],
+        )
+        for name in changes["created"]:
+            click.echo(f"Created partition {name}")
+        for name in changes["dropped"]:
+            click.echo(f"Dropped partition {name}")
+        if not changes["created"] and not changes["dropped"]:
+            click.echo("Partitions are up to date.")
+
+    @app.cli.command("partitions-list")
+    def partitions_list_command() -> None:
+        """List the partitions of the telemetry table."""
+        partitions = partition_status(db.engine)
+        if not partitions:
+            click.echo("telematics_readings is not partitioned.")
+        for partition in partitions:
+            bound = partition["less_than"] or "MAXVALUE"
+            rows = "" if partition["rows"] is None else f"  ~{partition['rows']} rows"
+            click.echo(f"{partition['name']:<12} < {bound}{rows}")
+
+
+def _describe_index_problem(problem: dict) -> str:
+    if problem["status"] == "missing_table":
+        return f"{problem['table']}: table is missing"
+    if problem["status"] == "differs":
+        return (
+            f"{problem['table']}.{problem['index']}: expected columns "
+            f"{problem['expected']}, found {problem['actual']}"
+        )
+    return (
+        f"{problem['table']}.{problem['index']}: missing, columns {problem['expected']}"
+    )
@@ -0,0 +1,347 @@
+import io
+import json
+import zlib
+
+from flask import request
+from werkzeug.exceptions import BadRequest, HTTPException, RequestEntityTooLarge
+from werkzeug.wrappers import Response
+from werkzeug.wsgi import get_input_stream
+
+try:
+    import brotli
+except ImportError:  # optional, enables "br"
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional, enables "zstd"
+    zstandard = None
+
+COMPRESSIBLE_MIMETYPES = {
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+}
+
+READ_CHUNK_SIZE = 64 * 1024
+
+# Request Content-Encodings inflated by ``Inflater``.
+DECOMPRESSED_ENCODINGS = ("gzip", "x-gzip", "deflate")
+
+
+class GzipCompressor:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        """Emit everything compressed so far without ending the stream."""
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliCompressor:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdCompressor:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+# Content-Encoding token -> (compressor class, level config key, available)
+ENCODINGS = {
+    "zstd": (ZstdCompressor, "RESPONSE_COMPRESSION_ZSTD_LEVEL", zstandard is not None),
+    "br": (BrotliCompressor, "RESPONSE_COMPRESSION_BROTLI_LEVEL", brotli is not None),
+    "gzip": (GzipCompressor, "RESPONSE_COMPRESSION_GZIP_LEVEL", True),
+}
+
+
+# Stored telemetry raw payloads: zstd when available, zlib otherwise, or
+# as is when compressing does not make them smaller.
+PAYLOAD_ZSTD_LEVEL = 3
+PAYLOAD_ZLIB_LEVEL = 6
+
+
+def compress_payload(text: str) -> tuple[str, bytes]:
+    """Compress ``text``; returns ``(codec, data)`` for ``decompress_payload``."""
+    data = text.encode("utf-8")
+    if zstandard is not None:
+        codec = "zstd"
+        packed = zstandard.ZstdCompressor(level=PAYLOAD_ZSTD_LEVEL).compress(data)
+    else:
+        codec = "zlib"
+        packed = zlib.compress(data, PAYLOAD_ZLIB_LEVEL)
+    if len(packed) >= len(data):
+        return "none", data
+    return codec, packed
+
+
+def decompress_payload(codec: str, data: bytes) -> str:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd payloads")
+        data = zstandard.ZstdDecompressor().decompress(data)
+    elif codec == "zlib":
+        data = zlib.decompress(data)
+    elif codec != "none":
+        raise ValueError(f"unknown payload codec {codec}")
+    return data.decode("utf-8")
+
+
+def etag_variants(etag: str) -> list[str]:
+    """``etag`` followed by the tags it gets for each content coding."""
+    return [etag, *(f"{etag}-{encoding}" for encoding in ENCODINGS)]
+
+
+def _compress_stream(chunks, compressor):
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class ResponseCompression:
+    """
+    Compress responses with the best coding accepted by the client.
+
+    Streamed responses are compressed chunk by chunk and flushed after each
+    chunk so that clients keep receiving data as it is produced.
+    """
+
+    def __init__(self, app):
+        config = app.config
+        setting = config["RESPONSE_COMPRESSION"]
+        wanted = [e.strip() for e in setting.split(",") if e.strip()]
+        unknown = set(wanted) - set(ENCODINGS) - {"none"}
+        if unknown:
+            raise ValueError(f"unknown RESPONSE_COMPRESSION {sorted(unknown)}")
+        self.encodings = [e for e in wanted if e in ENCODINGS and ENCODINGS[e][2]]
+        self.levels = {e: config[ENCODINGS[e][1]] for e in self.encodings}
+        self.min_size = config["RESPONSE_COMPRESSION_MIN_SIZE"]
+
+    def _compressor(self, encoding: str):
+        return ENCODINGS[encoding][0](self.levels[encoding])
+
+    def after_request(self, response):
+        if (
+            response.status_code < 200
+            or response.status_code in (204, 206, 304)
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or not (
+                response.mimetype in COMPRESSIBLE_MIMETYPES
+                or (response.mimetype or "").startswith("text/")
+            )
+            or "no-transform" in response.headers.get("Cache-Control", "")
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        if not response.is_streamed and (response.content_length or 0) < self.min_size:
+            return response
+        encoding = request.accept_encodings.best_match(self.encodings)
+        if encoding is None:
+            return response
+
+        compressor = self._compressor(encoding)
+        if response.is_streamed:
+            response.response = _compress_stream(response.iter_encoded(), compressor)
+            response.headers.pop("Content-Length", None)
+        else:
+            response.set_data(
+                compressor.compress(response.get_data()) + compressor.finish()
+            )
+        response.headers["Content-Encoding"] = encoding
+
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(f"{etag}-{encoding}", weak)
+        return response
+
+
+def body_error(exception: type[HTTPException], message: str) -> HTTPException:
+    """
+    ``exception`` answering ``{"message": ...}`` as JSON, like the routes'
+    own errors, when it escapes a view that was reading the request body.
+    """
+    response = Response(
+        json.dumps({"message": message}),
+        status=exception.code,
+        mimetype="application/json",
+    )
+    return exception(message, response=response)
+
+
+class Inflater:
+    """
+    Incremental gzip or zlib decoder bounded in inflated size, fed the body
+    as it arrives.
+    """
+
+    def __init__(self, max_size: int):
+        self._max_size = max_size
+        self._size = 0
+        self._decompressor = zlib.decompressobj(47)
+        self._in_member = False
+
+    def _count(self, output: bytes) -> bytes:
+        self._size += len(output)
+        if self._size > self._max_size:
+            raise body_error(
+                RequestEntityTooLarge,
+                f"decompressed request body exceeds {self._max_size} bytes",
+            )
+        return output
+
+    def inflate(self, data: bytes):
+        """Yield what ``data`` inflates to, READ_CHUNK_SIZE bytes at most at a time."""
+        while data:
+            try:
+                output = self._decompressor.decompress(data, READ_CHUNK_SIZE)
+            except zlib.error:
+                raise body_error(
+                    BadRequest, "invalid compressed request body"
+                ) from None
+            self._in_member = not self._decompressor.eof
+            if self._decompressor.eof:
+                # Concatenated gzip members are decoded one after another.
+                data = self._decompressor.unused_data
+                self._decompressor = zlib.decompressobj(47)
+            else:
+                data = self._decompressor.unconsumed_tail
+            if output:
+                yield self._count(output)
+
+    def finish(self) -> bytes:
+        """The output still held back once the body has ended."""
+        if not self._in_member:
+            return b""
+        try:
+            output = self._decompressor.flush()
+        except zlib.error:
+            raise body_error(BadRequest, "invalid compressed request body") from None
+        if not self._decompressor.eof:
+            raise body_error(BadRequest, "truncated compressed request body")
+        self._in_member = False
+        return self._count(output)
+
+
+class DecompressingInput(io.RawIOBase):
+    """Readable stream inflating a gzip or zlib body, bounded in size."""
+
+    def __init__(self, stream, max_size: int):
+        self._stream = stream
+        self._inflater = Inflater(max_size)
+        self._chunks = iter(())
+        self._output = b""
+        self._eof = False
+
+    def readable(self) -> bool:
+        return True
+
+    def _fill(self) -> None:
+        while not self._output and not self._eof:
+            chunk = next(self._chunks, None)
+            if chunk is not None:
+                self._output = chunk
+                continue
+            data = self._stream.read(READ_CHUNK_SIZE)
+            if data:
+                self._chunks = self._inflater.inflate(data)
+            else:
+                self._output = self._inflater.finish()
+                self._eof = True
+
+    def readinto(self, buffer) -> int:
+        self._fill()
+        size = min(len(buffer), len(self._output))
+        buffer[:size] = self._output[:size]
+        self._output = self._output[size:]
+        return size
+
+
+def unsupported_encoding(encoding: str) -> Response:
+    """415 response for a request body in an encoding that is not inflated."""
+    return Response(
+        f"unsupported Content-Encoding {encoding}\n",
+        status=415,
+        headers={"Accept-Encoding": "gzip, deflate"},
+    )
+
+
+class RequestDecompression:
+    """
+    WSGI middleware inflating ``Content-Encoding: gzip`` (or ``deflate``)
+    request bodies for the configured path prefixes. The body is inflated
+    while the view reads it, so streamed uploads stay streamed.
+    """
+
+    def __init__(self, wsgi_app, prefixes, max_size: int):
+        self.wsgi_app = wsgi_app
+        self.prefixes = tuple(prefixes)
+        self.max_size = max_size
+
+    def __call__(self, environ, start_response):
+        encoding = environ.get("HTTP_CONTENT_ENCODING", "").strip().lower()
+        if encoding in ("", "identity") or not environ.get("PATH_INFO", "").startswith(
+            self.prefixes
+        ):
+            return self.wsgi_app(environ, start_response)
+
+        if encoding not in DECOMPRESSED_ENCODINGS:
+            return unsupported_encoding(encoding)(environ, start_response)
+
+        stream = get_input_stream(environ)
+        environ["wsgi.input"] = io.BufferedReader(
+            DecompressingInput(stream, self.max_size), READ_CHUNK_SIZE
+        )
+        environ["wsgi.input_terminated"] = True
+        environ.pop("CONTENT_LENGTH", None)
+        environ.pop("HTTP_CONTENT_ENCODING", None)
+        return self.wsgi_app(environ, start_response)
+
+
+def init_compression(app):
+    """Install response compression and request body decompression on ``app``."""
+    compression = ResponseCompression(app)
+    if compression.encodings:
+        app.after_request(compression.after_request)
+    app.extensions["compression"] = compression
+
+    prefixes = [
+        p.strip()
+        for p in app.config["REQUEST_DECOMPRESSION_PATHS"].split(",")
+        if p.strip()
+    ]
+    if prefixes:
+        app.wsgi_app = RequestDecompression(
+            app.wsgi_app, prefixes, app.config["REQUEST_DECOMPRESSION_MAX_BYTES"]
+        )
+    return compression
@@ -1,10 +1,51 @@
 import os
+import tempfile
+from functools import lru_cache
 from urllib.parse import quote_plus
+
+import yaml
 from dotenv import load_dotenv
 
 
 load_dotenv()
 
+CONFIG_FILE = os.getenv(
+    "CONFIG_FILE",
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+        "config.yaml",
+    ),
+)
+
+
+def _to_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "on")
+
+
+def env_bool(name: str, default: str = "false") -> bool:
+    return _to_bool(os.getenv(name, default))
+
+
+@lru_cache(maxsize=None)
+def _yaml_section() -> dict:
+    """The APP_ENV section (default "production") of config.yaml, if any."""
+    try:
+        with open(CONFIG_FILE, encoding="utf-8") as f:
+            document = yaml.safe_load(f) or {}
+    except FileNotFoundError:
+        return {}
+    return document.get(os.getenv("APP_ENV", "production")) or {}
+
+
+def setting(name: str, default, cast=str):
+    """Read ``name`` from the environment, then config.yaml, then ``default``."""
+    value = os.getenv(name)
+    if value is None:
+        value = _yaml_section().get(name, default)
+    return cast(value)
+
 
 class Config:
     SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-change-me")
@@ -23,6 +64,153 @@ class Config:
             f"mysql+pymysql://{MYSQL_USER}:{_encoded_pwd}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DB}",
         )
     else:
-        SQLALCHEMY_DATABASE_URI = "sqlite:///cloudlabs.db"
+        SQLALCHEMY_DATABASE_URI = os.getenv(
+            "SQLALCHEMY_DATABASE_URI", "sqlite:///cloudlabs.db"
+        )
 
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Engine URI for the async ingest app (asgi.py); by default the same
+    # database through aiomysql / aiosqlite.
+    ASYNC_DATABASE_URI = os.getenv("ASYNC_DATABASE_URI")
+
+    # Connection pool; also settable per environment in config.yaml.
+    DB_POOL_SIZE = setting("DB_POOL_SIZE", 10, int)
+    DB_POOL_MAX_OVERFLOW = setting("DB_POOL_MAX_OVERFLOW", 20, int)
+    DB_POOL_TIMEOUT = setting("DB_POOL_TIMEOUT", 10, int)
+    DB_POOL_RECYCLE = setting("DB_POOL_RECYCLE", 280, int)
+    DB_POOL_PRE_PING = setting("DB_POOL_PRE_PING", True, _to_bool)
+
+    TELEMETRY_BATCH_MAX_ITEMS = int(os.getenv("TELEMETRY_BATCH_MAX_ITEMS", "10000"))
+    TELEMETRY_NDJSON_CHUNK_SIZE = int(os.getenv("TELEMETRY_NDJSON_CHUNK_SIZE", "1000"))
+    TELEMETRY_NDJSON_MAX_LINE_BYTES = int(
+        os.getenv("TELEMETRY_NDJSON_MAX_LINE_BYTES", "65536")
+    )
+    TELEMETRY_NDJSON_MAX_ERRORS = int(os.getenv("TELEMETRY_NDJSON_MAX_ERRORS", "100"))
+
+    TELEMETRY_BUFFERED = env_bool("TELEMETRY_BUFFERED")
+    TELEMETRY_BUFFER_MAX_SIZE = int(os.getenv("TELEMETRY_BUFFER_MAX_SIZE", "50000"))
+    TELEMETRY_BUFFER_FLUSH_SIZE = int(os.getenv("TELEMETRY_BUFFER_FLUSH_SIZE", "1000"))
+    TELEMETRY_BUFFER_FLUSH_INTERVAL = float(
+        os.getenv("TELEMETRY_BUFFER_FLUSH_INTERVAL", "1.0")
+    )
+
+    # "auto" (orjson when installed), "orjson" or "stdlib". orjson output
+    # parses the same but may spell floats differently (0.00001, 1e16).
+    JSON_PROVIDER = os.getenv("JSON_PROVIDER", "auto")
+
+    # Response codings in order of preference; "br" and "zstd" need the
+    # brotli / zstandard packages and are skipped when those are missing.
+    RESPONSE_COMPRESSION = os.getenv("RESPONSE_COMPRESSION", "zstd,br,gzip")
+    RESPONSE_COMPRESSION_MIN_SIZE = int(
+        os.getenv("RESPONSE_COMPRESSION_MIN_SIZE", "1024")
+    )
+    RESPONSE_COMPRESSION_GZIP_LEVEL = int(
+        os.getenv("RESPONSE_COMPRESSION_GZIP_LEVEL", "6")
+    )
+    RESPONSE_COMPRESSION_BROTLI_LEVEL = int(
+        os.getenv("RESPONSE_COMPRESSION_BROTLI_LEVEL", "4")
+    )
+    RESPONSE_COMPRESSION_ZSTD_LEVEL = int(
+        os.getenv("RESPONSE_COMPRESSION_ZSTD_LEVEL", "3")
+    )
+
+    # Path prefixes accepting gzip/deflate request bodies.
+    REQUEST_DECOMPRESSION_PATHS = os.getenv(
+        "REQUEST_DECOMPRESSION_PATHS", "/api/telemetry"
+    )
+    REQUEST_DECOMPRESSION_MAX_BYTES = int(
+        os.getenv("REQUEST_DECOMPRESSION_MAX_BYTES", str(64 * 1024 * 1024))
+    )
+
+    PAGE_DEFAULT_LIMIT = int(os.getenv("PAGE_DEFAULT_LIMIT", "100"))
+    PAGE_MAX_LIMIT = int(os.getenv("PAGE_MAX_LIMIT", "1000"))
+    STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "500"))
+
+    BULK_CREATE_MAX_ITEMS = int(os.getenv("BULK_CREATE_MAX_ITEMS", "5000"))
+
+    # Schema bootstrap runs as a one-shot `flask init-db`; enable this to have
+    # create_app do it instead (run.py does for local development).
+    DB_BOOTSTRAP_ON_STARTUP = env_bool("DB_BOOTSTRAP_ON_STARTUP", "false")
+    CHECK_INDEXES_ON_STARTUP = env_bool("CHECK_INDEXES_ON_STARTUP", "false")
+
+    # Serve the Swagger UI and spec at /api/docs/.
+    DOCS_ENABLED = env_bool("DOCS_ENABLED", "true")
+    # Serve the spec frozen by tools/build_openapi.py instead of having
+    # flasgger build it from the route docstrings in every worker.
+    OPENAPI_FROZEN = env_bool("OPENAPI_FROZEN", "true")
+    OPENAPI_SPEC_FILE = os.getenv(
+        "OPENAPI_SPEC_FILE",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "openapi.json"),
+    )
+    DOCS_MAX_AGE = int(os.getenv("DOCS_MAX_AGE", "3600"))
+
+    STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "250"))
+    FIRST_REQUEST_BUDGET_MS = float(os.getenv("FIRST_REQUEST_BUDGET_MS", "100"))
+
+    AGGREGATE_DEFAULT_WINDOW_HOURS = int(
+        os.getenv("AGGREGATE_DEFAULT_WINDOW_HOURS", "24")
+    )
+    AGGREGATE_MAX_BUCKETS = int(os.getenv("AGGREGATE_MAX_BUCKETS", "5000"))
+
+    TELEMETRY_ROLLUPS_ON_INGEST = env_bool("TELEMETRY_ROLLUPS_ON_INGEST", "true")
+
+    # "none", "month" or "day": range-partition telematics_readings on its
+    # timestamp (see partitions.py). `flask partitions-maintain` creates
+    # TELEMETRY_PARTITIONS_AHEAD future periods and drops partitions older
+    # than TELEMETRY_RETENTION_DAYS (0 keeps everything).
+    TELEMETRY_PARTITIONING = os.getenv("TELEMETRY_PARTITIONING", "none")
+    TELEMETRY_PARTITIONS_AHEAD = int(os.getenv("TELEMETRY_PARTITIONS_AHEAD", "3"))
+    TELEMETRY_RETENTION_DAYS = int(os.getenv("TELEMETRY_RETENTION_DAYS", "0"))
+
+    # Cold tier: `flask telemetry-archive` moves readings older than
+    # TELEMETRY_ARCHIVE_AFTER_DAYS into Parquet files (requires pyarrow);
+    # the telemetry list endpoint reads them back when a page reaches there.
+    TELEMETRY_ARCHIVE_DIR = os.getenv(
+        "TELEMETRY_ARCHIVE_DIR",
+        os.path.join(
+            os.path.dirname(
+                os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            ),
+            "archive",
+            "telemetry",
+        ),
+    )
+    TELEMETRY_ARCHIVE_AFTER_DAYS = int(os.getenv("TELEMETRY_ARCHIVE_AFTER_DAYS", "365"))
+    TELEMETRY_ARCHIVE_BATCH_SIZE = int(
+        os.getenv("TELEMETRY_ARCHIVE_BATCH_SIZE", "50000")
+    )
+    TELEMETRY_ARCHIVE_FALLTHROUGH = env_bool("TELEMETRY_ARCHIVE_FALLTHROUGH", "true")
+
+    # Raw payloads live compressed in telematics_reading_payloads;
+    # `flask payloads-migrate` moves them out of the old raw_payload column.
+    PAYLOAD_MIGRATION_BATCH_SIZE = int(
+        os.getenv("PAYLOAD_MIGRATION_BATCH_SIZE", "1000")
+    )
+
+    # Warming reads the latest reading per vehicle through the (vehicle_id,
+    # timestamp) index, so startup grows with the fleet, not the history.
+    # With it off, workers start faster and the first fleet snapshot warms.
+    POSITION_CACHE_WARM_ON_STARTUP = env_bool("POSITION_CACHE_WARM_ON_STARTUP", "true")
+    POSITION_CACHE_SYNC_SECONDS = float(os.getenv("POSITION_CACHE_SYNC_SECONDS", "5"))
+
+    # "sqlite:////path/to/file.db", shared by the workers, CLI and ASGI app on
+    # the host, or "memory" for a single process only (gunicorn refuses it
+    # with more than one worker). Versions are kept per database URI.
+    VERSION_STORE = os.getenv(
+        "VERSION_STORE",
+        "sqlite:///" + os.path.join(tempfile.gettempdir(), "cloudlabs-versions.db"),
+    )
+
+    # "sqlite:////path/to/file.db", shared by the workers on the host, "none",
+    # or "memory" for a per-process cache. Entries are keyed by the database
+    # URI and VERSION_STORE versions, so a memory cache only sees other
+    # workers' writes if that store is shared; each worker then still fills
+    # its own copy.
+    RESPONSE_CACHE = os.getenv(
+        "RESPONSE_CACHE",
+        "sqlite:///" + os.path.join(tempfile.gettempdir(), "cloudlabs-responses.db"),
+    )
+    RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "60"))
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+    RESPONSE_CACHE_MAX_BODY = int(os.getenv("RESPONSE_CACHE_MAX_BODY", "1048576"))
@@ -0,0 +1,197 @@
+import hashlib
+import importlib.util
+import json
+import logging
+import mimetypes
+import os
+import threading
+from pathlib import Path
+
+from flask import Blueprint, abort, current_app, request
+
+from .compression import ENCODINGS
+
+logger = logging.getLogger(__name__)
+
+SPEC_ENDPOINT = "apispec_1"
+SPEC_ROUTE = f"/{SPEC_ENDPOINT}.json"
+DOCS_ROUTE = "/api/docs/"
+STATIC_ROUTE = "/flasgger_static"
+
+# The frozen files are compressed once per process, so favour ratio over
+# speed (short of brotli 11 / zstd 19, which take seconds on the UI bundle).
+PRECOMPRESS_LEVELS = {"zstd": 15, "br": 9, "gzip": 9}
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# Swagger UI files shipped with flasgger that the docs page loads.
+UI_FILES = (
+    "swagger-ui.css",
+    "swagger-ui-bundle.js",
+    "swagger-ui-standalone-preset.js",
+    "favicon-32x32.png",
+    "favicon-16x16.png",
+)
+
+PAGE = """<!DOCTYPE html>
+<html lang="en">
+  <head>
+    <meta charset="UTF-8">
+    <title>{title}</title>
+    <link rel="stylesheet" type="text/css" href="{static}/swagger-ui.css">
+    <link rel="icon" type="image/png" href="{static}/favicon-32x32.png" sizes="32x32">
+    <link rel="icon" type="image/png" href="{static}/favicon-16x16.png" sizes="16x16">
+  </head>
+  <body>
+    <div id="swagger-ui"></div>
+    <script src="{static}/swagger-ui-bundle.js"></script>
+    <script src="{static}/swagger-ui-standalone-preset.js"></script>
+    <script>
+      window.onload = function () {{
+        window.ui = SwaggerUIBundle({{
+          url: "{spec_url}",
+          dom_id: "#swagger-ui",
+          deepLinking: true,
+          presets: [SwaggerUIBundle.presets.apis, SwaggerUIStandalonePreset],
+          layout: "StandaloneLayout",
+        }});
+      }};
+    </script>
+  </body>
+</html>
+"""
+
+
+def render_spec(spec: dict) -> str:
+    """The frozen form of ``spec``: stable key order, one trailing newline."""
+    return json.dumps(spec, indent=2, sort_keys=True, ensure_ascii=False) + "\n"
+
+
+def runtime_spec(app) -> dict:
+    """Build the spec from the route docstrings of an app set up with flasgger."""
+    with app.test_request_context():
+        return app.swag.get_apispecs(SPEC_ENDPOINT)
+
+
+def swagger_ui_dir() -> Path | None:
+    """flasgger's bundled Swagger UI, located without importing flasgger."""
+    spec = importlib.util.find_spec("flasgger")
+    if spec is None or not spec.submodule_search_locations:
+        return None
+    return Path(spec.submodule_search_locations[0]) / "ui3" / "static"
+
+
+class PrecompressedBody:
+    """A fixed response body held in every available content coding."""
+
+    def __init__(self, data: bytes, mimetype: str):
+        self.mimetype = mimetype
+        self.digest = hashlib.sha256(data).hexdigest()[:16]
+        self.bodies = {"identity": data}
+        for encoding, (compressor_class, _, available) in ENCODINGS.items():
+            if available:
+                compressor = compressor_class(PRECOMPRESS_LEVELS[encoding])
+                compressed = compressor.compress(data) + compressor.finish()
+                if len(compressed) < len(data):
+                    self.bodies[encoding] = compressed
+        self.encodings = [e for e in ENCODINGS if e in self.bodies]
+
+    def respond(self, cache_control: str):
+        encoding = request.accept_encodings.best_match(self.encodings) or "identity"
+        etag = self.digest if encoding == "identity" else f"{self.digest}-{encoding}"
+
+        response = current_app.response_class(mimetype=self.mimetype)
+        response.headers["Cache-Control"] = cache_control
+        response.vary.add("Accept-Encoding")
+        response.set_etag(etag)
+        if request.if_none_match.contains_weak(etag):
+            response.status_code = 304
+            return response
+
+        response.set_data(self.bodies[encoding])
+        if encoding != "identity":
+            response.headers["Content-Encoding"] = encoding
+        return response
+
+
+class FrozenDocs:
+    """
+    Serves the OpenAPI document written by ``tools/build_openapi.py`` and a
+    Swagger UI page for it, in place of flasgger's per-worker spec build.
+
+    The spec is served at ``/apispec_1.json`` and, with immutable caching,
+    under a content-hashed URL that the docs page links to. Swagger UI's
+    assets come from flasgger's package directory.
+    """
+
+    def __init__(self, spec_file: str, max_age: int):
+        with open(spec_file, "rb") as fh:
+            data = fh.read()
+        self.spec = PrecompressedBody(data, "application/json")
+        self.spec_url = f"{DOCS_ROUTE}openapi.{self.spec.digest}.json"
+        self.cache_control = f"public, max-age={max_age}"
+
+        title = json.loads(data).get("info", {}).get("title", "API")
+        page = PAGE.format(title=title, static=STATIC_ROUTE, spec_url=self.spec_url)
+        self.page = PrecompressedBody(page.encode(), "text/html")
+
+        self.ui_dir = swagger_ui_dir()
+        self._assets = {}
+        self._assets_lock = threading.Lock()
+
+    def asset(self, filename: str) -> PrecompressedBody:
+        if filename not in UI_FILES or self.ui_dir is None:
+            abort(404)
+        with self._assets_lock:
+            if filename not in self._assets:
+                try:
+                    data = (self.ui_dir / filename).read_bytes()
+                except FileNotFoundError:
+                    abort(404)
+                mimetype = mimetypes.guess_type(filename)[0]
+                self._assets[filename] = PrecompressedBody(data, mimetype)
+            return self._assets[filename]
+
+    def blueprint(self) -> Blueprint:
+        bp = Blueprint("docs", __name__)
+
+        @bp.route(SPEC_ROUTE)
+        def spec():
+            return self.spec.respond(self.cache_control)
+
+        @bp.route(f"{DOCS_ROUTE}openapi.<digest>.json")
+        def hashed_spec(digest):
+            if digest != self.spec.digest:
+                abort(404)
+            return self.spec.respond(IMMUTABLE)
+
+        @bp.route(DOCS_ROUTE)
+        def page():
+            return self.page.respond(self.cache_control)
+
+        @bp.route(f"{STATIC_ROUTE}/<filename>")
+        def static(filename):
+            return self.asset(filename).respond(self.cache_control)
+
+        return bp
+
+
+def init_frozen_docs(app) -> FrozenDocs | None:
+    """
+    Serve the frozen spec if OPENAPI_FROZEN is on and the file exists;
+    returns None so that the caller falls back to flasgger otherwise.
+    """
+    if not app.config["OPENAPI_FROZEN"]:
+        return None
+    spec_file = app.config["OPENAPI_SPEC_FILE"]
+    if not os.path.exists(spec_file):
+        logger.warning(
+            "Frozen OpenAPI spec %s not found, building it at runtime; "
+            "run tools/build_openapi.py",
+            spec_file,
+        )
+        return None
+
+    docs = FrozenDocs(spec_file, app.config["DOCS_MAX_AGE"])
+    app.register_blueprint(docs.blueprint())
+    app.extensions["docs"] = docs
+    return docs
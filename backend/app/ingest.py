@@ -0,0 +1,224 @@
+import json
+from datetime import datetime, timezone
+
+from flask import current_app
+
+from .bulk import existing_ids
+from .models import Driver, DriverHealthStatus, Shift, Vehicle
+from .payloads import bulk_insert_readings
+from .positions import record_positions
+from .refdata import reference_data
+from .rollups import add_to_rollups
+
+INT_FIELDS = ("vehicle_id", "driver_id", "shift_id", "driver_health_status_id")
+FLOAT_FIELDS = ("latitude", "longitude", "speed_kmh")
+
+# Foreign keys checked up front so one bad reading cannot abort a whole
+# multi-row INSERT. Health statuses come from the reference data cache.
+FK_MODELS = {
+    "vehicle_id": Vehicle,
+    "driver_id": Driver,
+    "shift_id": Shift,
+}
+FK_FIELDS = (*FK_MODELS, "driver_health_status_id")
+
+
+def parse_timestamp(value: str) -> datetime:
+    """Parse an ISO 8601 string into a naive UTC datetime. Raises ValueError."""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def validate_reading(payload) -> tuple[dict | None, str | None]:
+    """
+    Validate one telemetry payload.
+
+    Returns ``(row, None)`` with a row ready for insertion into
+    ``telematics_readings`` or ``(None, message)`` when the payload is invalid.
+    """
+    if not isinstance(payload, dict):
+        return None, "reading must be an object"
+
+    if payload.get("vehicle_id") is None:
+        return None, "vehicle_id is required"
+
+    row = {}
+    for field in INT_FIELDS:
+        value = payload.get(field)
+        if value is not None and (
+            isinstance(value, bool) or not isinstance(value, int)
+        ):
+            return None, f"{field} must be an integer"
+        row[field] = value
+
+    for field in FLOAT_FIELDS:
+        value = payload.get(field)
+        if value is not None and (
+            isinstance(value, bool) or not isinstance(value, (int, float))
+        ):
+            return None, f"{field} must be a number"
+        row[field] = float(value) if value is not None else None
+
+    timestamp = payload.get("timestamp")
+    if timestamp is None:
+        row["timestamp"] = datetime.utcnow()
+    else:
+        if not isinstance(timestamp, str):
+            return None, "timestamp must be an ISO 8601 string"
+        try:
+            row["timestamp"] = parse_timestamp(timestamp)
+        except ValueError:
+            return None, "timestamp must be an ISO 8601 string"
+
+    raw_payload = payload.get("raw_payload")
+    if raw_payload is not None and not isinstance(raw_payload, str):
+        return None, "raw_payload must be a string"
+    row["raw_payload"] = raw_payload
+
+    return row, None
+
+
+def check_foreign_keys(rows: list[dict], session=None) -> list[str | None]:
+    """
+    Check the referenced ids of ``rows`` with one query per referenced table.
+
+    Returns a list aligned with ``rows`` holding ``None`` for valid rows and an
+    error message otherwise. With an explicit ``session`` (outside a Flask app
+    context) health statuses are queried instead of read from the cache.
+    """
+    known = {
+        field: existing_ids(model, (row[field] for row in rows), session)
+        for field, model in FK_MODELS.items()
+    }
+    health_status_ids = (row["driver_health_status_id"] for row in rows)
+    if session is None:
+        known["driver_health_status_id"] = reference_data().known_ids(
+            "driver_health_statuses", health_status_ids
+        )
+    else:
+        known["driver_health_status_id"] = existing_ids(
+            DriverHealthStatus, health_status_ids, session
+        )
+    errors = []
+    for row in rows:
+        error = None
+        for field in FK_FIELDS:
+            value = row[field]
+            if value is not None and value not in known[field]:
+                error = f"unknown {field} {value}"
+                break
+        errors.append(error)
+    return errors
+
+
+def ingest_status(accepted: int, rejected: int) -> int:
+    """201 when every reading was stored, 207 when some were, 400 when none."""
+    if accepted and not rejected:
+        return 201
+    return 207 if accepted else 400
+
+
+def queue_reading(buffer, payload) -> tuple[dict, int]:
+    """Validate one reading into the write-behind buffer; body and status."""
+    row, error = validate_reading(payload)
+    if error:
+        return {"message": error}, 400
+    if not buffer.put(row):
+        return {"message": "ingest buffer is full, retry later"}, 503
+    return {"status": "queued"}, 202
+
+
+def check_batch(payload, max_items: int) -> tuple[dict, int] | None:
+    """Body and status rejecting a whole batch request, or None if it is usable."""
+    if not isinstance(payload, list):
+        return {"message": "body must be an array of readings"}, 400
+    if len(payload) > max_items:
+        return {"message": f"at most {max_items} readings per request"}, 413
+    return None
+
+
+def validate_batch(payload: list) -> tuple[list, list[int], list[dict]]:
+    """
+    Validate each reading of a batch. Returns the per-item results with the
+    invalid readings filled in, and the indexes and rows of the valid ones.
+    """
+    results = []
+    indexes = []
+    rows = []
+    for index, item in enumerate(payload):
+        row, error = validate_reading(item)
+        if error:
+            results.append({"index": index, "status": "rejected", "message": error})
+            continue
+        indexes.append(index)
+        rows.append(row)
+        results.append(None)
+    return results, indexes, rows
+
+
+def batch_response(
+    results: list, indexes: list[int], errors: list, ids: list[int] | None
+) -> tuple[dict, int]:
+    """
+    Complete the ``results`` of ``validate_batch`` with the foreign key
+    ``errors`` of its rows and the ``ids`` of those stored (if the insert
+    reported them); returns the response body and status.
+    """
+    accepted = 0
+    for index, error in zip(indexes, errors):
+        if error:
+            results[index] = {"index": index, "status": "rejected", "message": error}
+            continue
+        result = {"index": index, "status": "created"}
+        if ids is not None:
+            result["id"] = ids[accepted]
+        results[index] = result
+        accepted += 1
+    rejected = len(results) - accepted
+    body = {"accepted": accepted, "rejected": rejected, "results": results}
+    return body, ingest_status(accepted, rejected)
+
+
+def insert_readings(rows: list[dict]) -> list[int] | None:
+    """Write validated readings with multi-row INSERTs. The caller commits."""
+    ids = bulk_insert_readings(rows)
+    readings_written(rows)
+    return ids
+
+
+def readings_written(rows: list[dict]) -> None:
+    """Update derived telemetry data inside the transaction that wrote ``rows``."""
+    if not rows:
+        return
+    if current_app.config["TELEMETRY_ROLLUPS_ON_INGEST"]:
+        add_to_rollups(rows)
+    record_positions(rows)
+
+
+def iter_ndjson(stream, max_line_length: int):
+    """
+    Yield ``(line_number, payload, error)`` for each non-blank line of an
+    NDJSON stream, reading at most ``max_line_length`` bytes at a time.
+    """
+    line_number = 0
+    while True:
+        line = stream.readline(max_line_length + 1)
+        if not line:
+            return
+        line_number += 1
+
+        if len(line) > max_line_length and not line.endswith(b"\n"):
+            while line and not line.endswith(b"\n"):
+                line = stream.readline(max_line_length + 1)
+            yield line_number, None, f"line longer than {max_line_length} bytes"
+            continue
+
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_number, json.loads(line), None
+        except ValueError:
+            yield line_number, None, "invalid JSON"
@@ -0,0 +1,182 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from .extensions import db
+from .ingest import check_foreign_keys, insert_readings
+
+logger = logging.getLogger(__name__)
+
+# Queued by ``stop`` to wake a writer waiting for more rows.
+_WAKE = object()
+
+
+class IngestBuffer:
+    """
+    Bounded in-process queue of validated telemetry rows.
+
+    A background writer drains the queue and stores the rows with multi-row
+    INSERTs, flushing whenever ``flush_size`` rows are collected or
+    ``flush_interval`` seconds have passed since the first row of the batch.
+    The writer is started lazily so forked workers each get their own.
+    """
+
+    def __init__(self, app, max_size: int, flush_size: int, flush_interval: float):
+        self.app = app
+        self.max_size = max_size
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=max_size)
+        self._stopping = threading.Event()
+        self._thread = None
+        self._pid = None
+
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+        self.flush_seconds_total = 0.0
+        self.flush_seconds_max = 0.0
+        self.flush_seconds_last = 0.0
+
+    def put(self, row: dict) -> bool:
+        """Queue one validated row. Returns False when the queue is full."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        with self._lock:
+            self.enqueued += 1
+        return True
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """Flush everything still queued and stop the writer."""
+        self._stopping.set()
+        try:
+            self._queue.put_nowait(_WAKE)
+        except queue.Full:
+            pass  # the writer has rows to take and will see the event
+        thread = self._thread
+        if thread is not None and self._pid == os.getpid():
+            thread.join(timeout)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self.max_size,
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "flushes": self.flushes,
+                "flush_seconds_last": self.flush_seconds_last,
+                "flush_seconds_max": self.flush_seconds_max,
+                "flush_seconds_avg": (
+                    self.flush_seconds_total / self.flushes if self.flushes else 0.0
+                ),
+            }
+
+    def _ensure_started(self) -> None:
+        pid = os.getpid()
+        if self._pid == pid and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if (
+                self._pid == pid
+                and self._thread is not None
+                and self._thread.is_alive()
+            ):
+                return
+            if self._pid != pid:
+                # Inherited from the parent process: start with a fresh queue.
+                self._queue = queue.Queue(maxsize=self.max_size)
+                self._stopping = threading.Event()
+            self._pid = pid
+            self._thread = threading.Thread(
+                target=self._run, name="telemetry-ingest-writer", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set() or not self._queue.empty():
+            batch = self._collect()
+            if batch:
+                self._flush(batch)
+
+    def _collect(self) -> list[dict]:
+        try:
+            row = self._queue.get(timeout=self.flush_interval)
+        except queue.Empty:
+            return []
+        batch = [] if row is _WAKE else [row]
+
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.flush_size:
+            try:
+                if self._stopping.is_set():
+                    # Take what is queued without waiting for more.
+                    row = self._queue.get_nowait()
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    row = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if row is not _WAKE:
+                batch.append(row)
+        return batch
+
+    def _flush(self, batch: list[dict]) -> None:
+        started = time.perf_counter()
+        written = 0
+        failed = 0
+        with self.app.app_context():
+            try:
+                errors = check_foreign_keys(batch)
+                rows = [row for row, error in zip(batch, errors) if not error]
+                insert_readings(rows)
+                db.session.commit()
+                written = len(rows)
+                failed = len(batch) - written
+            except Exception:
+                db.session.rollback()
+                failed = len(batch)
+                logger.exception("Failed to flush %d buffered readings", len(batch))
+            finally:
+                db.session.remove()
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.written += written
+            self.failed += failed
+            self.flushes += 1
+            self.flush_seconds_last = elapsed
+            self.flush_seconds_total += elapsed
+            self.flush_seconds_max = max(self.flush_seconds_max, elapsed)
+
+
+def init_ingest_buffer(app) -> IngestBuffer | None:
+    """Attach the write-behind buffer to ``app`` when TELEMETRY_BUFFERED is on."""
+    if not app.config["TELEMETRY_BUFFERED"]:
+        return None
+
+    buffer = IngestBuffer(
+        app,
+        max_size=app.config["TELEMETRY_BUFFER_MAX_SIZE"],
+        flush_size=app.config["TELEMETRY_BUFFER_FLUSH_SIZE"],
+        flush_interval=app.config["TELEMETRY_BUFFER_FLUSH_INTERVAL"],
+    )
+    app.extensions["ingest_buffer"] = buffer
+    atexit.register(buffer.stop)
+    return buffer
@@ -0,0 +1,124 @@
+import math
+import re
+from datetime import date
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional, see JSON_PROVIDER
+    orjson = None
+
+NON_ASCII = re.compile(r"[^\x00-\x7f]")
+
+
+def _escape_char(match) -> str:
+    code = ord(match.group())
+    if code > 0xFFFF:
+        code -= 0x10000
+        return "\\u%04x\\u%04x" % (0xD800 | (code >> 10), 0xDC00 | (code & 0x3FF))
+    return "\\u%04x" % code
+
+
+def escape_non_ascii(text: str) -> str:
+    """Escape non-ASCII characters the way ``json.dumps`` does by default."""
+    return text if text.isascii() else NON_ASCII.sub(_escape_char, text)
+
+
+def has_non_finite(obj) -> bool:
+    """True if ``obj`` holds a NaN or infinite float, which orjson writes as null."""
+    if isinstance(obj, float):
+        return not math.isfinite(obj)
+    if isinstance(obj, dict):
+        return any(map(has_non_finite, obj.values()))
+    if isinstance(obj, (list, tuple)):
+        return any(map(has_non_finite, obj))
+    return False
+
+
+def _default(o):
+    if isinstance(o, date):
+        return o.isoformat()
+    return DefaultJSONProvider.default(o)
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """Flask's default provider, with dates and datetimes as ISO 8601 strings."""
+
+    default = staticmethod(_default)
+
+
+class OrjsonProvider(StdlibJSONProvider):
+    """
+    JSON provider backed by orjson.
+
+    Output is equivalent to ``StdlibJSONProvider``'s: keys sorted, compact
+    separators, non-ASCII escaped, dates and datetimes as ISO 8601. It is
+    not byte for byte the same, as orjson spells some floats differently
+    (``0.00001`` for ``1e-05``, ``1e16`` for ``1e+16``); both parse to the
+    same value.
+
+    Values orjson cannot encode (e.g. integers beyond 64 bits) fall back to
+    the stdlib encoder, and so do NaN and infinities, which orjson would
+    silently turn into null.
+    """
+
+    def _options(self, indent) -> int:
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def _dumps(self, obj, indent=None) -> str | None:
+        try:
+            text = orjson.dumps(
+                obj, default=self.default, option=self._options(indent)
+            ).decode()
+        except TypeError:
+            return None
+        # Only look for non-finite floats when orjson may have nulled one.
+        if "null" in text and has_non_finite(obj):
+            return None
+        return escape_non_ascii(text) if self.ensure_ascii else text
+
+    def dumps(self, obj, **kwargs) -> str:
+        # orjson output is always compact; ``separators`` is accepted for
+        # callers that pass the compact form explicitly.
+        unsupported = set(kwargs) - {"separators", "indent", "sort_keys"}
+        sort_keys = kwargs.get("sort_keys", self.sort_keys)
+        if (
+            not unsupported
+            and sort_keys == self.sort_keys
+            and kwargs.get("separators", (",", ":")) == (",", ":")
+        ):
+            text = self._dumps(obj, kwargs.get("indent"))
+            if text is not None:
+                return text
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+
+def json_provider_class(setting: str):
+    """
+    Provider class for the JSON_PROVIDER setting: "orjson", "stdlib", or
+    "auto" (orjson when it is installed).
+    """
+    if setting == "stdlib" or (setting == "auto" and orjson is None):
+        return StdlibJSONProvider
+    if setting in ("orjson", "auto"):
+        if orjson is None:
+            raise RuntimeError("JSON_PROVIDER=orjson but orjson is not installed")
+        return OrjsonProvider
+    raise ValueError(f"unknown JSON_PROVIDER {setting!r}")
+
+
+def init_json_provider(app):
+    """Install the JSON provider selected by JSON_PROVIDER on ``app``."""
+    app.json = json_provider_class(app.config["JSON_PROVIDER"])(app)
+    return app.json
@@ -1,9 +1,12 @@
 from datetime import datetime
+from .compression import compress_payload, decompress_payload
 from .extensions import db
+from .schema import schema_indexes
 
 
 class Company(db.Model):
     __tablename__ = "companies"
+    __table_args__ = schema_indexes("companies")
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False)
@@ -19,6 +22,7 @@ class Company(db.Model):
 
 class Quarry(db.Model):
     __tablename__ = "quarries"
+    __table_args__ = schema_indexes("quarries")
 
     id = db.Column(db.Integer, primary_key=True)
     company_id = db.Column(db.Integer, db.ForeignKey("companies.id"), nullable=False)
@@ -50,6 +54,7 @@ class VehicleType(db.Model):
 
 class Vehicle(db.Model):
     __tablename__ = "vehicles"
+    __table_args__ = schema_indexes("vehicles")
 
     id = db.Column(db.Integer, primary_key=True)
     company_id = db.Column(db.Integer, db.ForeignKey("companies.id"), nullable=False)
@@ -74,6 +79,7 @@ class Vehicle(db.Model):
 
 class Driver(db.Model):
     __tablename__ = "drivers"
+    __table_args__ = schema_indexes("drivers")
 
     id = db.Column(db.Integer, primary_key=True)
     company_id = db.Column(db.Integer, db.ForeignKey("companies.id"), nullable=False)
@@ -100,6 +106,7 @@ class Driver(db.Model):
 
 class DriverAssignment(db.Model):
     __tablename__ = "driver_assignments"
+    __table_args__ = schema_indexes("driver_assignments")
 
     id = db.Column(db.Integer, primary_key=True)
     driver_id = db.Column(db.Integer, db.ForeignKey("drivers.id"), nullable=False)
@@ -113,6 +120,7 @@ class DriverAssignment(db.Model):
 
 class Shift(db.Model):
     __tablename__ = "shifts"
+    __table_args__ = schema_indexes("shifts")
 
     id = db.Column(db.Integer, primary_key=True)
     quarry_id = db.Column(db.Integer, db.ForeignKey("quarries.id"), nullable=False)
@@ -134,6 +142,7 @@ class Shift(db.Model):
 
 class MedicalCheck(db.Model):
     __tablename__ = "medical_checks"
+    __table_args__ = schema_indexes("medical_checks")
 
     id = db.Column(db.Integer, primary_key=True)
     driver_id = db.Column(db.Integer, db.ForeignKey("drivers.id"), nullable=False)
@@ -162,6 +171,7 @@ class DriverHealthStatus(db.Model):
 
 class VehicleShiftAssignment(db.Model):
     __tablename__ = "vehicle_shift_assignments"
+    __table_args__ = schema_indexes("vehicle_shift_assignments")
 
     id = db.Column(db.Integer, primary_key=True)
     vehicle_id = db.Column(db.Integer, db.ForeignKey("vehicles.id"), nullable=False)
@@ -179,6 +189,7 @@ class VehicleShiftAssignment(db.Model):
 
 class TelematicsReading(db.Model):
     __tablename__ = "telematics_readings"
+    __table_args__ = schema_indexes("telematics_readings")
 
     id = db.Column(db.Integer, primary_key=True)
     vehicle_id = db.Column(db.Integer, db.ForeignKey("vehicles.id"), nullable=False)
@@ -191,7 +202,6 @@ class TelematicsReading(db.Model):
     driver_health_status_id = db.Column(
         db.Integer, db.ForeignKey("driver_health_statuses.id")
     )
-    raw_payload = db.Column(db.Text)
 
     vehicle = db.relationship("Vehicle", back_populates="telematics_readings")
     driver = db.relationship("Driver", back_populates="telematics_readings")
@@ -199,3 +209,73 @@ class TelematicsReading(db.Model):
     driver_health_status = db.relationship(
         "DriverHealthStatus", back_populates="telematics_readings"
     )
+    stored_payload = db.relationship(
+        "TelematicsReadingPayload",
+        primaryjoin="and_("
+        "TelematicsReading.id == foreign(TelematicsReadingPayload.reading_id), "
+        "TelematicsReading.timestamp == foreign(TelematicsReadingPayload.timestamp))",
+        uselist=False,
+        cascade="all, delete-orphan",
+    )
+
+    @property
+    def raw_payload(self) -> str | None:
+        """The raw device payload, loaded from its side table on first access."""
+        payload = self.stored_payload
+        if payload is not None:
+            return payload.text
+        # Not moved out of a legacy raw_payload column yet.
+        from .payloads import legacy_raw_payload
+
+        return legacy_raw_payload(self.id)
+
+    @raw_payload.setter
+    def raw_payload(self, value: str | None) -> None:
+        self.stored_payload = (
+            TelematicsReadingPayload.for_text(value) if value is not None else None
+        )
+
+
+class TelematicsReadingPayload(db.Model):
+    """Compressed raw payload of a reading, kept out of the hot row."""
+
+    __tablename__ = "telematics_reading_payloads"
+
+    # No foreign key: a partitioned MySQL table cannot be referenced by one.
+    reading_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    # The reading's timestamp, so that the table is partitioned like the
+    # readings and retention drops both.
+    timestamp = db.Column(db.DateTime, primary_key=True)
+    codec = db.Column(db.String(8), nullable=False)
+    data = db.Column(db.LargeBinary, nullable=False)
+
+    @classmethod
+    def for_text(cls, text: str, **kwargs) -> "TelematicsReadingPayload":
+        codec, data = compress_payload(text)
+        return cls(codec=codec, data=data, **kwargs)
+
+    @property
+    def text(self) -> str:
+        return decompress_payload(self.codec, self.data)
+
+
+class TelemetryHourlyRollup(db.Model):
+    __tablename__ = "telemetry_hourly_rollups"
+    __table_args__ = schema_indexes("telemetry_hourly_rollups")
+
+    id = db.Column(db.Integer, primary_key=True)
+    vehicle_id = db.Column(db.Integer, db.ForeignKey("vehicles.id"), nullable=False)
+    hour_start = db.Column(db.DateTime, nullable=False)
+    reading_count = db.Column(db.Integer, nullable=False, default=0)
+    distance_km = db.Column(db.Float, nullable=False, default=0.0)
+    speed_count = db.Column(db.Integer, nullable=False, default=0)
+    speed_sum = db.Column(db.Float, nullable=False, default=0.0)
+    speed_min = db.Column(db.Float)
+    speed_max = db.Column(db.Float)
+    health_status_counts = db.Column(db.JSON, nullable=False, default=dict)
+    last_timestamp = db.Column(db.DateTime, nullable=False)
+    last_latitude = db.Column(db.Float)
+    last_longitude = db.Column(db.Float)
+    last_speed_kmh = db.Column(db.Float)
+
+    vehicle = db.relationship("Vehicle")
@@ -0,0 +1,156 @@
+from sqlalchemy import or_, select
+
+from .bulk import existing_ids
+from .extensions import db
+from .models import Quarry, Vehicle
+from .refdata import reference_data
+
+# Foreign keys served from the reference data cache.
+REFERENCE_TABLES = {"company_id": "companies", "vehicle_type_id": "vehicle_types"}
+
+# Columns with a UNIQUE constraint that a bulk import can collide on.
+UNIQUE_FIELDS = {"drivers": (), "vehicles": ("plate_number", "vin")}
+
+
+def _int_field(payload: dict, field: str) -> tuple[int | None, str | None]:
+    value = payload.get(field)
+    if value is not None and (isinstance(value, bool) or not isinstance(value, int)):
+        return None, f"{field} must be an integer"
+    return value, None
+
+
+def _str_field(
+    payload: dict, field: str, required: bool = False
+) -> tuple[str | None, str | None]:
+    value = payload.get(field)
+    if value is None or value == "":
+        return None, f"{field} is required" if required else None
+    if not isinstance(value, str):
+        return None, f"{field} must be a string"
+    return value, None
+
+
+def _validate(payload, str_fields: dict, int_fields: tuple):
+    if not isinstance(payload, dict):
+        return None, "item must be an object"
+    row = {"status": "active"}
+    for field, required in str_fields.items():
+        row[field], error = _str_field(payload, field, required)
+        if error:
+            return None, error
+    for field in int_fields:
+        row[field], error = _int_field(payload, field)
+        if error:
+            return None, error
+    return row, None
+
+
+def validate_driver(payload) -> tuple[dict | None, str | None]:
+    """
+    Validate one driver payload of a bulk import.
+
+    Returns ``(row, None)`` with a row for ``drivers`` or ``(None, message)``.
+    A missing ``company_id`` is left as ``None`` for the caller to default.
+    """
+    return _validate(
+        payload,
+        {"full_name": True, "license_number": False, "license_category": False},
+        ("company_id",),
+    )
+
+
+def validate_vehicle(payload) -> tuple[dict | None, str | None]:
+    """
+    Validate one vehicle payload of a bulk import.
+
+    Returns ``(row, None)`` with a row for ``vehicles`` or ``(None, message)``.
+    Missing ``company_id`` / ``vehicle_type_id`` are left as ``None`` for the
+    caller to default.
+    """
+    return _validate(
+        payload,
+        {"plate_number": True, "vin": False},
+        ("company_id", "vehicle_type_id", "current_quarry_id"),
+    )
+
+
+def check_bulk_references(rows: list[dict]) -> list[str | None]:
+    """
+    Check the foreign keys of validated rows with one lookup per referenced
+    table. Returns one error message (or ``None``) per row.
+    """
+    known = {}
+    for field, table in REFERENCE_TABLES.items():
+        if any(field in row for row in rows):
+            known[field] = reference_data().known_ids(
+                table, (row.get(field) for row in rows)
+            )
+    if any("current_quarry_id" in row for row in rows):
+        known["current_quarry_id"] = existing_ids(
+            Quarry, (row.get("current_quarry_id") for row in rows)
+        )
+
+    errors = []
+    for row in rows:
+        error = None
+        for field, ids in known.items():
+            value = row.get(field)
+            if value is not None and value not in ids:
+                error = f"unknown {field} {value}"
+                break
+        errors.append(error)
+    return errors
+
+
+def find_conflicts(model, rows: list[dict]) -> list[str | None]:
+    """
+    Find rows whose unique columns collide with an existing row or with an
+    earlier row of the same batch. Returns one message (or ``None``) per row.
+    """
+    fields = UNIQUE_FIELDS[model.__tablename__]
+    if not fields or not rows:
+        return [None] * len(rows)
+
+    values = {field: {row[field] for row in rows if row[field]} for field in fields}
+    taken = {field: set() for field in fields}
+    conditions = [
+        getattr(model, field).in_(values[field]) for field in fields if values[field]
+    ]
+    if conditions:
+        columns = [getattr(model, field) for field in fields]
+        for existing in db.session.execute(select(*columns).where(or_(*conditions))):
+            for field, value in zip(fields, existing):
+                taken[field].add(value)
+
+    errors = []
+    seen = {field: set() for field in fields}
+    for row in rows:
+        error = None
+        for field in fields:
+            value = row[field]
+            if not value:
+                continue
+            if value in taken[field]:
+                error = f"{field} {value} already exists"
+                break
+            if value in seen[field]:
+                error = f"duplicate {field} {value} in request"
+                break
+        if error is None:
+            for field in fields:
+                if row[field]:
+                    seen[field].add(row[field])
+        errors.append(error)
+    return errors
+
+
+def vehicle_ids_by_plate(plates: list[str]) -> list[int]:
+    """Ids of freshly inserted vehicles, for dialects without RETURNING."""
+    ids = dict(
+        db.session.execute(
+            select(Vehicle.plate_number, Vehicle.id).where(
+                Vehicle.plate_number.in_(plates)
+            )
+        ).all()
+    )
+    return [ids[plate] for plate in plates]
@@ -0,0 +1,106 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from urllib.parse import urlencode
+
+from flask import current_app, jsonify, request
+
+
+def encode_cursor(values: dict) -> str:
+    """Encode keyset values into an opaque, URL-safe cursor."""
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(token: str) -> dict:
+    """Decode a cursor produced by ``encode_cursor``. Raises ValueError."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("invalid cursor") from None
+    if not isinstance(values, dict):
+        raise ValueError("invalid cursor")
+    return values
+
+
+def encode_id_cursor(row_id: int) -> str:
+    """Cursor for keysets ordered by ``id``."""
+    return encode_cursor({"id": row_id})
+
+
+def decode_id_cursor(token: str) -> int:
+    """
+    Decode a cursor produced by ``encode_id_cursor``, or the id of one
+    produced by ``encode_time_cursor``. Raises ValueError.
+    """
+    row_id = decode_cursor(token).get("id")
+    if not isinstance(row_id, int):
+        raise ValueError("invalid cursor")
+    return row_id
+
+
+def encode_time_cursor(timestamp: datetime, row_id: int) -> str:
+    """Cursor for keysets ordered by ``(timestamp, id)``."""
+    return encode_cursor({"ts": timestamp.isoformat(), "id": row_id})
+
+
+def decode_time_cursor(token: str) -> tuple[datetime, int]:
+    """Decode a cursor produced by ``encode_time_cursor``. Raises ValueError."""
+    values = decode_cursor(token)
+    row_id = values.get("id")
+    if not isinstance(row_id, int) or not isinstance(values.get("ts"), str):
+        raise ValueError("invalid cursor")
+    return datetime.fromisoformat(values["ts"]), row_id
+
+
+def parse_limit() -> int:
+    """
+    Read ``limit`` from the query string, bounded by PAGE_MAX_LIMIT. Raises
+    ValueError unless it is absent or a positive integer.
+    """
+    value = request.args.get("limit")
+    if value is None:
+        return current_app.config["PAGE_DEFAULT_LIMIT"]
+    # Digits only: int() would also take signs, spaces and underscores.
+    if not (value.isascii() and value.isdigit()) or int(value) < 1:
+        raise ValueError("limit must be a positive integer")
+    return min(int(value), current_app.config["PAGE_MAX_LIMIT"])
+
+
+def wants_all() -> bool:
+    """True when the client explicitly asked for the unpaginated list."""
+    return request.args.get("all", "").lower() in ("1", "true", "yes")
+
+
+def paginate_by_id(query, model):
+    """
+    Apply keyset pagination on the primary key to ``query``.
+
+    Returns ``(items, next_cursor)``; ``next_cursor`` is ``None`` on the last
+    page. Raises ValueError for a malformed ``cursor`` or ``limit``.
+    """
+    limit = parse_limit()
+    token = request.args.get("cursor")
+    if token:
+        query = query.filter(model.id > decode_id_cursor(token))
+
+    items = query.order_by(model.id).limit(limit + 1).all()
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_id_cursor(items[-1].id)
+    return items, next_cursor
+
+
+def page_response(data: list, next_cursor: str | None):
+    """JSON array response carrying the next cursor in headers."""
+    response = jsonify(data)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+        args = request.args.to_dict()
+        args["cursor"] = next_cursor
+        next_url = f"{request.base_url}?{urlencode(args)}"
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return response
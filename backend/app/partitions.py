@@ -0,0 +1,492 @@
+"""
+Time partitioning of ``telematics_readings`` (TELEMETRY_PARTITIONING), and
+of ``telematics_reading_payloads`` alongside it.
+
+On MySQL the table is range partitioned on ``timestamp`` with one partition
+per month or day, plus ``pmax`` for anything newer. On SQLite each period
+is a table of its own (``telematics_readings_p2025_01`` ...); a view named
+``telematics_readings`` unions them and INSTEAD OF triggers route writes, so
+queries and inserts through the model are unchanged on both backends.
+
+Partitions are described by their upper bound only, as MySQL does: the
+first one also holds anything older, ``pmax`` anything newer. Retention
+drops whole partitions instead of deleting rows; payloads are keyed by
+their reading's timestamp so that theirs go with them.
+"""
+
+import re
+import weakref
+from datetime import datetime, timedelta
+
+from sqlalchemy import (
+    Column,
+    Index,
+    MetaData,
+    Table,
+    event,
+    func,
+    inspect,
+    select,
+    text,
+)
+from flask import current_app, has_app_context
+from sqlalchemy.engine import make_url
+
+from .extensions import db
+from .models import TelematicsReading, TelematicsReadingPayload, TelemetryHourlyRollup
+
+INTERVALS = ("month", "day")
+OVERFLOW = "pmax"
+PARTITION_NAME = re.compile(r"^p(\d{4})_(\d{2})(?:_(\d{2}))?$")
+
+# SQLite's default SQLITE_MAX_COMPOUND_SELECT; the view unions every table.
+SQLITE_MAX_PARTITIONS = 500
+
+
+def period_start(moment: datetime, interval: str) -> datetime:
+    if interval == "month":
+        return datetime(moment.year, moment.month, 1)
+    return datetime(moment.year, moment.month, moment.day)
+
+
+def next_period(start: datetime, interval: str) -> datetime:
+    if interval == "day":
+        return start + timedelta(days=1)
+    if start.month == 12:
+        return datetime(start.year + 1, 1, 1)
+    return datetime(start.year, start.month + 1, 1)
+
+
+def partition_name(start: datetime, interval: str) -> str:
+    return start.strftime("p%Y_%m" if interval == "month" else "p%Y_%m_%d")
+
+
+def partition_bound(name: str) -> datetime | None:
+    """Upper bound of a partition named by ``partition_name``."""
+    match = PARTITION_NAME.match(name)
+    if match is None:
+        return None
+    year, month, day = match.groups()
+    if day is None:
+        return next_period(datetime(int(year), int(month), 1), "month")
+    return next_period(datetime(int(year), int(month), int(day)), "day")
+
+
+def plan_partitions(start: datetime, until: datetime, interval: str) -> list[dict]:
+    """Partitions for the periods from ``start`` up to ``until``, exclusive."""
+    partitions = []
+    while start < until:
+        end = next_period(start, interval)
+        partitions.append({"name": partition_name(start, interval), "less_than": end})
+        start = end
+    return partitions
+
+
+class MySQLPartitions:
+    """Native RANGE COLUMNS partitioning of a table on its ``timestamp``."""
+
+    def __init__(self, table):
+        self.table = table
+
+    def is_partitioned(self, conn) -> bool:
+        return bool(self.partitions(conn))
+
+    def partitions(self, conn) -> list[dict]:
+        rows = conn.execute(
+            text(
+                "SELECT PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS "
+                "FROM information_schema.PARTITIONS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table "
+                "AND PARTITION_NAME IS NOT NULL "
+                "ORDER BY PARTITION_ORDINAL_POSITION"
+            ),
+            {"table": self.table.name},
+        )
+        return [
+            {
+                "name": name,
+                "less_than": (
+                    None
+                    if description == "MAXVALUE"
+                    else datetime.fromisoformat(description.strip("'"))
+                ),
+                "rows": table_rows,
+            }
+            for name, description, table_rows in rows
+        ]
+
+    def _definitions(self, partitions: list[dict]) -> str:
+        definitions = [
+            f"PARTITION {p['name']} VALUES LESS THAN "
+            f"('{p['less_than']:%Y-%m-%d %H:%M:%S}')"
+            for p in partitions
+        ]
+        definitions.append(f"PARTITION {OVERFLOW} VALUES LESS THAN (MAXVALUE)")
+        return ", ".join(definitions)
+
+    def enable(self, conn, partitions: list[dict]) -> None:
+        # Partitioned InnoDB tables cannot have foreign keys, and every
+        # unique key, the primary key included, must contain `timestamp`.
+        name = self.table.name
+        for foreign_key in inspect(conn).get_foreign_keys(name):
+            conn.exec_driver_sql(
+                f"ALTER TABLE `{name}` DROP FOREIGN KEY `{foreign_key['name']}`"
+            )
+        key = [column.name for column in self.table.primary_key.columns]
+        if "timestamp" not in key:
+            key.append("timestamp")
+        conn.exec_driver_sql(
+            f"ALTER TABLE `{name}` DROP PRIMARY KEY, "
+            f"ADD PRIMARY KEY ({', '.join(f'`{column}`' for column in key)})"
+        )
+        conn.exec_driver_sql(
+            f"ALTER TABLE `{name}` PARTITION BY RANGE COLUMNS(`timestamp`) "
+            f"({self._definitions(partitions)})"
+        )
+
+    def add(self, conn, partitions: list[dict]) -> None:
+        # pmax is empty unless rows arrived past the last partition, in which
+        # case only those rows are moved.
+        conn.exec_driver_sql(
+            f"ALTER TABLE `{self.table.name}` REORGANIZE PARTITION {OVERFLOW} "
+            f"INTO ({self._definitions(partitions)})"
+        )
+
+    def drop(self, conn, names: list[str]) -> None:
+        conn.exec_driver_sql(
+            f"ALTER TABLE `{self.table.name}` DROP PARTITION {', '.join(names)}"
+        )
+
+
+class SQLitePartitions:
+    """
+    Per-period tables behind a view with the table's name. An ``id`` column
+    is assigned from a sequence table, since the view cannot do it.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.sequence = f"{table.name}_seq" if "id" in table.c else None
+        self.columns = [column.name for column in table.columns]
+        self.key = [column.name for column in table.primary_key.columns]
+
+    def _table_name(self, partition: str) -> str:
+        return f"{self.table.name}_{partition}"
+
+    def is_partitioned(self, conn) -> bool:
+        kind = conn.execute(
+            text("SELECT type FROM sqlite_master WHERE name = :name"),
+            {"name": self.table.name},
+        ).scalar()
+        return kind == "view"
+
+    def partitions(self, conn) -> list[dict]:
+        prefix = f"{self.table.name}_"
+        names = conn.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'table'")
+        ).scalars()
+        partitions = []
+        for table_name in names:
+            name = table_name[len(prefix) :]
+            if table_name.startswith(prefix) and (
+                name == OVERFLOW or partition_bound(name) is not None
+            ):
+                # Counting would scan every table; MySQL gives an estimate.
+                partitions.append(
+                    {"name": name, "less_than": partition_bound(name), "rows": None}
+                )
+        # pmax sorts last.
+        partitions.sort(key=lambda p: p["less_than"] or datetime.max)
+        return partitions
+
+    def _create_table(self, conn, partition: str) -> None:
+        # Like the MySQL partitions, the tables carry no foreign keys.
+        table = Table(
+            self._table_name(partition),
+            MetaData(),
+            *(
+                Column(
+                    column.name,
+                    column.type,
+                    primary_key=column.primary_key,
+                    nullable=column.nullable,
+                )
+                for column in self.table.columns
+            ),
+        )
+        for index in self.table.indexes:
+            Index(
+                f"{index.name}_{partition}",
+                *(table.c[column.name] for column in index.columns),
+                unique=index.unique,
+            )
+        table.create(conn)
+
+    def _rebuild_view(self, conn, partitions: list[dict]) -> None:
+        if len(partitions) > SQLITE_MAX_PARTITIONS:
+            raise ValueError(
+                f"{len(partitions)} partitions exceed SQLite's limit of "
+                f"{SQLITE_MAX_PARTITIONS}; use monthly partitions or a "
+                "shorter TELEMETRY_RETENTION_DAYS"
+            )
+        name = self.table.name
+        columns = ", ".join(f'"{c}"' for c in self.columns)
+        # Rows inserted without an id take the next one from the sequence.
+        new_values = ", ".join(
+            (
+                f'COALESCE(NEW."id", (SELECT id FROM "{self.sequence}"))'
+                if c == "id" and self.sequence
+                else f'NEW."{c}"'
+            )
+            for c in self.columns
+        )
+        advance = (
+            f'UPDATE "{self.sequence}" SET id = COALESCE(NEW."id", id + 1) '
+            'WHERE NEW."id" IS NULL OR NEW."id" > id; '
+            if self.sequence
+            else ""
+        )
+        same_row = " AND ".join(f'"{c}" = OLD."{c}"' for c in self.key)
+        assignments = ", ".join(f'"{c}" = NEW."{c}"' for c in self.columns)
+        tables = [self._table_name(p["name"]) for p in partitions]
+
+        # Dropping the view also drops its triggers.
+        conn.exec_driver_sql(f'DROP VIEW IF EXISTS "{name}"')
+        conn.exec_driver_sql(
+            f'CREATE VIEW "{name}" AS '
+            + " UNION ALL ".join(f'SELECT {columns} FROM "{t}"' for t in tables)
+        )
+
+        lower = None
+        for partition, table_name in zip(partitions, tables):
+            upper = partition["less_than"]
+            conditions = []
+            if lower is not None:
+                conditions.append(f"NEW.\"timestamp\" >= '{lower:%Y-%m-%d %H:%M:%S}'")
+            if upper is not None:
+                conditions.append(f"NEW.\"timestamp\" < '{upper:%Y-%m-%d %H:%M:%S}'")
+            when = f"WHEN {' AND '.join(conditions)} " if conditions else ""
+            conn.exec_driver_sql(
+                f'CREATE TRIGGER "{table_name}_insert" INSTEAD OF INSERT '
+                f'ON "{name}" {when}BEGIN {advance}'
+                f'INSERT INTO "{table_name}" ({columns}) VALUES ({new_values}); '
+                "END"
+            )
+            lower = upper
+
+        conn.exec_driver_sql(
+            f'CREATE TRIGGER "{name}_update" INSTEAD OF UPDATE ON "{name}" BEGIN '
+            + "".join(
+                f'UPDATE "{t}" SET {assignments} WHERE {same_row}; ' for t in tables
+            )
+            + "END"
+        )
+        conn.exec_driver_sql(
+            f'CREATE TRIGGER "{name}_delete" INSTEAD OF DELETE ON "{name}" BEGIN '
+            + "".join(f'DELETE FROM "{t}" WHERE {same_row}; ' for t in tables)
+            + "END"
+        )
+
+    def enable(self, conn, partitions: list[dict]) -> None:
+        name = self.table.name
+        # Rows are copied through the view, which has the model's columns.
+        extra = [
+            column["name"]
+            for column in inspect(conn).get_columns(name)
+            if column["name"] not in self.columns
+        ]
+        if extra:
+            raise ValueError(
+                f"{name} has columns the model lacks ({', '.join(extra)}); "
+                "run `flask payloads-migrate --drop-column` first"
+            )
+        legacy = f"{name}_unpartitioned"
+        conn.exec_driver_sql(f'ALTER TABLE "{name}" RENAME TO "{legacy}"')
+        if self.sequence:
+            conn.exec_driver_sql(
+                f'CREATE TABLE "{self.sequence}" (id INTEGER NOT NULL)'
+            )
+            conn.exec_driver_sql(
+                f'INSERT INTO "{self.sequence}" '
+                f'SELECT COALESCE(MAX(id), 0) FROM "{legacy}"'
+            )
+        partitions = [*partitions, {"name": OVERFLOW, "less_than": None}]
+        for partition in partitions:
+            self._create_table(conn, partition["name"])
+        self._rebuild_view(conn, partitions)
+
+        columns = ", ".join(f'"{c}"' for c in self.columns)
+        conn.exec_driver_sql(
+            f'INSERT INTO "{name}" ({columns}) SELECT {columns} FROM "{legacy}"'
+        )
+        conn.exec_driver_sql(f'DROP TABLE "{legacy}"')
+
+    def add(self, conn, partitions: list[dict]) -> None:
+        for partition in partitions:
+            self._create_table(conn, partition["name"])
+        self._rebuild_view(conn, self.partitions(conn))
+
+        # Move rows that landed in pmax before their partition existed.
+        overflow = self._table_name(OVERFLOW)
+        bound = f"{partitions[-1]['less_than']:%Y-%m-%d %H:%M:%S}"
+        columns = ", ".join(f'"{c}"' for c in self.columns)
+        moved = f'FROM "{overflow}" WHERE "timestamp" < \'{bound}\''
+        conn.exec_driver_sql(
+            f'INSERT INTO "{self.table.name}" ({columns}) SELECT {columns} {moved}'
+        )
+        conn.exec_driver_sql(f"DELETE {moved}")
+
+    def drop(self, conn, names: list[str]) -> None:
+        kept = [p for p in self.partitions(conn) if p["name"] not in names]
+        self._rebuild_view(conn, kept)
+        for name in names:
+            conn.exec_driver_sql(f'DROP TABLE "{self._table_name(name)}"')
+
+    def refresh_view(self, conn) -> None:
+        """Recreate the view and its triggers from the model's columns."""
+        self._rebuild_view(conn, self.partitions(conn))
+
+    def reserve_ids(self, conn, count: int) -> range:
+        """Take ``count`` ids from the sequence, for rows inserted with them."""
+        last = conn.exec_driver_sql(
+            f'UPDATE "{self.sequence}" SET id = id + {int(count)} RETURNING id'
+        ).scalar()
+        return range(last - count + 1, last + 1)
+
+
+BACKENDS = {"mysql": MySQLPartitions, "sqlite": SQLitePartitions}
+
+PARTITIONED_TABLES = (TelematicsReading.__table__, TelematicsReadingPayload.__table__)
+
+# Version store entries bumped when partitions are dropped: the tables whose
+# cached responses may show dropped rows, and a marker for the position
+# cache, which then reloads.
+DROPPED_PARTITIONS = "telematics_partitions"
+DROP_INVALIDATES = (
+    TelematicsReading.__tablename__,
+    TelematicsReadingPayload.__tablename__,
+    TelemetryHourlyRollup.__tablename__,
+    DROPPED_PARTITIONS,
+)
+
+
+def partition_backend(url, table=None):
+    backend = make_url(url).get_backend_name()
+    if backend not in BACKENDS:
+        raise ValueError(f"telemetry partitioning is not supported on {backend}")
+    return BACKENDS[backend](
+        table if table is not None else TelematicsReading.__table__
+    )
+
+
+def maintain_partitions(
+    engine,
+    interval: str,
+    ahead: int,
+    retention_days: int = 0,
+    now: datetime | None = None,
+) -> dict:
+    """
+    Partition the readings and payload tables if they are not yet, create
+    partitions for the current period and ``ahead`` more, and drop those
+    entirely older than ``retention_days`` (0 keeps everything). Both
+    tables get the same partitions, so retention drops a reading and its
+    payload together.
+
+    Dropping bypasses the session, so inside an app context the app's
+    version store is bumped for ``DROP_INVALIDATES`` afterwards.
+    """
+    if interval not in INTERVALS:
+        raise ValueError(f"unknown partition interval {interval}")
+    now = now or datetime.utcnow()
+    until = period_start(now, interval)
+    for _ in range(ahead + 1):
+        until = next_period(until, interval)
+    cutoff = now - timedelta(days=retention_days) if retention_days else None
+
+    created = {}
+    dropped = {}
+    with engine.begin() as conn:
+        for table in PARTITIONED_TABLES:
+            backend = partition_backend(engine.url, table)
+            if not backend.is_partitioned(conn):
+                oldest = conn.execute(select(func.min(table.c.timestamp))).scalar()
+                start = max(filter(None, (oldest, cutoff)), default=now)
+                plan = plan_partitions(period_start(start, interval), until, interval)
+                backend.enable(conn, plan)
+                created.update(dict.fromkeys(p["name"] for p in plan))
+            else:
+                bounds = [p["less_than"] for p in backend.partitions(conn)]
+                last = max(filter(None, bounds), default=None)
+                plan = plan_partitions(
+                    last or period_start(now, interval), until, interval
+                )
+                if plan:
+                    backend.add(conn, plan)
+                    created.update(dict.fromkeys(p["name"] for p in plan))
+
+            if cutoff is not None:
+                expired = [
+                    p["name"]
+                    for p in backend.partitions(conn)
+                    if p["less_than"] is not None and p["less_than"] <= cutoff
+                ]
+                if expired:
+                    backend.drop(conn, expired)
+                    dropped.update(dict.fromkeys(expired))
+
+    store = current_app.extensions.get("version_store") if has_app_context() else None
+    if dropped and store is not None:
+        store.bump(DROP_INVALIDATES)
+    return {"created": list(created), "dropped": list(dropped)}
+
+
+def partition_status(engine) -> list[dict]:
+    backend = partition_backend(engine.url)
+    with engine.connect() as conn:
+        if not backend.is_partitioned(conn):
+            return []
+        return backend.partitions(conn)
+
+
+# Engines whose readings go through the SQLite partition view. The view
+# cannot report the ids it assigns, so rows get theirs from the sequence
+# before they are inserted.
+_sequenced_engines = weakref.WeakSet()
+
+
+def use_reading_id_sequence(engine, config) -> None:
+    """Have readings inserted through ``engine`` take ids from the sequence."""
+    interval = config["TELEMETRY_PARTITIONING"]
+    if interval != "none" and engine.dialect.name == "sqlite":
+        _sequenced_engines.add(engine)
+
+
+def reading_id_sequence(conn) -> SQLitePartitions | None:
+    """The partitions whose sequence assigns reading ids on ``conn``, if any."""
+    if conn.engine in _sequenced_engines:
+        return SQLitePartitions(TelematicsReading.__table__)
+    return None
+
+
+@event.listens_for(TelematicsReading, "before_insert")
+def _reserve_reading_id(mapper, connection, target):
+    sequence = reading_id_sequence(connection)
+    if sequence is not None and target.id is None:
+        target.id = sequence.reserve_ids(connection, 1)[0]
+
+
+def init_partitioning(app) -> None:
+    """
+    Validate TELEMETRY_PARTITIONING. On SQLite, also have reading ids taken
+    from the sequence table on the app's engine, since inserts go through
+    the view.
+    """
+    interval = app.config["TELEMETRY_PARTITIONING"]
+    if interval == "none":
+        return
+    if interval not in INTERVALS:
+        raise ValueError(f"unknown TELEMETRY_PARTITIONING {interval}")
+    partition_backend(app.config["SQLALCHEMY_DATABASE_URI"])
+    with app.app_context():
+        use_reading_id_sequence(db.engine, app.config)
@@ -0,0 +1,198 @@
+"""
+Raw device payloads of telematics readings, kept compressed in
+``telematics_reading_payloads`` (keyed by reading id) instead of in the
+readings row, so that scans of the readings table do not carry them.
+``TelematicsReading.raw_payload`` loads one on demand.
+
+``migrate_raw_payloads`` moves payloads out of a ``raw_payload`` column
+left by older schemas; ``flask init-db`` runs it on deployment, and until
+then ``raw_payload`` falls back to that column.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import column, inspect, insert, select, table, update
+from sqlalchemy.exc import DBAPIError
+
+from .bulk import bulk_insert, returns_ids
+from .compression import compress_payload
+from .extensions import db
+from .models import TelematicsReading, TelematicsReadingPayload
+from .partitions import SQLitePartitions, reading_id_sequence
+
+
+def payload_row(reading_id: int, timestamp: datetime, text: str) -> dict:
+    codec, data = compress_payload(text)
+    return {
+        "reading_id": reading_id,
+        "timestamp": timestamp,
+        "codec": codec,
+        "data": data,
+    }
+
+
+def insert_payloads(rows: list[dict], session) -> None:
+    # Not bulk_insert: the payload table has no id to return.
+    if rows:
+        session.execute(insert(TelematicsReadingPayload.__table__), rows)
+
+
+def bulk_insert_readings(rows: list[dict], session=None) -> list[int] | None:
+    """
+    ``bulk_insert`` for readings whose rows may carry a ``raw_payload``,
+    which is written compressed to the payload table under the ids the
+    insert returns. The caller owns the transaction.
+
+    On a dialect where ``bulk_insert`` cannot report ids, rows with a
+    payload are inserted one at a time instead; returns None then.
+    """
+    session = session or db.session
+    readings = [
+        {key: value for key, value in row.items() if key != "raw_payload"}
+        for row in rows
+    ]
+    sequence = reading_id_sequence(session.connection()) if readings else None
+    if sequence is not None:
+        ids = sequence.reserve_ids(session.connection(), len(readings))
+        for reading, reading_id in zip(readings, ids):
+            reading["id"] = reading_id
+    if all(row.get("raw_payload") is None for row in rows):
+        return bulk_insert(TelematicsReading, readings, session)
+
+    if returns_ids(session.get_bind().dialect):
+        ids = bulk_insert(TelematicsReading, readings, session)
+        pairs = zip(ids, rows)
+    else:
+        ids = None
+        bulk_insert(
+            TelematicsReading,
+            [r for r, row in zip(readings, rows) if row.get("raw_payload") is None],
+            session,
+        )
+        pairs = [
+            (
+                session.execute(
+                    insert(TelematicsReading.__table__), reading
+                ).inserted_primary_key[0],
+                row,
+            )
+            for reading, row in zip(readings, rows)
+            if row.get("raw_payload") is not None
+        ]
+    insert_payloads(
+        [
+            payload_row(reading_id, row["timestamp"], row["raw_payload"])
+            for reading_id, row in pairs
+            if row.get("raw_payload") is not None
+        ],
+        session,
+    )
+    return ids
+
+
+# Per database URL, whether the readings table still has raw_payload.
+_legacy_column = {}
+
+
+def _has_legacy_column(engine) -> bool:
+    url = str(engine.url)
+    if url not in _legacy_column:
+        columns = inspect(engine).get_columns(TelematicsReading.__tablename__)
+        _legacy_column[url] = "raw_payload" in {c["name"] for c in columns}
+    return _legacy_column[url]
+
+
+def legacy_raw_payload(reading_id: int) -> str | None:
+    """
+    A payload still in the readings row because ``migrate_raw_payloads``
+    has not reached it yet, or None once the column is gone.
+    """
+    engine = db.engine
+    if reading_id is None or not _has_legacy_column(engine):
+        return None
+    readings = table(
+        TelematicsReading.__tablename__, column("id"), column("raw_payload")
+    )
+    try:
+        return db.session.execute(
+            select(readings.c.raw_payload).where(readings.c.id == reading_id)
+        ).scalar()
+    except DBAPIError:
+        # Dropped by another process since we looked.
+        _legacy_column[str(engine.url)] = False
+        return None
+
+
+def legacy_payload_tables(engine) -> list[str]:
+    """
+    Physical readings tables that still have a ``raw_payload`` column: the
+    readings table itself, or its partition tables on SQLite.
+    """
+    name = TelematicsReading.__tablename__
+    inspector = inspect(engine)
+    return [
+        table_name
+        for table_name in inspector.get_table_names()
+        if (table_name == name or table_name.startswith(f"{name}_"))
+        and "raw_payload" in {c["name"] for c in inspector.get_columns(table_name)}
+    ]
+
+
+def migrate_raw_payloads(batch_size: int, drop_column: bool = False) -> dict:
+    """
+    Move every non-null ``raw_payload`` into the payload table, inside an
+    app context, ``batch_size`` rows per transaction in id order. Each
+    batch clears the column for the rows it moved, so an interrupted run
+    resumes where it stopped.
+
+    With ``drop_column`` the emptied column is dropped afterwards.
+    """
+    session = db.session
+    tables = legacy_payload_tables(db.engine)
+    moved = 0
+    for table_name in tables:
+        source = table(
+            table_name,
+            column("id"),
+            column("timestamp", TelematicsReading.timestamp.type),
+            column("raw_payload"),
+        )
+        last_id = 0
+        while True:
+            rows = session.execute(
+                select(source.c.id, source.c.timestamp, source.c.raw_payload)
+                .where(source.c.id > last_id, source.c.raw_payload.is_not(None))
+                .order_by(source.c.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            insert_payloads([payload_row(*row) for row in rows], session)
+            session.execute(
+                update(source)
+                .where(source.c.id.in_([row.id for row in rows]))
+                .values(raw_payload=None)
+            )
+            session.commit()
+            moved += len(rows)
+            last_id = rows[-1].id
+
+    if drop_column and tables:
+        with db.engine.begin() as conn:
+            _drop_raw_payload(conn, tables)
+        _legacy_column.pop(str(db.engine.url), None)
+    return {"rows": moved, "tables": tables, "dropped": drop_column}
+
+
+def _drop_raw_payload(conn, tables: list[str]) -> None:
+    if conn.dialect.name == "sqlite":
+        # SQLite refuses to drop a column that the partition view or its
+        # triggers name; rebuild them from the model first.
+        partitions = SQLitePartitions(TelematicsReading.__table__)
+        if partitions.is_partitioned(conn):
+            partitions.refresh_view(conn)
+    for table_name in tables:
+        conn.exec_driver_sql(
+            f"ALTER TABLE {conn.dialect.identifier_preparer.quote(table_name)} "
+            "DROP COLUMN raw_payload"
+        )
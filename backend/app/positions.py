@@ -0,0 +1,204 @@
+import atexit
+import logging
+import os
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import and_, event, func, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from .extensions import db
+from .models import TelematicsReading
+from .partitions import DROPPED_PARTITIONS
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ("timestamp", "latitude", "longitude", "speed_kmh")
+
+# Readings committed by other workers can become visible out of id order, so
+# every sync re-reads this many ids below the previous high-water mark.
+SYNC_ID_OVERLAP = 1000
+
+
+class PositionCache:
+    """
+    Latest telemetry reading per vehicle, kept in process memory.
+
+    Updated from committed ingest transactions of this process. A
+    background thread, started by the first snapshot in each process, syncs
+    it with readings written by other processes every ``sync_interval``
+    seconds, so snapshots never wait on the database.
+    """
+
+    def __init__(self, app, sync_interval: float):
+        self.app = app
+        self.sync_interval = sync_interval
+        self._lock = threading.Lock()
+        self._positions = {}
+        self._high_water_id = 0
+        self._synced_at = None
+        self._stopping = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._partitions_version = None
+
+    @staticmethod
+    def _merge(positions: dict, rows) -> None:
+        for row in rows:
+            current = positions.get(row["vehicle_id"])
+            if current is None or row["timestamp"] >= current["timestamp"]:
+                positions[row["vehicle_id"]] = {
+                    field: row.get(field) for field in FIELDS
+                }
+
+    def update(self, rows) -> None:
+        """Keep each row that is newer than the cached position of its vehicle."""
+        with self._lock:
+            self._merge(self._positions, rows)
+
+    def _dropped_partitions_version(self) -> str | None:
+        store = current_app.extensions.get("version_store")
+        return store.get(DROPPED_PARTITIONS) if store is not None else None
+
+    def warm(self) -> None:
+        """
+        Load the latest reading of every vehicle from the database, replacing
+        what the cache holds.
+        """
+        partitions_version = self._dropped_partitions_version()
+        reading = TelematicsReading
+        high_water_id = db.session.execute(select(func.max(reading.id))).scalar()
+        latest = (
+            select(reading.vehicle_id, func.max(reading.timestamp).label("timestamp"))
+            .group_by(reading.vehicle_id)
+            .subquery()
+        )
+        rows = db.session.execute(
+            select(reading.vehicle_id, *(getattr(reading, f) for f in FIELDS)).join(
+                latest,
+                and_(
+                    reading.vehicle_id == latest.c.vehicle_id,
+                    reading.timestamp == latest.c.timestamp,
+                ),
+            )
+        ).mappings()
+        positions = {}
+        self._merge(positions, rows)
+        with self._lock:
+            self._positions = positions
+        self._high_water_id = high_water_id or 0
+        self._partitions_version = partitions_version
+        self._synced_at = time.monotonic()
+
+    def sync(self) -> None:
+        """Pick up readings written by other processes, inside an app context."""
+        if self._synced_at is None:
+            self.warm()
+            return
+        if self._dropped_partitions_version() != self._partitions_version:
+            # Retention dropped readings that may be cached positions.
+            self.warm()
+            return
+
+        reading = TelematicsReading
+        rows = (
+            db.session.execute(
+                select(
+                    reading.id,
+                    reading.vehicle_id,
+                    *(getattr(reading, f) for f in FIELDS)
+                )
+                .where(reading.id > self._high_water_id - SYNC_ID_OVERLAP)
+                .order_by(reading.id)
+            )
+            .mappings()
+            .all()
+        )
+        self.update(rows)
+        if rows:
+            self._high_water_id = max(self._high_water_id, rows[-1]["id"])
+        self._synced_at = time.monotonic()
+
+    def _ensure_started(self) -> None:
+        pid = os.getpid()
+        if self._pid == pid and self._thread is not None:
+            return
+        with self._lock:
+            if self._pid == pid and self._thread is not None:
+                return
+            # A forked worker starts its own thread.
+            self._pid = pid
+            self._stopping = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run, name="position-cache-sync", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        stopping = self._stopping
+        delay = 0 if self._synced_at is None else self.sync_interval
+        while not stopping.wait(delay):
+            with self.app.app_context():
+                try:
+                    self.sync()
+                except Exception:
+                    logger.exception("Failed to sync the position cache")
+                finally:
+                    db.session.remove()
+            delay = self.sync_interval
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the sync thread of this process."""
+        self._stopping.set()
+        thread = self._thread
+        if thread is not None and self._pid == os.getpid():
+            thread.join(timeout)
+
+    def snapshot(self) -> list[dict]:
+        """The cached positions, by vehicle id; never queries the database."""
+        self._ensure_started()
+        with self._lock:
+            items = sorted(self._positions.items())
+        return [
+            {"vehicle_id": vehicle_id, **position} for vehicle_id, position in items
+        ]
+
+
+def init_position_cache(app) -> PositionCache:
+    """Attach the cache to ``app``, warming it from the database if configured."""
+    cache = PositionCache(app, app.config["POSITION_CACHE_SYNC_SECONDS"])
+    app.extensions["position_cache"] = cache
+    if app.config["POSITION_CACHE_WARM_ON_STARTUP"]:
+        with app.app_context():
+            try:
+                cache.warm()
+            except SQLAlchemyError as exc:
+                # e.g. before `flask init-db` has created the tables.
+                logger.warning(
+                    "Position cache not warmed at startup (%s); it warms in the background",
+                    getattr(exc, "orig", exc),
+                )
+    atexit.register(cache.stop)
+    return cache
+
+
+@event.listens_for(db.session, "after_commit")
+def _apply_pending_positions(session):
+    rows = session.info.pop("pending_positions", None)
+    cache = current_app.extensions.get("position_cache") if rows else None
+    if cache is not None:
+        cache.update(rows)
+
+
+@event.listens_for(db.session, "after_rollback")
+def _discard_pending_positions(session):
+    session.info.pop("pending_positions", None)
+
+
+def record_positions(rows: list[dict]) -> None:
+    """Queue ``rows`` for the position cache until the transaction commits."""
+    db.session.info.setdefault("pending_positions", []).extend(
+        {"vehicle_id": row["vehicle_id"], **{f: row.get(f) for f in FIELDS}}
+        for row in rows
+    )
@@ -0,0 +1,92 @@
+import threading
+
+from flask import current_app
+from sqlalchemy import select
+
+from .extensions import db
+from .models import Company, DriverHealthStatus, VehicleType
+
+MODELS = {
+    "companies": Company,
+    "vehicle_types": VehicleType,
+    "driver_health_statuses": DriverHealthStatus,
+}
+
+
+class ReferenceData:
+    """
+    Ids of companies and vehicle types and the driver health status codes,
+    held in memory.
+
+    The data is reloaded when the version of one of its tables changes
+    (see ``versions``). It is also reloaded once when an id is not found,
+    which covers rows written by another worker with a per-process version
+    store.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = None
+        self._ids = {table: [] for table in MODELS}
+        self._id_sets = {table: set() for table in MODELS}
+        self._health_status_codes = {}
+
+    def _table_versions(self) -> tuple:
+        store = current_app.extensions["version_store"]
+        return tuple(store.get(table) for table in MODELS)
+
+    def reload(self) -> None:
+        versions = self._table_versions()
+        ids = {
+            table: list(
+                db.session.execute(select(model.id).order_by(model.id)).scalars()
+            )
+            for table, model in MODELS.items()
+        }
+        codes = dict(
+            db.session.execute(
+                select(DriverHealthStatus.code, DriverHealthStatus.id)
+            ).all()
+        )
+        with self._lock:
+            self._ids = ids
+            self._id_sets = {table: set(values) for table, values in ids.items()}
+            self._health_status_codes = codes
+            self._versions = versions
+
+    def _ensure_fresh(self) -> None:
+        if self._versions != self._table_versions():
+            self.reload()
+
+    def first_id(self, table: str) -> int | None:
+        """Lowest id in ``table``, the default used when a payload omits it."""
+        self._ensure_fresh()
+        ids = self._ids[table]
+        return ids[0] if ids else None
+
+    def known_ids(self, table: str, ids) -> set:
+        """Subset of ``ids`` that exist in ``table``."""
+        ids = {i for i in ids if i is not None}
+        self._ensure_fresh()
+        if not ids <= self._id_sets[table]:
+            self.reload()
+        return ids & self._id_sets[table]
+
+    def exists(self, table: str, row_id) -> bool:
+        return bool(self.known_ids(table, [row_id]))
+
+    def health_status_id(self, code: str) -> int | None:
+        self._ensure_fresh()
+        if code not in self._health_status_codes:
+            self.reload()
+        return self._health_status_codes.get(code)
+
+
+def init_reference_data(app) -> ReferenceData:
+    reference = ReferenceData()
+    app.extensions["reference_data"] = reference
+    return reference
+
+
+def reference_data() -> ReferenceData:
+    return current_app.extensions["reference_data"]
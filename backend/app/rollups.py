@@ -0,0 +1,371 @@
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from sqlalchemy import and_, case, delete, func, or_, select
+from sqlalchemy.dialects import mysql, sqlite
+
+from .bulk import bulk_insert
+from .extensions import db
+from .models import TelematicsReading, TelemetryHourlyRollup
+
+HOUR = timedelta(hours=1)
+EARTH_RADIUS_KM = 6371.0088
+
+
+def hour_floor(timestamp: datetime) -> datetime:
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = (
+        math.sin(d_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def _summarise(readings) -> list[dict]:
+    """
+    Build rollup rows from readings ordered by vehicle, timestamp and id.
+
+    Distance is the sum of the great-circle distances between consecutive
+    positioned readings inside the same hour.
+    """
+    rollups = {}
+    previous_position = {}
+    for reading in readings:
+        key = (reading.vehicle_id, hour_floor(reading.timestamp))
+        rollup = rollups.get(key)
+        if rollup is None:
+            rollup = rollups[key] = {
+                "vehicle_id": key[0],
+                "hour_start": key[1],
+                "reading_count": 0,
+                "distance_km": 0.0,
+                "speed_count": 0,
+                "speed_sum": 0.0,
+                "speed_min": None,
+                "speed_max": None,
+                "health_status_counts": defaultdict(int),
+            }
+            previous_position.pop(key, None)
+
+        rollup["reading_count"] += 1
+        speed = reading.speed_kmh
+        if speed is not None:
+            rollup["speed_count"] += 1
+            rollup["speed_sum"] += speed
+            rollup["speed_min"] = (
+                speed
+                if rollup["speed_min"] is None
+                else min(rollup["speed_min"], speed)
+            )
+            rollup["speed_max"] = (
+                speed
+                if rollup["speed_max"] is None
+                else max(rollup["speed_max"], speed)
+            )
+        if reading.driver_health_status_id is not None:
+            rollup["health_status_counts"][str(reading.driver_health_status_id)] += 1
+
+        if reading.latitude is not None and reading.longitude is not None:
+            previous = previous_position.get(key)
+            if previous is not None:
+                rollup["distance_km"] += haversine_km(
+                    previous[0], previous[1], reading.latitude, reading.longitude
+                )
+            previous_position[key] = (reading.latitude, reading.longitude)
+
+        rollup["last_timestamp"] = reading.timestamp
+        rollup["last_latitude"] = reading.latitude
+        rollup["last_longitude"] = reading.longitude
+        rollup["last_speed_kmh"] = speed
+
+    for rollup in rollups.values():
+        rollup["health_status_counts"] = dict(rollup["health_status_counts"])
+    return list(rollups.values())
+
+
+def _readings(condition, session=None):
+    reading = TelematicsReading
+    return (session or db.session).execute(
+        select(
+            reading.vehicle_id,
+            reading.timestamp,
+            reading.latitude,
+            reading.longitude,
+            reading.speed_kmh,
+            reading.driver_health_status_id,
+        )
+        .where(condition)
+        .order_by(reading.vehicle_id, reading.timestamp, reading.id)
+    )
+
+
+def haversine_sql(lat1, lon1, lat2, lon2):
+    """``haversine_km`` as an SQL expression (MySQL, SQLite 3.35+)."""
+    d_phi = func.radians(lat2 - lat1)
+    d_lambda = func.radians(lon2 - lon1)
+    a = func.pow(func.sin(d_phi / 2), 2) + func.cos(func.radians(lat1)) * func.cos(
+        func.radians(lat2)
+    ) * func.pow(func.sin(d_lambda / 2), 2)
+    return 2 * EARTH_RADIUS_KM * func.asin(func.sqrt(a))
+
+
+def _first_positions(readings) -> dict:
+    """The first positioned reading of each rollup in ``readings``."""
+    first = {}
+    for reading in readings:
+        key = (reading.vehicle_id, hour_floor(reading.timestamp))
+        if (
+            key not in first
+            and reading.latitude is not None
+            and reading.longitude is not None
+        ):
+            first[key] = reading
+    return first
+
+
+def _merge(table, delta: dict, first) -> list[tuple]:
+    """
+    SET clauses adding ``delta`` to the existing rollup row. Ordered for
+    MySQL, which lets later assignments see earlier ones: everything that
+    reads the stored last reading comes before it is replaced.
+    """
+    c = table.c
+    newer = c.last_timestamp <= delta["last_timestamp"]
+    distance = c.distance_km + delta["distance_km"]
+    if first is not None:
+        distance = distance + case(
+            (
+                and_(
+                    c.last_latitude.is_not(None),
+                    c.last_longitude.is_not(None),
+                    c.last_timestamp <= first.timestamp,
+                ),
+                haversine_sql(
+                    c.last_latitude, c.last_longitude, first.latitude, first.longitude
+                ),
+            ),
+            else_=0.0,
+        )
+
+    clauses = [
+        (c.reading_count, c.reading_count + delta["reading_count"]),
+        (c.speed_count, c.speed_count + delta["speed_count"]),
+        (c.speed_sum, c.speed_sum + delta["speed_sum"]),
+        (c.distance_km, distance),
+    ]
+    if delta["speed_min"] is not None:
+        clauses.append(
+            (
+                c.speed_min,
+                case(
+                    (
+                        or_(c.speed_min.is_(None), c.speed_min > delta["speed_min"]),
+                        delta["speed_min"],
+                    ),
+                    else_=c.speed_min,
+                ),
+            )
+        )
+        clauses.append(
+            (
+                c.speed_max,
+                case(
+                    (
+                        or_(c.speed_max.is_(None), c.speed_max < delta["speed_max"]),
+                        delta["speed_max"],
+                    ),
+                    else_=c.speed_max,
+                ),
+            )
+        )
+    if delta["health_status_counts"]:
+        arguments = []
+        for status_id, count in sorted(delta["health_status_counts"].items()):
+            path = f'$."{status_id}"'
+            arguments += [
+                path,
+                func.coalesce(func.json_extract(c.health_status_counts, path), 0)
+                + count,
+            ]
+        clauses.append(
+            (
+                c.health_status_counts,
+                func.json_set(c.health_status_counts, *arguments),
+            )
+        )
+    for name in ("last_latitude", "last_longitude", "last_speed_kmh"):
+        value = delta[name]
+        clauses.append((c[name], case((newer, value), else_=c[name])))
+    clauses.append(
+        (
+            c.last_timestamp,
+            case((newer, delta["last_timestamp"]), else_=c.last_timestamp),
+        )
+    )
+    return clauses
+
+
+def add_to_rollups(rows: list[dict], session=None) -> int:
+    """
+    Add freshly inserted reading rows to their ``(vehicle_id, hour_start)``
+    rollups with one upsert per rollup (ON DUPLICATE KEY UPDATE on MySQL,
+    ON CONFLICT DO UPDATE on SQLite), without reading the hour back. Runs
+    inside the caller's transaction; ``session`` defaults to ``db.session``.
+
+    Counts, sums, min/max and health status counts are exact. Distance is
+    extended from the stored last position, so it is only exact for
+    readings that arrive in timestamp order within the hour and when the
+    last stored reading had a position; ``flask rollups-rebuild`` recomputes
+    it after a backfill.
+    """
+    if not rows:
+        return 0
+    readings = sorted(
+        (SimpleNamespace(**row) for row in rows),
+        key=lambda r: (r.vehicle_id, r.timestamp),
+    )
+    first = _first_positions(readings)
+    session = session or db.session
+    table = TelemetryHourlyRollup.__table__
+    upsert = UPSERTS[session.get_bind().dialect.name]
+
+    # Deltas come out ordered by vehicle and hour; taking the row locks in
+    # that order keeps concurrent writers from deadlocking each other.
+    deltas = _summarise(readings)
+    for delta in deltas:
+        key = (delta["vehicle_id"], delta["hour_start"])
+        session.execute(upsert(table, delta, _merge(table, delta, first.get(key))))
+    return len(deltas)
+
+
+def _mysql_upsert(table, row: dict, clauses: list[tuple]):
+    return mysql.insert(table).values(row).on_duplicate_key_update(clauses)
+
+
+def _sqlite_upsert(table, row: dict, clauses: list[tuple]):
+    return (
+        sqlite.insert(table)
+        .values(row)
+        .on_conflict_do_update(
+            index_elements=[table.c.vehicle_id, table.c.hour_start],
+            set_={column.name: value for column, value in clauses},
+        )
+    )
+
+
+UPSERTS = {"mysql": _mysql_upsert, "sqlite": _sqlite_upsert}
+
+
+def rebuild_rollups(
+    since: datetime,
+    until: datetime,
+    vehicle_id: int | None = None,
+    chunk: timedelta = timedelta(days=1),
+) -> int:
+    """
+    Recompute every rollup between ``since`` and ``until`` (rounded out to
+    whole hours), committing one ``chunk`` of time at a time.
+    """
+    reading = TelematicsReading
+    rollup = TelemetryHourlyRollup
+    start = hour_floor(since)
+    end = hour_floor(until) + (HOUR if until != hour_floor(until) else timedelta(0))
+
+    written = 0
+    while start < end:
+        stop = min(start + chunk, end)
+        reading_condition = and_(reading.timestamp >= start, reading.timestamp < stop)
+        rollup_condition = and_(rollup.hour_start >= start, rollup.hour_start < stop)
+        if vehicle_id is not None:
+            reading_condition = and_(
+                reading_condition, reading.vehicle_id == vehicle_id
+            )
+            rollup_condition = and_(rollup_condition, rollup.vehicle_id == vehicle_id)
+
+        rows = _summarise(_readings(reading_condition))
+        db.session.execute(delete(rollup.__table__).where(rollup_condition))
+        bulk_insert(rollup, rows)
+        db.session.commit()
+        written += len(rows)
+        start = stop
+    return written
+
+
+def hourly_buckets(vehicle_id: int, since: datetime, until: datetime):
+    """
+    Rollup rows for one vehicle in the hours overlapping ``[since, until)``,
+    shaped like ``aggregation.speed_buckets`` results.
+    """
+    rollup = TelemetryHourlyRollup
+    return db.session.execute(
+        select(
+            rollup.hour_start,
+            rollup.reading_count.label("count"),
+            rollup.speed_min,
+            rollup.speed_max,
+            (rollup.speed_sum / func.nullif(rollup.speed_count, 0)).label("speed_avg"),
+            rollup.last_speed_kmh.label("speed_last"),
+            rollup.last_latitude.label("latitude"),
+            rollup.last_longitude.label("longitude"),
+            rollup.last_timestamp,
+        )
+        .where(
+            rollup.vehicle_id == vehicle_id,
+            rollup.hour_start >= hour_floor(since),
+            rollup.hour_start < until,
+        )
+        .order_by(rollup.hour_start)
+    ).all()
+
+
+def fleet_report(since: datetime, until: datetime) -> list[dict]:
+    """Per-vehicle totals over the hours overlapping ``[since, until)``."""
+    rollup = TelemetryHourlyRollup
+    window = and_(rollup.hour_start >= hour_floor(since), rollup.hour_start < until)
+    totals = db.session.execute(
+        select(
+            rollup.vehicle_id,
+            func.sum(rollup.reading_count).label("reading_count"),
+            func.sum(rollup.distance_km).label("distance_km"),
+            func.max(rollup.speed_max).label("speed_max"),
+            func.sum(rollup.speed_sum).label("speed_sum"),
+            func.sum(rollup.speed_count).label("speed_count"),
+        )
+        .where(window)
+        .group_by(rollup.vehicle_id)
+        .order_by(rollup.vehicle_id)
+    ).all()
+
+    health = defaultdict(lambda: defaultdict(int))
+    counts = db.session.execute(
+        select(rollup.vehicle_id, rollup.health_status_counts).where(window)
+    )
+    for vehicle_id, status_counts in counts:
+        for status_id, count in (status_counts or {}).items():
+            health[vehicle_id][status_id] += count
+
+    report = []
+    for row in totals:
+        report.append(
+            {
+                "vehicle_id": row.vehicle_id,
+                "reading_count": int(row.reading_count),
+                "distance_km": float(row.distance_km),
+                "speed_max": row.speed_max,
+                "speed_avg": (
+                    float(row.speed_sum) / int(row.speed_count)
+                    if row.speed_count
+                    else None
+                ),
+                "health_status_counts": dict(health[row.vehicle_id]),
+            }
+        )
+    return report
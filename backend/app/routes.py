@@ -1,5 +1,48 @@
-from flask import Blueprint, jsonify, request
+from datetime import datetime, timedelta
+
+from flask import Blueprint, current_app, jsonify, request
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
+from .aggregation import BUCKETS, from_epoch, speed_buckets
+from .bulk import bulk_insert
+from .cache import cached
 from .extensions import db
+from .ingest import (
+    batch_response,
+    check_batch,
+    check_foreign_keys,
+    ingest_status,
+    insert_readings,
+    iter_ndjson,
+    parse_timestamp,
+    queue_reading,
+    readings_written,
+    validate_batch,
+    validate_reading,
+)
+from .onboarding import (
+    REFERENCE_TABLES,
+    check_bulk_references,
+    find_conflicts,
+    validate_driver,
+    validate_vehicle,
+    vehicle_ids_by_plate,
+)
+from .pool import pool_status
+from .refdata import reference_data
+from .pagination import (
+    decode_id_cursor,
+    decode_time_cursor,
+    encode_id_cursor,
+    encode_time_cursor,
+    page_response,
+    paginate_by_id,
+    parse_limit,
+    wants_all,
+)
+from .rollups import fleet_report, hourly_buckets
+from .streaming import stream_json_array, stream_query
+from .versions import conditional
 from .models import (
     Driver,
     Vehicle,
@@ -12,10 +55,10 @@ from .models import (
 api_bp = Blueprint("api", __name__)
 
 
-def get_or_create_default_company() -> Company:
-    """Return existing company or create a default one."""
-    company = Company.query.first()
-    if not company:
+def default_company_id() -> int:
+    """Return the id of the first company, creating a default one if needed."""
+    company_id = reference_data().first_id("companies")
+    if company_id is None:
         company = Company(
             name="Default Mining Company",
             status="active",
@@ -24,13 +67,14 @@ def get_or_create_default_company() -> Company:
         )
         db.session.add(company)
         db.session.commit()
-    return company
+        company_id = company.id
+    return company_id
 
 
-def get_or_create_default_vehicle_type() -> VehicleType:
-    """Return existing vehicle type or create a default one."""
-    vehicle_type = VehicleType.query.first()
-    if not vehicle_type:
+def default_vehicle_type_id() -> int:
+    """Return the id of the first vehicle type, creating a default one if needed."""
+    vehicle_type_id = reference_data().first_id("vehicle_types")
+    if vehicle_type_id is None:
         vehicle_type = VehicleType(
             name="Default Truck",
             description="Generic mining truck",
@@ -39,7 +83,189 @@ def get_or_create_default_vehicle_type() -> VehicleType:
         )
         db.session.add(vehicle_type)
         db.session.commit()
-    return vehicle_type
+        vehicle_type_id = vehicle_type.id
+    return vehicle_type_id
+
+
+def check_references(payload: dict, *fields: str) -> str | None:
+    """Return an error message for the first invalid reference among ``fields``."""
+    for field in fields:
+        value = payload.get(field)
+        if value is None:
+            continue
+        if isinstance(value, bool) or not isinstance(value, int):
+            return f"{field} must be an integer"
+        if not reference_data().exists(REFERENCE_TABLES[field], value):
+            return f"unknown {field} {value}"
+    return None
+
+
+# Inserts a bulk create retries after losing a race for unique values.
+BULK_CREATE_ATTEMPTS = 3
+
+
+def _screen_bulk_rows(model, items: list, results: list) -> list:
+    """
+    Check references and unique columns of ``(index, row)`` items, record
+    the failures in ``results`` and return the items that passed.
+    """
+    rows = [row for _, row in items]
+    passed = []
+    for (index, row), error, conflict in zip(
+        items, check_bulk_references(rows), find_conflicts(model, rows)
+    ):
+        if error:
+            results[index] = {"index": index, "status": "rejected", "message": error}
+        elif conflict:
+            results[index] = {"index": index, "status": "conflict", "message": conflict}
+        else:
+            passed.append((index, row))
+    return passed
+
+
+def _bulk_create(model, validate) -> tuple:
+    """
+    Shared body of the bulk create endpoints: validate every item, check
+    references and unique columns for the whole batch, then insert the
+    accepted rows with multi-row INSERTs in one transaction.
+    """
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, list):
+        return jsonify({"message": "body must be an array"}), 400
+
+    max_items = current_app.config["BULK_CREATE_MAX_ITEMS"]
+    if len(payload) > max_items:
+        return jsonify({"message": f"at most {max_items} items per request"}), 413
+
+    atomic = request.args.get("atomic", "false").lower() in ("1", "true", "yes")
+
+    results = [None] * len(payload)
+    items = []
+    for index, item in enumerate(payload):
+        row, error = validate(item)
+        if error:
+            results[index] = {"index": index, "status": "rejected", "message": error}
+            continue
+        items.append((index, row))
+
+    valid = _screen_bulk_rows(model, items, results)
+    created = []
+    ids = None
+    for _ in range(BULK_CREATE_ATTEMPTS):
+        if not valid or (atomic and len(valid) < len(payload)):
+            break
+
+        valid_rows = [row for _, row in valid]
+        defaults = {
+            "company_id": default_company_id,
+            "vehicle_type_id": default_vehicle_type_id,
+        }
+        for field, resolve in defaults.items():
+            if any(field in row and row[field] is None for row in valid_rows):
+                default_id = resolve()
+                for row in valid_rows:
+                    if row.get(field, default_id) is None:
+                        row[field] = default_id
+
+        try:
+            ids = bulk_insert(model, valid_rows)
+            if ids is None and model is Vehicle:
+                ids = vehicle_ids_by_plate([row["plate_number"] for row in valid_rows])
+            db.session.commit()
+        except IntegrityError:
+            # A concurrent request took one of the unique values after the
+            # check: report the rows that conflict now and retry the others.
+            db.session.rollback()
+            remaining = _screen_bulk_rows(model, valid, results)
+            if len(remaining) == len(valid):
+                break
+            valid = remaining
+            continue
+        created = valid
+        break
+
+    if valid and not created and not (atomic and len(valid) < len(payload)):
+        return (
+            jsonify({"message": "conflicting concurrent write, retry the request"}),
+            409,
+        )
+
+    failed = len(payload) - len(created)
+    if atomic and failed:
+        for index, _ in valid:
+            results[index] = {"index": index, "status": "skipped"}
+    for position, (index, _) in enumerate(created):
+        result = {"index": index, "status": "created"}
+        if ids is not None:
+            result["id"] = ids[position]
+        results[index] = result
+
+    has_conflicts = any(r and r["status"] == "conflict" for r in results)
+    if not failed:
+        status = 201
+    elif created:
+        status = 207
+    elif has_conflicts:
+        status = 409
+    else:
+        status = 400
+    return (
+        jsonify({"created": len(created), "failed": failed, "results": results}),
+        status,
+    )
+
+
+def driver_to_dict(driver: Driver) -> dict:
+    return {
+        "id": driver.id,
+        "full_name": driver.full_name,
+        "license_number": driver.license_number,
+        "license_category": driver.license_category,
+        "status": driver.status,
+        "company_id": driver.company_id,
+    }
+
+
+def vehicle_to_dict(vehicle: Vehicle) -> dict:
+    return {
+        "id": vehicle.id,
+        "plate_number": vehicle.plate_number,
+        "status": vehicle.status,
+        "company_id": vehicle.company_id,
+        "vehicle_type_id": vehicle.vehicle_type_id,
+        "current_quarry_id": vehicle.current_quarry_id,
+    }
+
+
+# Columns returned by the list endpoints. Selecting them directly yields
+# lightweight rows instead of hydrated model instances.
+DRIVER_COLUMNS = (
+    Driver.id,
+    Driver.full_name,
+    Driver.license_number,
+    Driver.license_category,
+    Driver.status,
+    Driver.company_id,
+)
+VEHICLE_COLUMNS = (
+    Vehicle.id,
+    Vehicle.plate_number,
+    Vehicle.status,
+    Vehicle.company_id,
+    Vehicle.vehicle_type_id,
+    Vehicle.current_quarry_id,
+)
+READING_COLUMNS = (
+    TelematicsReading.id,
+    TelematicsReading.timestamp,
+    TelematicsReading.latitude,
+    TelematicsReading.longitude,
+    TelematicsReading.speed_kmh,
+)
+
+
+def row_to_dict(row) -> dict:
+    return row._asdict()
 
 
 # ---------------------------------------------------------------------------
@@ -48,16 +274,35 @@ def get_or_create_default_vehicle_type() -> VehicleType:
 
 
 @api_bp.route("/drivers", methods=["GET"])
+@conditional("drivers")
+@cached("drivers")
 def list_drivers():
     """
-    List all drivers.
+    List drivers, one page at a time.
+
+    Pages are ordered by id. When more rows follow, the response carries an
+    ``X-Next-Cursor`` header (and a ``Link: rel="next"``) to pass back as
+    ``cursor``. ``all=true`` streams the whole table instead.
 
     ---
     tags:
       - Drivers
+    parameters:
+      - in: query
+        name: limit
+        type: integer
+        description: Page size (default 100, capped by PAGE_MAX_LIMIT).
+      - in: query
+        name: cursor
+        type: string
+        description: Opaque cursor taken from the X-Next-Cursor header.
+      - in: query
+        name: all
+        type: boolean
+        description: Return the whole table without pagination.
     responses:
       200:
-        description: A list of drivers.
+        description: A page of drivers.
         schema:
           type: array
           items:
@@ -72,20 +317,15 @@ def list_drivers():
               status:
                 type: string
     """
-    drivers = Driver.query.all()
-    data = []
-    for d in drivers:
-        data.append(
-            {
-                "id": d.id,
-                "full_name": d.full_name,
-                "license_number": d.license_number,
-                "license_category": d.license_category,
-                "status": d.status,
-                "company_id": d.company_id,
-            }
-        )
-    return jsonify(data)
+    query = db.session.query(*DRIVER_COLUMNS)
+    if wants_all():
+        return stream_json_array(stream_query(query.order_by(Driver.id)), row_to_dict)
+
+    try:
+        drivers, next_cursor = paginate_by_id(query, Driver)
+    except ValueError as exc:
+        return jsonify({"message": str(exc)}), 400
+    return page_response([row_to_dict(row) for row in drivers], next_cursor)
 
 
 @api_bp.route("/drivers", methods=["POST"])
@@ -141,10 +381,13 @@ def create_driver():
     if not full_name:
         return jsonify({"message": "full_name is required"}), 400
 
+    error = check_references(payload, "company_id")
+    if error:
+        return jsonify({"message": error}), 400
+
     company_id = payload.get("company_id")
     if company_id is None:
-        company = get_or_create_default_company()
-        company_id = company.id
+        company_id = default_company_id()
 
     driver = Driver(
         company_id=company_id,
@@ -158,6 +401,60 @@ def create_driver():
     return jsonify({"id": driver.id, "full_name": driver.full_name}), 201
 
 
+@api_bp.route("/drivers/bulk", methods=["POST"])
+def create_drivers_bulk():
+    """
+    Create many drivers in one request.
+
+    Valid drivers are written with multi-row INSERTs in a single transaction.
+    Invalid items are reported per item; with atomic=true any invalid item
+    cancels the whole import. Drivers without company_id get the default
+    company.
+
+    ---
+    tags:
+      - Drivers
+    consumes:
+      - application/json
+    parameters:
+      - in: query
+        name: atomic
+        type: boolean
+        required: false
+        description: Create nothing unless every item is valid.
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: array
+          items:
+            type: object
+            required:
+              - full_name
+            properties:
+              full_name:
+                type: string
+              license_number:
+                type: string
+              license_category:
+                type: string
+              company_id:
+                type: integer
+    responses:
+      201:
+        description: All drivers created.
+      207:
+        description: Some items were rejected, see results.
+      400:
+        description: Invalid payload or no driver created.
+      409:
+        description: No driver created because of conflicts.
+      413:
+        description: Too many items in one request.
+    """
+    return _bulk_create(Driver, validate_driver)
+
+
 #@api_bp.route("/drivers/<int:driver_id>", methods=["GET"])
 def get_driver(driver_id: int):
     """
@@ -192,16 +489,7 @@ def get_driver(driver_id: int):
     driver = Driver.query.get(driver_id)
     if not driver:
         return jsonify({"message": "Driver not found"}), 404
-    return jsonify(
-        {
-            "id": driver.id,
-            "full_name": driver.full_name,
-            "license_number": driver.license_number,
-            "license_category": driver.license_category,
-            "status": driver.status,
-            "company_id": driver.company_id,
-        }
-    )
+    return jsonify(driver_to_dict(driver))
 
 
 @api_bp.route("/drivers/<int:driver_id>", methods=["PUT"])
@@ -248,6 +536,10 @@ def update_driver(driver_id: int):
 
     payload = request.get_json() or {}
 
+    error = check_references(payload, "company_id")
+    if error:
+        return jsonify({"message": error}), 400
+
     if "full_name" in payload:
         driver.full_name = payload["full_name"]
     if "license_number" in payload:
@@ -297,16 +589,35 @@ def delete_driver(driver_id: int):
 
 
 @api_bp.route("/vehicles", methods=["GET"])
+@conditional("vehicles")
+@cached("vehicles")
 def list_vehicles():
     """
-    List all vehicles.
+    List vehicles, one page at a time.
+
+    Pages are ordered by id. When more rows follow, the response carries an
+    ``X-Next-Cursor`` header (and a ``Link: rel="next"``) to pass back as
+    ``cursor``. ``all=true`` streams the whole table instead.
 
     ---
     tags:
       - Vehicles
+    parameters:
+      - in: query
+        name: limit
+        type: integer
+        description: Page size (default 100, capped by PAGE_MAX_LIMIT).
+      - in: query
+        name: cursor
+        type: string
+        description: Opaque cursor taken from the X-Next-Cursor header.
+      - in: query
+        name: all
+        type: boolean
+        description: Return the whole table without pagination.
     responses:
       200:
-        description: A list of vehicles.
+        description: A page of vehicles.
         schema:
           type: array
           items:
@@ -323,20 +634,15 @@ def list_vehicles():
               vehicle_type_id:
                 type: integer
     """
-    vehicles = Vehicle.query.all()
-    data = []
-    for v in vehicles:
-        data.append(
-            {
-                "id": v.id,
-                "plate_number": v.plate_number,
-                "status": v.status,
-                "company_id": v.company_id,
-                "vehicle_type_id": v.vehicle_type_id,
-                "current_quarry_id": v.current_quarry_id,
-            }
-        )
-    return jsonify(data)
+    query = db.session.query(*VEHICLE_COLUMNS)
+    if wants_all():
+        return stream_json_array(stream_query(query.order_by(Vehicle.id)), row_to_dict)
+
+    try:
+        vehicles, next_cursor = paginate_by_id(query, Vehicle)
+    except ValueError as exc:
+        return jsonify({"message": str(exc)}), 400
+    return page_response([row_to_dict(row) for row in vehicles], next_cursor)
 
 
 @api_bp.route("/vehicles", methods=["POST"])
@@ -379,13 +685,17 @@ def create_vehicle():
     if not plate_number:
         return jsonify({"message": "plate_number is required"}), 400
 
+    error = check_references(payload, "company_id", "vehicle_type_id")
+    if error:
+        return jsonify({"message": error}), 400
+
     company_id = payload.get("company_id")
     if company_id is None:
-        company_id = get_or_create_default_company().id
+        company_id = default_company_id()
 
     vehicle_type_id = payload.get("vehicle_type_id")
     if vehicle_type_id is None:
-        vehicle_type_id = get_or_create_default_vehicle_type().id
+        vehicle_type_id = default_vehicle_type_id()
 
     vehicle = Vehicle(
         company_id=company_id,
@@ -410,7 +720,66 @@ def create_vehicle():
     )
 
 
+@api_bp.route("/vehicles/bulk", methods=["POST"])
+def create_vehicles_bulk():
+    """
+    Create many vehicles in one request.
+
+    Valid vehicles are written with multi-row INSERTs in a single
+    transaction. A plate_number or vin that already exists, or repeats an
+    earlier item, is reported as a conflict for that item only; with
+    atomic=true any invalid item cancels the whole import. Missing
+    company_id / vehicle_type_id get the default entities.
+
+    ---
+    tags:
+      - Vehicles
+    consumes:
+      - application/json
+    parameters:
+      - in: query
+        name: atomic
+        type: boolean
+        required: false
+        description: Create nothing unless every item is valid.
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: array
+          items:
+            type: object
+            required:
+              - plate_number
+            properties:
+              plate_number:
+                type: string
+              vin:
+                type: string
+              company_id:
+                type: integer
+              vehicle_type_id:
+                type: integer
+              current_quarry_id:
+                type: integer
+    responses:
+      201:
+        description: All vehicles created.
+      207:
+        description: Some items were rejected or conflicted, see results.
+      400:
+        description: Invalid payload or no vehicle created.
+      409:
+        description: No vehicle created because of conflicts.
+      413:
+        description: Too many items in one request.
+    """
+    return _bulk_create(Vehicle, validate_vehicle)
+
+
 @api_bp.route("/vehicles/<int:vehicle_id>", methods=["GET"])
+@conditional("vehicles")
+@cached("vehicles")
 def get_vehicle(vehicle_id: int):
     """
     Get a single vehicle by id.
@@ -433,16 +802,7 @@ def get_vehicle(vehicle_id: int):
     if not vehicle:
         return jsonify({"message": "Vehicle not found"}), 404
 
-    return jsonify(
-        {
-            "id": vehicle.id,
-            "plate_number": vehicle.plate_number,
-            "status": vehicle.status,
-            "company_id": vehicle.company_id,
-            "vehicle_type_id": vehicle.vehicle_type_id,
-            "current_quarry_id": vehicle.current_quarry_id,
-        }
-    )
+    return jsonify(vehicle_to_dict(vehicle))
 
 
 @api_bp.route("/vehicles/<int:vehicle_id>", methods=["PUT"])
@@ -488,6 +848,10 @@ def update_vehicle(vehicle_id: int):
 
     payload = request.get_json() or {}
 
+    error = check_references(payload, "company_id", "vehicle_type_id")
+    if error:
+        return jsonify({"message": error}), 400
+
     if "plate_number" in payload:
         vehicle.plate_number = payload["plate_number"]
     if "status" in payload:
@@ -536,11 +900,30 @@ def delete_vehicle(vehicle_id: int):
 # ---------------------------------------------------------------------------
 
 
+def _timestamp_arg(name: str):
+    try:
+        return parse_timestamp(request.args[name])
+    except ValueError:
+        raise ValueError(f"{name} must be an ISO 8601 timestamp") from None
+
+
 @api_bp.route("/vehicles/<int:vehicle_id>/telemetry", methods=["GET"])
+@cached("telematics_readings")
 def list_vehicle_telemetry(vehicle_id: int):
     """
     List telemetry readings for a given vehicle.
 
+    By default returns the newest readings first. ``since``/``until``
+    restrict the time window. When older readings remain, the response
+    carries an ``X-Next-Cursor`` header to pass back as ``cursor``.
+    Readings moved to the cold archive are included as if still stored.
+
+    Pollers should use ``newer_than`` with the ``X-Latest-Cursor`` of their
+    previous response. They then receive only readings stored after that
+    point in the order they were stored, including late readings whose
+    timestamps are older than ones already received, and should repeat
+    while a full page comes back.
+
     ---
     tags:
       - Telemetry
@@ -550,6 +933,26 @@ def list_vehicle_telemetry(vehicle_id: int):
         required: true
         type: integer
         description: Vehicle identifier.
+      - in: query
+        name: since
+        type: string
+        description: ISO 8601 lower bound (inclusive) on the reading timestamp.
+      - in: query
+        name: until
+        type: string
+        description: ISO 8601 upper bound (exclusive) on the reading timestamp.
+      - in: query
+        name: limit
+        type: integer
+        description: Page size (default 100, capped by PAGE_MAX_LIMIT).
+      - in: query
+        name: cursor
+        type: string
+        description: X-Next-Cursor of the previous page, to walk back in time.
+      - in: query
+        name: newer_than
+        type: string
+        description: X-Latest-Cursor of a previous response, to fetch deltas only.
     responses:
       200:
         description: Telemetry readings.
@@ -568,25 +971,179 @@ def list_vehicle_telemetry(vehicle_id: int):
                 type: number
               speed_kmh:
                 type: number
+      400:
+        description: Invalid query parameter.
     """
-    readings = (
-        TelematicsReading.query.filter_by(vehicle_id=vehicle_id)
-        .order_by(TelematicsReading.timestamp.desc())
-        .limit(100)
-        .all()
+    args = request.args
+    ts = TelematicsReading.timestamp
+    reading_id = TelematicsReading.id
+    query = db.session.query(*READING_COLUMNS).filter(
+        TelematicsReading.vehicle_id == vehicle_id
     )
-    data = []
-    for r in readings:
-        data.append(
+
+    since = until = before = after = None
+    try:
+        limit = parse_limit()
+        if args.get("since"):
+            since = _timestamp_arg("since")
+            query = query.filter(ts >= since)
+        if args.get("until"):
+            until = _timestamp_arg("until")
+            query = query.filter(ts < until)
+
+        newer_than = args.get("newer_than")
+        if newer_than:
+            # Keyed on the id alone: readings are stored in id order, but
+            # late ones can carry any timestamp.
+            after = decode_id_cursor(newer_than)
+            query = query.filter(reading_id > after).order_by(reading_id.asc())
+        else:
+            if args.get("cursor"):
+                before = decode_time_cursor(args["cursor"])
+                before_ts, before_id = before
+                query = query.filter(
+                    or_(ts < before_ts, and_(ts == before_ts, reading_id < before_id))
+                )
+            query = query.order_by(ts.desc(), reading_id.desc())
+    except ValueError as exc:
+        return jsonify({"message": str(exc)}), 400
+
+    readings = [row_to_dict(r) for r in query.limit(limit + 1)]
+    archive = current_app.extensions.get("telemetry_archive")
+    if archive is not None:
+        # Readings past the hot table come from the Parquet archive.
+        readings = archive.merge(
+            readings,
+            vehicle_id,
+            [column.key for column in READING_COLUMNS],
+            limit + 1,
+            since,
+            until,
+            before,
+            after,
+        )
+    has_more = len(readings) > limit
+    readings = readings[:limit]
+
+    data = [
+        {
+            "id": r["id"],
+            "timestamp": r["timestamp"].isoformat(),
+            "latitude": r["latitude"],
+            "longitude": r["longitude"],
+            "speed_kmh": r["speed_kmh"],
+        }
+        for r in readings
+    ]
+
+    next_cursor = None
+    if not newer_than and has_more:
+        next_cursor = encode_time_cursor(readings[-1]["timestamp"], readings[-1]["id"])
+
+    response = page_response(data, next_cursor)
+    if readings:
+        response.headers["X-Latest-Cursor"] = encode_id_cursor(
+            max(r["id"] for r in readings)
+        )
+    elif newer_than:
+        response.headers["X-Latest-Cursor"] = newer_than
+    return response
+
+
+@api_bp.route("/vehicles/<int:vehicle_id>/telemetry/aggregate", methods=["GET"])
+@cached("telematics_readings", "telemetry_hourly_rollups")
+def aggregate_vehicle_telemetry(vehicle_id: int):
+    """
+    Downsampled telemetry for charts.
+
+    Splits the ``[since, until)`` window into fixed time buckets and returns,
+    per bucket, the reading count, min/max/avg/last ``speed_kmh`` and the
+    last known position. Buckets without readings are omitted. ``1h``
+    buckets are served from the hourly rollups and always cover whole hours.
+
+    ---
+    tags:
+      - Telemetry
+    parameters:
+      - in: path
+        name: vehicle_id
+        required: true
+        type: integer
+      - in: query
+        name: bucket
+        type: string
+        enum: ["1m", "5m", "1h"]
+        default: "5m"
+      - in: query
+        name: since
+        type: string
+        description: ISO 8601 start, defaults to AGGREGATE_DEFAULT_WINDOW_HOURS before until.
+      - in: query
+        name: until
+        type: string
+        description: ISO 8601 end (exclusive), defaults to now.
+    responses:
+      200:
+        description: Telemetry buckets.
+      400:
+        description: Invalid query parameter.
+    """
+    config = current_app.config
+    bucket = request.args.get("bucket", "5m")
+    if bucket not in BUCKETS:
+        return jsonify({"message": f"bucket must be one of {', '.join(BUCKETS)}"}), 400
+    seconds = BUCKETS[bucket]
+
+    try:
+        until = (
+            _timestamp_arg("until") if request.args.get("until") else datetime.utcnow()
+        )
+        if request.args.get("since"):
+            since = _timestamp_arg("since")
+        else:
+            since = until - timedelta(hours=config["AGGREGATE_DEFAULT_WINDOW_HOURS"])
+    except ValueError as exc:
+        return jsonify({"message": str(exc)}), 400
+
+    if since >= until:
+        return jsonify({"message": "since must be before until"}), 400
+    if (until - since).total_seconds() / seconds > config["AGGREGATE_MAX_BUCKETS"]:
+        return jsonify({"message": "time window too large for this bucket size"}), 400
+
+    buckets = []
+    if bucket == "1h":
+        rows = hourly_buckets(vehicle_id, since, until)
+        starts = [row.hour_start for row in rows]
+    else:
+        rows = speed_buckets(vehicle_id, seconds, since, until)
+        starts = [from_epoch(row.bucket) for row in rows]
+
+    for start, row in zip(starts, rows):
+        buckets.append(
             {
-                "id": r.id,
-                "timestamp": r.timestamp.isoformat(),
-                "latitude": r.latitude,
-                "longitude": r.longitude,
-                "speed_kmh": r.speed_kmh,
+                "start": start.isoformat(),
+                "count": row.count,
+                "speed_min": row.speed_min,
+                "speed_max": row.speed_max,
+                "speed_avg": (
+                    float(row.speed_avg) if row.speed_avg is not None else None
+                ),
+                "speed_last": row.speed_last,
+                "latitude": row.latitude,
+                "longitude": row.longitude,
+                "last_timestamp": row.last_timestamp.isoformat(),
             }
         )
-    return jsonify(data)
+
+    return jsonify(
+        {
+            "vehicle_id": vehicle_id,
+            "bucket": bucket,
+            "since": since.isoformat(),
+            "until": until.isoformat(),
+            "buckets": buckets,
+        }
+    )
 
 
 @api_bp.route("/telemetry", methods=["POST"])
@@ -612,6 +1169,11 @@ def create_telematics_reading():
               type: integer
             driver_id:
               type: integer
+            shift_id:
+              type: integer
+            timestamp:
+              type: string
+              example: "2025-01-01T08:00:00Z"
             latitude:
               type: number
             longitude:
@@ -625,22 +1187,337 @@ def create_telematics_reading():
     responses:
       201:
         description: Telemetry reading created.
+      202:
+        description: Reading accepted into the write-behind buffer.
+      400:
+        description: Invalid reading.
+      503:
+        description: Write-behind buffer is full, retry later.
     """
     payload = request.get_json() or {}
 
-    vehicle_id = payload.get("vehicle_id")
-    if vehicle_id is None:
-        return jsonify({"message": "vehicle_id is required"}), 400
-
-    reading = TelematicsReading(
-        vehicle_id=vehicle_id,
-        driver_id=payload.get("driver_id"),
-        latitude=payload.get("latitude"),
-        longitude=payload.get("longitude"),
-        speed_kmh=payload.get("speed_kmh"),
-        driver_health_status_id=payload.get("driver_health_status_id"),
-        raw_payload=payload.get("raw_payload"),
-    )
+    buffer = current_app.extensions.get("ingest_buffer")
+    if buffer is not None:
+        data, status = queue_reading(buffer, payload)
+        return jsonify(data), status
+
+    row, error = validate_reading(payload)
+    if error is None:
+        error = check_foreign_keys([row])[0]
+    if error:
+        return jsonify({"message": error}), 400
+
+    reading = TelematicsReading(**row)
     db.session.add(reading)
+    db.session.flush()
+    readings_written([row])
     db.session.commit()
     return jsonify({"id": reading.id}), 201
+
+
+@api_bp.route("/telemetry/batch", methods=["POST"])
+def create_telematics_readings_batch():
+    """
+    Create many telemetry readings in one request.
+
+    All readings are validated together and the valid ones are written with
+    multi-row INSERTs in a single transaction. Invalid readings are reported
+    per item and do not prevent the others from being stored.
+
+    ---
+    tags:
+      - Telemetry
+    consumes:
+      - application/json
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: array
+          items:
+            type: object
+            required:
+              - vehicle_id
+            properties:
+              vehicle_id:
+                type: integer
+              driver_id:
+                type: integer
+              shift_id:
+                type: integer
+              timestamp:
+                type: string
+                example: "2025-01-01T08:00:00Z"
+              latitude:
+                type: number
+              longitude:
+                type: number
+              speed_kmh:
+                type: number
+              driver_health_status_id:
+                type: integer
+              raw_payload:
+                type: string
+    responses:
+      201:
+        description: All readings created.
+      207:
+        description: Some readings were rejected, see results.
+      400:
+        description: Invalid payload or no reading accepted.
+      413:
+        description: Too many readings in one request.
+    """
+    payload = request.get_json(silent=True)
+    invalid = check_batch(payload, current_app.config["TELEMETRY_BATCH_MAX_ITEMS"])
+    if invalid is not None:
+        data, status = invalid
+        return jsonify(data), status
+
+    results, indexes, rows = validate_batch(payload)
+    errors = check_foreign_keys(rows)
+    ids = insert_readings([row for row, error in zip(rows, errors) if not error])
+    db.session.commit()
+
+    data, status = batch_response(results, indexes, errors, ids)
+    return jsonify(data), status
+
+
+def _flush_ndjson_chunk(chunk: list[tuple[int, dict]]) -> tuple[int, list[dict]]:
+    """Write one chunk of NDJSON readings and commit it."""
+    errors = check_foreign_keys([row for _, row in chunk])
+    valid_rows = [row for (_, row), error in zip(chunk, errors) if not error]
+    insert_readings(valid_rows)
+    db.session.commit()
+    rejected = [
+        {"line": line_number, "message": error}
+        for (line_number, _), error in zip(chunk, errors)
+        if error
+    ]
+    return len(valid_rows), rejected
+
+
+@api_bp.route("/telemetry/ndjson", methods=["POST"])
+def ingest_telematics_ndjson():
+    """
+    Ingest telemetry readings from a newline-delimited JSON upload.
+
+    The body is read incrementally, one reading object per line, and written
+    in fixed-size chunks that are committed as they fill up, so memory use
+    does not depend on the size of the upload. Chunks committed before an
+    error stay stored.
+
+    ---
+    tags:
+      - Telemetry
+    consumes:
+      - application/x-ndjson
+    parameters:
+      - in: body
+        name: body
+        required: true
+        description: One telemetry reading JSON object per line.
+        schema:
+          type: string
+          example: |
+            {"vehicle_id": 1, "timestamp": "2025-01-01T08:00:00Z", "speed_kmh": 32.5}
+            {"vehicle_id": 1, "timestamp": "2025-01-01T08:05:00Z", "speed_kmh": 28.1}
+    responses:
+      201:
+        description: All readings created.
+      207:
+        description: Some lines were rejected, see errors.
+      400:
+        description: No reading accepted.
+    """
+    config = current_app.config
+    chunk_size = config["TELEMETRY_NDJSON_CHUNK_SIZE"]
+    max_errors = config["TELEMETRY_NDJSON_MAX_ERRORS"]
+
+    accepted = 0
+    rejected = 0
+    errors = []
+
+    def record_errors(items):
+        nonlocal rejected
+        rejected += len(items)
+        errors.extend(items[: max(0, max_errors - len(errors))])
+
+    chunk = []
+    lines = iter_ndjson(request.stream, config["TELEMETRY_NDJSON_MAX_LINE_BYTES"])
+    for line_number, item, error in lines:
+        row = None
+        if error is None:
+            row, error = validate_reading(item)
+        if error:
+            record_errors([{"line": line_number, "message": error}])
+            continue
+
+        chunk.append((line_number, row))
+        if len(chunk) >= chunk_size:
+            written, chunk_errors = _flush_ndjson_chunk(chunk)
+            accepted += written
+            record_errors(chunk_errors)
+            chunk = []
+
+    if chunk:
+        written, chunk_errors = _flush_ndjson_chunk(chunk)
+        accepted += written
+        record_errors(chunk_errors)
+
+    return (
+        jsonify(
+            {
+                "accepted": accepted,
+                "rejected": rejected,
+                "errors": errors,
+                "errors_truncated": rejected > len(errors),
+            }
+        ),
+        ingest_status(accepted, rejected),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Fleet
+# ---------------------------------------------------------------------------
+
+
+@api_bp.route("/fleet/snapshot", methods=["GET"])
+def fleet_snapshot():
+    """
+    Last known position of every vehicle, served from memory.
+
+    The in-process cache is updated by ingest, and a background thread
+    re-syncs it with the database every POSITION_CACHE_SYNC_SECONDS to pick
+    up readings written by other workers; the request itself runs no query.
+
+    ---
+    tags:
+      - Fleet
+    responses:
+      200:
+        description: One entry per vehicle that has reported telemetry.
+        schema:
+          type: array
+          items:
+            type: object
+            properties:
+              vehicle_id:
+                type: integer
+              timestamp:
+                type: string
+              latitude:
+                type: number
+              longitude:
+                type: number
+              speed_kmh:
+                type: number
+    """
+    cache = current_app.extensions["position_cache"]
+    data = []
+    for position in cache.snapshot():
+        data.append(
+            {
+                "vehicle_id": position["vehicle_id"],
+                "timestamp": position["timestamp"].isoformat(),
+                "latitude": position["latitude"],
+                "longitude": position["longitude"],
+                "speed_kmh": position["speed_kmh"],
+            }
+        )
+    return jsonify(data)
+
+
+# ---------------------------------------------------------------------------
+# Reports
+# ---------------------------------------------------------------------------
+
+
+@api_bp.route("/reports/fleet", methods=["GET"])
+@cached("telemetry_hourly_rollups")
+def fleet_telemetry_report():
+    """
+    Per-vehicle telemetry totals read from the hourly rollups.
+
+    ---
+    tags:
+      - Reports
+    parameters:
+      - in: query
+        name: since
+        required: true
+        type: string
+        description: ISO 8601 start, rounded down to the hour.
+      - in: query
+        name: until
+        type: string
+        description: ISO 8601 end (exclusive), defaults to now.
+    responses:
+      200:
+        description: One entry per vehicle with readings in the window.
+        schema:
+          type: array
+          items:
+            type: object
+            properties:
+              vehicle_id:
+                type: integer
+              reading_count:
+                type: integer
+              distance_km:
+                type: number
+              speed_max:
+                type: number
+              speed_avg:
+                type: number
+              health_status_counts:
+                type: object
+      400:
+        description: Invalid query parameter.
+    """
+    if not request.args.get("since"):
+        return jsonify({"message": "since is required"}), 400
+    try:
+        since = _timestamp_arg("since")
+        until = (
+            _timestamp_arg("until") if request.args.get("until") else datetime.utcnow()
+        )
+    except ValueError as exc:
+        return jsonify({"message": str(exc)}), 400
+    return jsonify(fleet_report(since, until))
+
+
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+
+
+@api_bp.route("/metrics", methods=["GET"])
+def metrics():
+    """
+    Runtime counters of this worker process.
+
+    ---
+    tags:
+      - Metrics
+    responses:
+      200:
+        description: Counters grouped by component.
+    """
+    buffer = current_app.extensions.get("ingest_buffer")
+    cache = current_app.extensions.get("response_cache")
+    startup = current_app.extensions.get("startup")
+    return jsonify(
+        {
+            "db_pool": pool_status(db.engine),
+            "ingest_buffer": buffer.stats() if buffer is not None else None,
+            "response_cache": (
+                {**cache.stats.as_dict(), "entries": cache.size()}
+                if cache is not None
+                else None
+            ),
+            "startup": startup.report() if startup is not None else None,
+        }
+    )
@@ -0,0 +1,132 @@
+import logging
+import os
+from functools import lru_cache
+from pathlib import Path
+
+import yaml
+from sqlalchemy import Index, inspect
+
+logger = logging.getLogger(__name__)
+
+# libyaml's loader parses db/schema.yml about three times faster, which
+# matters because the models read it at import time.
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+SCHEMA_FILE = Path(
+    os.getenv(
+        "SCHEMA_FILE",
+        Path(__file__).resolve().parents[2] / "db" / "schema.yml",
+    )
+)
+
+
+@lru_cache(maxsize=None)
+def load_schema() -> dict:
+    """Read db/schema.yml once per process."""
+    if not SCHEMA_FILE.exists():
+        logger.warning("Schema file %s not found, no indexes declared", SCHEMA_FILE)
+        return {"tables": {}}
+    with SCHEMA_FILE.open(encoding="utf-8") as fh:
+        return yaml.load(fh, Loader=YAML_LOADER) or {"tables": {}}
+
+
+def declared_indexes(table: str) -> list[tuple[list[str], bool]]:
+    """
+    ``(columns, unique)`` for each index declared for ``table``.
+
+    Entries are either a plain column list or a mapping with ``columns`` and
+    an optional ``unique`` flag.
+    """
+    spec = load_schema().get("tables", {}).get(table) or {}
+    indexes = []
+    for entry in spec.get("indexes") or []:
+        if isinstance(entry, dict):
+            indexes.append((list(entry["columns"]), bool(entry.get("unique"))))
+        else:
+            indexes.append((list(entry), False))
+    return indexes
+
+
+def index_name(table: str, columns: list[str], unique: bool = False) -> str:
+    prefix = "uq" if unique else "ix"
+    return f"{prefix}_{table}_{'_'.join(columns)}"
+
+
+def schema_indexes(table: str) -> tuple[Index, ...]:
+    """``Index`` objects for a model's ``__table_args__``."""
+    return tuple(
+        Index(index_name(table, columns, unique), *columns, unique=unique)
+        for columns, unique in declared_indexes(table)
+    )
+
+
+def check_indexes(engine, metadata) -> list[dict]:
+    """
+    Compare the indexes declared on ``metadata`` with the live database.
+
+    Returns one entry per problem with ``status`` set to ``missing_table``,
+    ``missing`` (no index covers exactly these columns) or ``differs`` (an
+    index with the expected name exists on other columns or with another
+    uniqueness).
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    # A view stands in for a partitioned table on SQLite; the per-period
+    # tables behind it get their indexes from partitions.py.
+    views = set(inspector.get_view_names())
+    problems = []
+    for table in metadata.sorted_tables:
+        if not table.indexes or table.name in views:
+            continue
+        if table.name not in existing_tables:
+            problems.append({"table": table.name, "status": "missing_table"})
+            continue
+
+        live = {
+            index["name"]: (list(index["column_names"]), bool(index["unique"]))
+            for index in inspector.get_indexes(table.name)
+        }
+        live_columns = [columns for columns, _ in live.values()]
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            expected = [column.name for column in index.columns]
+            if index.name in live and live[index.name] != (
+                expected,
+                bool(index.unique),
+            ):
+                actual, unique = live[index.name]
+                problems.append(
+                    {
+                        "table": table.name,
+                        "index": index.name,
+                        "status": "differs",
+                        "expected": expected,
+                        "actual": actual,
+                        "unique": unique,
+                    }
+                )
+            elif expected not in live_columns:
+                problems.append(
+                    {
+                        "table": table.name,
+                        "index": index.name,
+                        "status": "missing",
+                        "expected": expected,
+                    }
+                )
+    return problems
+
+
+def create_missing_indexes(engine, metadata, problems: list[dict]) -> list[str]:
+    """Create the indexes reported as ``missing`` by ``check_indexes``."""
+    created = []
+    for problem in problems:
+        if problem["status"] != "missing":
+            continue
+        index = next(
+            i
+            for i in metadata.tables[problem["table"]].indexes
+            if i.name == problem["index"]
+        )
+        index.create(bind=engine, checkfirst=True)
+        created.append(index.name)
+    return created
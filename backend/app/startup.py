@@ -0,0 +1,82 @@
+import logging
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    """
+    Wall-clock timings of the ``create_app`` phases and of the first request
+    served, checked against STARTUP_BUDGET_MS and FIRST_REQUEST_BUDGET_MS.
+    """
+
+    def __init__(self, startup_budget_ms: float, first_request_budget_ms: float):
+        self.startup_budget_ms = startup_budget_ms
+        self.first_request_budget_ms = first_request_budget_ms
+        self.phases = {}
+        self.create_app_ms = None
+        self.first_request_ms = None
+        self._started = time.perf_counter()
+        self._request_started = None
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round((time.perf_counter() - started) * 1000, 3)
+
+    def finish(self) -> None:
+        """Mark the end of ``create_app`` and log the report."""
+        self.create_app_ms = round((time.perf_counter() - self._started) * 1000, 3)
+        over = self.create_app_ms > self.startup_budget_ms
+        logger.log(
+            logging.WARNING if over else logging.INFO,
+            "create_app took %.1f ms (budget %.0f ms): %s",
+            self.create_app_ms,
+            self.startup_budget_ms,
+            ", ".join(f"{name} {ms:.1f} ms" for name, ms in self.phases.items()),
+        )
+
+    def before_request(self) -> None:
+        if self.first_request_ms is None and self._request_started is None:
+            self._request_started = time.perf_counter()
+
+    def after_request(self, response):
+        if self.first_request_ms is None and self._request_started is not None:
+            elapsed = time.perf_counter() - self._request_started
+            self.first_request_ms = round(elapsed * 1000, 3)
+            over = self.first_request_ms > self.first_request_budget_ms
+            logger.log(
+                logging.WARNING if over else logging.INFO,
+                "First request took %.1f ms (budget %.0f ms)",
+                self.first_request_ms,
+                self.first_request_budget_ms,
+            )
+        return response
+
+    def report(self) -> dict:
+        return {
+            "create_app_ms": self.create_app_ms,
+            "create_app_budget_ms": self.startup_budget_ms,
+            "phases_ms": dict(self.phases),
+            "first_request_ms": self.first_request_ms,
+            "first_request_budget_ms": self.first_request_budget_ms,
+        }
+
+
+def init_startup_timer(app) -> StartupTimer:
+    """
+    Start timing ``app``'s startup. Called first in ``create_app`` so that
+    the first-request timing covers every later after_request hook;
+    ``create_app`` calls ``finish()`` once it is done.
+    """
+    timer = StartupTimer(
+        app.config["STARTUP_BUDGET_MS"], app.config["FIRST_REQUEST_BUDGET_MS"]
+    )
+    app.extensions["startup"] = timer
+    app.before_request(timer.before_request)
+    app.after_request(timer.after_request)
+    return timer
@@ -0,0 +1,38 @@
+from flask import current_app, stream_with_context
+
+
+def stream_json_array(rows, serialize):
+    """
+    Stream ``rows`` as a JSON array, encoding one row at a time.
+
+    ``rows`` should be a lazily evaluated query (e.g. with ``yield_per``) so
+    that only one batch of rows is held in memory at any moment. Encoded rows
+    are written out in batches of STREAM_BATCH_SIZE.
+    """
+    batch_size = current_app.config["STREAM_BATCH_SIZE"]
+
+    def generate():
+        dumps = current_app.json.dumps
+        yield "["
+        buffer = []
+        first = True
+        for row in rows:
+            encoded = dumps(serialize(row), separators=(",", ":"))
+            buffer.append(encoded if first else "," + encoded)
+            first = False
+            if len(buffer) >= batch_size:
+                yield "".join(buffer)
+                buffer = []
+        if buffer:
+            yield "".join(buffer)
+        yield "]\n"
+
+    return current_app.response_class(
+        stream_with_context(generate()), mimetype="application/json"
+    )
+
+
+def stream_query(query):
+    """Iterate ``query`` through a server-side cursor in STREAM_BATCH_SIZE batches."""
+    batch_size = current_app.config["STREAM_BATCH_SIZE"]
+    return query.execution_options(stream_results=True).yield_per(batch_size)
@@ -0,0 +1,197 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import uuid
+from collections import defaultdict
+from functools import wraps
+
+from flask import current_app, make_response, request
+from sqlalchemy import event
+
+from .compression import etag_variants
+from .extensions import db
+
+
+def database_scope(uri: str) -> str:
+    """Short id of a database URI, to keep stores shared on a host apart."""
+    return hashlib.blake2b(uri.encode(), digest_size=8).hexdigest()
+
+
+class MemoryVersionStore:
+    """
+    Per-table write counters local to this process, for a single-process
+    server: writes made by other processes are never seen.
+
+    Versions carry a random epoch that is drawn again in a forked child, so
+    that processes never hand out the same version for different data.
+    """
+
+    def __init__(self, scope: str = ""):
+        self.scope = scope
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.pid = os.getpid()
+        self.epoch = uuid.uuid4().hex[:12]
+        self._versions = defaultdict(int)
+
+    def _check_pid(self) -> None:
+        if self.pid != os.getpid():
+            with self._lock:
+                if self.pid != os.getpid():
+                    self._reset()
+
+    def get(self, table: str) -> str:
+        self._check_pid()
+        return f"{self.epoch}.{self._versions[table]}"
+
+    def bump(self, tables) -> None:
+        self._check_pid()
+        with self._lock:
+            for table in tables:
+                self._versions[table] += 1
+
+
+class SQLiteVersionStore:
+    """
+    Per-table write counters in a local SQLite file shared by all workers on
+    the host, so that a write in one worker is seen by the others.
+
+    Counters are kept under ``scope`` (see ``database_scope``), with a random
+    epoch each, so apps on other databases can share the file.
+    """
+
+    def __init__(self, path: str, scope: str = ""):
+        self.path = path
+        self.scope = scope
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS table_versions "
+                "(name TEXT PRIMARY KEY, version INTEGER NOT NULL)"
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO table_versions (name, version) VALUES (?, ?)",
+                (scope, int(uuid.uuid4().int % 2**31)),
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, table: str) -> str:
+        name = f"{self.scope}:{table}"
+        rows = dict(
+            self._connect().execute(
+                "SELECT name, version FROM table_versions WHERE name IN (?, ?)",
+                (self.scope, name),
+            )
+        )
+        return f"{rows[self.scope]}.{rows.get(name, 0)}"
+
+    def bump(self, tables) -> None:
+        conn = self._connect()
+        for table in tables:
+            conn.execute(
+                "INSERT INTO table_versions (name, version) VALUES (?, 1) "
+                "ON CONFLICT(name) DO UPDATE SET version = version + 1",
+                (f"{self.scope}:{table}",),
+            )
+
+
+def init_version_store(app):
+    """Attach the table version store selected by VERSION_STORE to ``app``."""
+    setting = app.config["VERSION_STORE"]
+    scope = database_scope(app.config["SQLALCHEMY_DATABASE_URI"])
+    if setting.startswith("sqlite:///"):
+        store = SQLiteVersionStore(setting[len("sqlite:///") :], scope)
+    else:
+        store = MemoryVersionStore(scope)
+    app.extensions["version_store"] = store
+    return store
+
+
+def _written_tables(session) -> set:
+    return session.info.setdefault("written_tables", set())
+
+
+@event.listens_for(db.session, "after_flush")
+def _track_flushed_tables(session, flush_context):
+    tables = _written_tables(session)
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        tables.add(obj.__table__.name)
+
+
+@event.listens_for(db.session, "do_orm_execute")
+def _track_executed_tables(orm_execute_state):
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        _written_tables(orm_execute_state.session).add(
+            orm_execute_state.statement.table.name
+        )
+
+
+@event.listens_for(db.session, "after_commit")
+def _bump_written_tables(session):
+    tables = session.info.pop("written_tables", None)
+    store = current_app.extensions.get("version_store") if tables else None
+    if store is not None:
+        store.bump(tables)
+
+
+@event.listens_for(db.session, "after_rollback")
+def _discard_written_tables(session):
+    session.info.pop("written_tables", None)
+
+
+def versions_key(tables) -> str:
+    """
+    The database, current request URL and current versions of ``tables``;
+    the database keeps caches shared across apps on a host apart.
+    """
+    store = current_app.extensions["version_store"]
+    versions = "|".join(store.get(table) for table in tables)
+    return f"{store.scope}|{request.full_path}|{versions}"
+
+
+def etag_for(tables) -> str:
+    """Strong ETag for the current request URL at the current table versions."""
+    return hashlib.blake2b(versions_key(tables).encode(), digest_size=16).hexdigest()
+
+
+def conditional(*tables):
+    """
+    Answer ``If-None-Match`` for a GET view whose body only depends on the
+    URL and on ``tables``. A match returns 304 before the view runs.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = etag_for(tables)
+            # Compressed representations carry the coding as a tag suffix.
+            for tag in etag_variants(etag):
+                if request.if_none_match.contains_weak(tag):
+                    response = current_app.response_class(status=304)
+                    response.set_etag(tag)
+                    response.vary.add("Accept-Encoding")
+                    return response
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag)
+            return response
+
+        return wrapper
+
+    return decorator
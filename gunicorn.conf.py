@@ -0,0 +1,95 @@
+"""
+Gunicorn settings for the production server:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Every setting can be overridden from the environment (see below) or with
+GUNICORN_CMD_ARGS.
+"""
+
+import math
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def available_cpus() -> int:
+    """CPUs this process may use, honouring affinity and the cgroup v2 quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+# 2 * CPUs + 1, capped so that workers * DB_POOL_SIZE stays within the
+# database connection limit.
+workers = int(
+    os.getenv(
+        "WEB_CONCURRENCY",
+        min(2 * available_cpus() + 1, int(os.getenv("GUNICORN_MAX_WORKERS", "8"))),
+    )
+)
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+
+# Load the app once in the master so workers fork with it already imported.
+preload_app = True
+
+# Recycle workers periodically; the jitter keeps them from restarting together.
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "200"))
+
+# On SIGTERM workers stop accepting and get this long to finish in-flight requests.
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    """
+    Refuse per-process table versions when several workers serve requests:
+    ETags and cached responses would miss the other workers' writes.
+    """
+    from backend.app.config import Config
+
+    if server.cfg.workers > 1 and Config.VERSION_STORE == "memory":
+        raise RuntimeError(
+            "VERSION_STORE=memory is per process; with several workers use a "
+            "shared sqlite:/// store or WEB_CONCURRENCY=1"
+        )
+
+
+def post_fork(server, worker):
+    """Drop DB connections inherited from the master; each worker opens its own."""
+    if not server.cfg.preload_app:
+        return
+    from backend.app.extensions import db
+
+    app = server.app.wsgi()
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+
+def worker_exit(server, worker):
+    """Flush buffered telemetry before the worker goes away."""
+    app = getattr(worker, "wsgi", None)
+    buffer = app.extensions.get("ingest_buffer") if app is not None else None
+    if buffer is not None:
+        buffer.stop()
+        server.log.info("Ingest buffer flushed: %s", buffer.stats())
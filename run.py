@@ -1,7 +1,20 @@
+"""Development server for local use. Production runs gunicorn, see wsgi.py."""
+
+import os
+
 from backend.app import create_app
+from backend.app.bootstrap import bootstrap_database
 
 app = create_app()
 
 if __name__ == "__main__":
+    # Production runs `flask --app wsgi init-db` once per deploy instead.
+    with app.app_context():
+        for line in bootstrap_database():
+            print(line)
 
-    app.run(host="0.0.0.0", port=8080, debug=True)
+    app.run(
+        host=os.getenv("HOST", "127.0.0.1"),
+        port=int(os.getenv("PORT", "8000")),
+        debug=True,
+    )
@@ -0,0 +1,54 @@
+import pytest
+
+from backend.app import create_app
+from backend.app.bootstrap import bootstrap_database
+from backend.app.config import Config
+from backend.app.extensions import db
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """Build an app on a fresh SQLite file with ``overrides`` applied to Config."""
+    apps = []
+
+    def make(**overrides):
+        settings = {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'test.db'}",
+            "DOCS_ENABLED": False,
+            "TELEMETRY_ARCHIVE_DIR": str(tmp_path / "archive"),
+            "VERSION_STORE": f"sqlite:///{tmp_path / 'versions.db'}",
+            "RESPONSE_CACHE": f"sqlite:///{tmp_path / 'responses.db'}",
+            **overrides,
+        }
+        app = create_app(type("TestConfig", (Config,), settings))
+        with app.app_context():
+            bootstrap_database()
+        apps.append(app)
+        return app
+
+    yield make
+    for app in apps:
+        buffer = app.extensions.get("ingest_buffer")
+        if buffer is not None:
+            buffer.stop()
+        app.extensions["position_cache"].stop()
+        with app.app_context():
+            db.engine.dispose()
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def vehicle_id(client):
+    response = client.post("/api/vehicles", json={"plate_number": "TEST-1"})
+    assert response.status_code == 201
+    return response.get_json()["id"]
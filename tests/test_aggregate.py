@@ -0,0 +1,123 @@
+import pytest
+
+WINDOW = {"since": "2026-03-01T08:00:00", "until": "2026-03-01T08:15:00"}
+
+
+@pytest.fixture
+def readings(client, vehicle_id):
+    other = client.post("/api/vehicles", json={"plate_number": "TEST-2"})
+    rows = [
+        ("07:59:59", 99.0, None),
+        ("08:00:10", 10.0, 1.0),
+        ("08:03:00", 20.0, 2.0),
+        ("08:04:59", 30.0, 3.0),
+        ("08:05:00", 40.0, 4.0),
+        # Same timestamp: the later reading is the last of its bucket.
+        ("08:12:00", 50.0, 5.0),
+        ("08:12:00", 60.0, 6.0),
+        ("08:15:00", 99.0, None),
+    ]
+    batch = [
+        {
+            "vehicle_id": vehicle_id,
+            "timestamp": f"2026-03-01T{time}",
+            "speed_kmh": speed,
+            "latitude": latitude,
+        }
+        for time, speed, latitude in rows
+    ]
+    batch.append(
+        {
+            "vehicle_id": other.get_json()["id"],
+            "timestamp": "2026-03-01T08:01:00",
+            "speed_kmh": 99.0,
+        }
+    )
+    assert client.post("/api/telemetry/batch", json=batch).status_code == 201
+    return vehicle_id
+
+
+def aggregate(client, vehicle_id, **params):
+    return client.get(
+        f"/api/vehicles/{vehicle_id}/telemetry/aggregate",
+        query_string={**WINDOW, **params},
+    )
+
+
+def test_five_minute_buckets(client, readings):
+    data = aggregate(client, readings, bucket="5m").get_json()
+    assert (data["bucket"], data["since"], data["until"]) == (
+        "5m",
+        "2026-03-01T08:00:00",
+        "2026-03-01T08:15:00",
+    )
+    assert data["buckets"] == [
+        {
+            "start": "2026-03-01T08:00:00",
+            "count": 3,
+            "speed_min": 10.0,
+            "speed_max": 30.0,
+            "speed_avg": 20.0,
+            "speed_last": 30.0,
+            "latitude": 3.0,
+            "longitude": None,
+            "last_timestamp": "2026-03-01T08:04:59",
+        },
+        {
+            "start": "2026-03-01T08:05:00",
+            "count": 1,
+            "speed_min": 40.0,
+            "speed_max": 40.0,
+            "speed_avg": 40.0,
+            "speed_last": 40.0,
+            "latitude": 4.0,
+            "longitude": None,
+            "last_timestamp": "2026-03-01T08:05:00",
+        },
+        {
+            "start": "2026-03-01T08:10:00",
+            "count": 2,
+            "speed_min": 50.0,
+            "speed_max": 60.0,
+            "speed_avg": 55.0,
+            "speed_last": 60.0,
+            "latitude": 6.0,
+            "longitude": None,
+            "last_timestamp": "2026-03-01T08:12:00",
+        },
+    ]
+
+
+def test_one_minute_buckets_omit_empty_minutes(client, readings):
+    buckets = aggregate(client, readings, bucket="1m").get_json()["buckets"]
+    assert [(b["start"][11:], b["count"], b["speed_last"]) for b in buckets] == [
+        ("08:00:00", 1, 10.0),
+        ("08:03:00", 1, 20.0),
+        ("08:04:00", 1, 30.0),
+        ("08:05:00", 1, 40.0),
+        ("08:12:00", 2, 60.0),
+    ]
+
+
+def test_default_bucket_is_five_minutes(client, readings):
+    data = aggregate(client, readings).get_json()
+    assert data["bucket"] == "5m"
+    assert len(data["buckets"]) == 3
+
+
+@pytest.mark.parametrize(
+    "params, message",
+    [
+        ({"bucket": "10m"}, "bucket must be one of 1m, 5m, 1h"),
+        ({"until": WINDOW["since"]}, "since must be before until"),
+        (
+            {"since": "2026-02-01T00:00:00"},
+            "time window too large for this bucket size",
+        ),
+    ],
+)
+def test_invalid_windows_are_refused(make_app, vehicle_id, params, message):
+    client = make_app(AGGREGATE_MAX_BUCKETS=1000).test_client()
+    response = aggregate(client, vehicle_id, **{"bucket": "1m", **params})
+    assert response.status_code == 400
+    assert response.get_json() == {"message": message}
@@ -0,0 +1,142 @@
+import glob
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+import pyarrow.parquet  # noqa: E402
+
+from backend.app.archive import archive_readings  # noqa: E402
+from backend.app.extensions import db  # noqa: E402
+from backend.app.models import TelematicsReading  # noqa: E402
+
+START = datetime(2026, 1, 31)
+# Ten readings six hours apart; the six archived span January and February.
+TIMESTAMPS = [START + timedelta(hours=6 * i) for i in range(10)]
+CUTOFF = TIMESTAMPS[6]
+
+
+@pytest.fixture
+def archived(app, client, vehicle_id):
+    response = client.post(
+        "/api/telemetry/batch",
+        json=[
+            {
+                "vehicle_id": vehicle_id,
+                "timestamp": timestamp.isoformat(),
+                "speed_kmh": float(i),
+                "raw_payload": f"payload {i}" if i == 0 else None,
+            }
+            for i, timestamp in enumerate(TIMESTAMPS)
+        ],
+    )
+    assert response.status_code == 201
+    with app.app_context():
+        result = archive_readings(app.config["TELEMETRY_ARCHIVE_DIR"], CUTOFF, 4)
+        assert result["rows"] == 6
+        assert TelematicsReading.query.count() == 4
+    return app
+
+
+def speeds(client, vehicle_id, **params) -> tuple[list[float], dict]:
+    response = client.get(f"/api/vehicles/{vehicle_id}/telemetry", query_string=params)
+    assert response.status_code == 200
+    return [r["speed_kmh"] for r in response.get_json()], response.headers
+
+
+def walk(client, vehicle_id, **params) -> list[list[float]]:
+    pages = []
+    cursor = None
+    while True:
+        extra = {"cursor": cursor} if cursor else {}
+        page, headers = speeds(client, vehicle_id, **params, **extra)
+        pages.append(page)
+        cursor = headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+
+
+def test_archive_files_are_per_vehicle_and_month(archived, vehicle_id):
+    root = archived.config["TELEMETRY_ARCHIVE_DIR"]
+    files = sorted(glob.glob(os.path.join(root, "*", "*", "*.parquet")))
+    months = {os.path.basename(os.path.dirname(path)) for path in files}
+    assert months == {"month=2026-01", "month=2026-02"}
+    assert all(f"vehicle_id={vehicle_id}" in path for path in files)
+
+    rows = [
+        row for path in files for row in pyarrow.parquet.read_table(path).to_pylist()
+    ]
+    assert sorted(row["speed_kmh"] for row in rows) == [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+    assert {row["raw_payload"] for row in rows} == {"payload 0", None}
+
+
+def test_pages_fall_through_to_the_archive(archived, client, vehicle_id):
+    pages = walk(client, vehicle_id, limit=3)
+    assert pages == [
+        [9.0, 8.0, 7.0],
+        [6.0, 5.0, 4.0],
+        [3.0, 2.0, 1.0],
+        [0.0],
+    ]
+
+
+def test_time_window_inside_the_archive(archived, client, vehicle_id):
+    page, headers = speeds(
+        client,
+        vehicle_id,
+        since=TIMESTAMPS[2].isoformat(),
+        until=TIMESTAMPS[5].isoformat(),
+    )
+    assert page == [4.0, 3.0, 2.0]
+    assert "X-Next-Cursor" not in headers
+
+
+def test_rows_left_by_an_interrupted_run_are_served_once(archived, client, vehicle_id):
+    # An interrupted batch leaves its files written and its rows in place.
+    with archived.app_context():
+        db.session.add(
+            TelematicsReading(
+                id=1, vehicle_id=vehicle_id, timestamp=TIMESTAMPS[0], speed_kmh=0.0
+            )
+        )
+        db.session.commit()
+    assert sum(walk(client, vehicle_id, limit=4), []) == [
+        float(i) for i in reversed(range(10))
+    ]
+
+
+def test_fallthrough_can_be_turned_off(archived, make_app, vehicle_id):
+    client = make_app(TELEMETRY_ARCHIVE_FALLTHROUGH=False).test_client()
+    assert speeds(client, vehicle_id)[0] == [9.0, 8.0, 7.0, 6.0]
+
+
+def test_polls_reuse_the_file_index_until_the_next_run(
+    archived, client, vehicle_id, monkeypatch
+):
+    listed = []
+    listdir = os.listdir
+    monkeypatch.setattr(
+        os, "listdir", lambda path: listed.append(path) or listdir(path)
+    )
+    url = f"/api/vehicles/{vehicle_id}/telemetry"
+    cursor = client.get(url, query_string={"limit": 1}).headers["X-Latest-Cursor"]
+
+    def poll(limit):
+        # A new limit each time so that the response cache is bypassed.
+        params = {"newer_than": cursor, "limit": limit}
+        return [r["id"] for r in client.get(url, query_string=params).get_json()]
+
+    assert [poll(limit) for limit in (10, 20, 30)] == [[], [], []]
+    assert len(listed) == 3  # the vehicle and its two month directories, once
+
+    # A late reading with an old timestamp is archived by a later run.
+    with archived.app_context():
+        db.session.add(
+            TelematicsReading(vehicle_id=vehicle_id, timestamp=TIMESTAMPS[1])
+        )
+        db.session.commit()
+        result = archive_readings(archived.config["TELEMETRY_ARCHIVE_DIR"], CUTOFF, 4)
+        assert result["rows"] == 1
+    assert poll(40) == [11]
@@ -0,0 +1,178 @@
+import asyncio
+import gzip
+import json
+import threading
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("aiosqlite")
+
+from backend.app.async_ingest import ArraySplitter, AsyncIngestApp  # noqa: E402
+
+JSON = {"Content-Type": "application/json"}
+
+
+def strip_ids(data):
+    if isinstance(data, dict):
+        return {k: strip_ids(v) for k, v in data.items() if k != "id"}
+    if isinstance(data, list):
+        return [strip_ids(item) for item in data]
+    return data
+
+
+def normalise(status, content_type, body: bytes):
+    if content_type == "application/json":
+        body = strip_ids(json.loads(body))
+    return status, content_type, body
+
+
+def both(app, path: str, body: bytes, headers: dict, chunk_size=None) -> tuple:
+    """
+    The same request answered by the Flask route and the ASGI route, which
+    receives the body in ``chunk_size`` pieces if given.
+    """
+    response = app.test_client().post(path, data=body, headers=headers)
+    flask = normalise(response.status_code, response.content_type, response.data)
+
+    async def chunks():
+        for start in range(0, len(body), chunk_size):
+            yield body[start : start + chunk_size]
+
+    async def post():
+        asgi = AsyncIngestApp(app)
+        transport = httpx.ASGITransport(app=asgi)
+        content = body if chunk_size is None else chunks()
+        try:
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                return await client.post(path, content=content, headers=headers)
+        finally:
+            await asgi.dispose()
+
+    response = asyncio.run(post())
+    asgi = normalise(
+        response.status_code, response.headers["content-type"], response.content
+    )
+    return flask, asgi
+
+
+def reading(vehicle_id, **fields):
+    return {"vehicle_id": vehicle_id, **fields}
+
+
+@pytest.mark.parametrize(
+    "path, body, headers",
+    [
+        ("/api/telemetry", b"{not json", JSON),
+        ("/api/telemetry", b"[1, 2]", JSON),
+        ("/api/telemetry", b'{"vehicle_id": "1"}', JSON),
+        ("/api/telemetry", b'{"vehicle_id": 999}', JSON),
+        ("/api/telemetry", b'{"vehicle_id": 1}', {"Content-Type": "text/plain"}),
+        ("/api/telemetry", b"{}", {**JSON, "Content-Encoding": "br"}),
+        ("/api/telemetry", b"not gzip", {**JSON, "Content-Encoding": "gzip"}),
+        (
+            "/api/telemetry",
+            gzip.compress(b'{"vehicle_id": 1}')[:-10],
+            {**JSON, "Content-Encoding": "gzip"},
+        ),
+        ("/api/telemetry/batch", b"{not json", JSON),
+        ("/api/telemetry/batch", b'{"vehicle_id": 1}', JSON),
+        ("/api/telemetry/batch", b"[]", JSON),
+        ("/api/telemetry/batch", b'[{"vehicle_id": 999}, 5]', JSON),
+        ("/api/telemetry/batch", b"[1,]", JSON),
+        ("/api/telemetry/batch", b"[1 2]", JSON),
+        ("/api/telemetry/batch", b'[{"vehicle_id": 999}] x', JSON),
+        ("/api/telemetry/batch", b'[{"a": NaN}]', JSON),
+        ("/api/telemetry/batch", b'[{"vehicle_id": 999}]', {}),
+        ("/api/telemetry/batch", b"[" + b"{}," * 3 + b"{}]", JSON),
+        ("/api/telemetry/batch", b"[" + b"{}," * 3 + b"{]", JSON),
+    ],
+)
+def test_rejections_match_the_flask_routes(make_app, vehicle_id, path, body, headers):
+    app = make_app(TELEMETRY_BATCH_MAX_ITEMS=3)
+    flask, asgi = both(app, path, body, headers)
+    assert asgi == flask
+    assert flask[0] >= 400
+
+
+def test_created_readings_match_the_flask_routes(app, vehicle_id):
+    single = json.dumps(reading(vehicle_id, speed_kmh=12.5)).encode()
+    assert both(app, "/api/telemetry", single, JSON) == (
+        (201, "application/json", {}),
+        (201, "application/json", {}),
+    )
+
+    batch = json.dumps([reading(vehicle_id), reading(999), "x"]).encode()
+    flask, asgi = both(app, "/api/telemetry/batch", batch, JSON)
+    assert asgi == flask
+    assert flask[0] == 207
+    assert flask[2]["accepted"] == 1
+
+
+def test_buffered_readings_are_queued_like_the_flask_route(make_app, vehicle_id):
+    app = make_app(TELEMETRY_BUFFERED=True)
+    body = json.dumps(reading(vehicle_id)).encode()
+    flask, asgi = both(app, "/api/telemetry", body, JSON)
+    assert asgi == flask == (202, "application/json", {"status": "queued"})
+    assert app.extensions["ingest_buffer"].stats()["enqueued"] == 2
+
+
+def test_batches_are_read_as_they_arrive(app, vehicle_id):
+    readings = [
+        reading(vehicle_id, raw_payload='a "quoted" [payload], with {brackets}\\'),
+        reading(vehicle_id, raw_payload="caf\u00e9"),
+        reading(999),
+    ]
+    body = json.dumps(readings, indent=2, ensure_ascii=False).encode()
+    flask, asgi = both(app, "/api/telemetry/batch", body, JSON, chunk_size=3)
+    assert asgi == flask
+    assert flask[2]["accepted"] == 2
+
+    compressed = gzip.compress(body)
+    headers = {**JSON, "Content-Encoding": "gzip"}
+    flask, asgi = both(app, "/api/telemetry/batch", compressed, headers, 7)
+    assert asgi == flask
+    assert flask[0] == 207
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "[]",
+        ' [ 1 , "a,]\\\\" , [2, [3]], {"b": {"c": ["]"]}}, "\\"", null ] ',
+        "[{}]",
+    ],
+)
+def test_arrays_split_into_their_items_at_any_chunk_size(text):
+    body = text.encode()
+    for size in range(1, len(body) + 1):
+        splitter = ArraySplitter()
+        items = []
+        for start in range(0, len(body), size):
+            items.extend(splitter.feed(body[start : start + size]))
+        assert splitter.finish()
+        assert [json.loads(item) for item in items] == json.loads(text)
+
+
+@pytest.mark.parametrize("text", ["", "{}", "[", "[1,", "[,1]", "[1]]", "[1] x", "[}]"])
+def test_other_bodies_are_not_arrays(text):
+    splitter = ArraySplitter()
+    splitter.feed(text.encode())
+    assert not splitter.finish()
+
+
+def test_version_store_is_bumped_off_the_event_loop(app, vehicle_id):
+    store = app.extensions["version_store"]
+    threads = []
+    bump = store.bump
+    store.bump = lambda tables: threads.append(threading.current_thread()) or bump(
+        tables
+    )
+    body = json.dumps(reading(vehicle_id)).encode()
+    flask, asgi = both(app, "/api/telemetry", body, JSON)
+    assert asgi[0] == 201
+    # The Flask request bumped from this thread, the ASGI one from a worker.
+    assert threads[0] is threading.current_thread()
+    assert threads[-1] is not threading.current_thread()
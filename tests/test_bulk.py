@@ -0,0 +1,47 @@
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import mysql
+from sqlalchemy.sql.elements import TextClause
+
+from backend.app.bulk import MYSQL_INSERT_CHUNK, bulk_insert
+from backend.app.models import Driver
+
+
+class FakeMySQLSession:
+    """Hands out auto-increment ids the way InnoDB does for multi-row INSERTs."""
+
+    def __init__(self, first_id: int, step: int):
+        self.next_id = first_id
+        self.step = step
+        self.inserts = []
+
+    def get_bind(self):
+        return SimpleNamespace(dialect=mysql.dialect())
+
+    def execute(self, statement, parameters=None):
+        if isinstance(statement, TextClause):
+            return SimpleNamespace(scalar=lambda: self.step)
+        compiled = statement.compile(dialect=mysql.dialect())
+        # One full_name parameter per row of the multi-row VALUES clause.
+        rows = sum(1 for name in compiled.params if name.startswith("full_name"))
+        self.inserts.append(rows)
+        first, self.next_id = self.next_id, self.next_id + rows * self.step
+        return SimpleNamespace(lastrowid=first)
+
+
+def test_mysql_ids_come_from_last_insert_id():
+    session = FakeMySQLSession(first_id=41, step=2)
+    rows = [
+        {"company_id": 1, "full_name": f"D{i}"} for i in range(MYSQL_INSERT_CHUNK + 5)
+    ]
+
+    ids = bulk_insert(Driver, rows, session)
+
+    assert session.inserts == [MYSQL_INSERT_CHUNK, 5]
+    assert ids == list(range(41, 41 + 2 * len(rows), 2))
+
+
+def test_mysql_rows_with_their_own_ids_report_none():
+    session = FakeMySQLSession(first_id=1, step=1)
+    rows = [{"id": 7, "company_id": 1, "full_name": "D"}]
+    assert bulk_insert(Driver, rows, session) is None
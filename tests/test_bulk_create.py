@@ -0,0 +1,135 @@
+import pytest
+
+from backend.app import routes
+from backend.app.extensions import db
+from backend.app.models import Vehicle
+
+URL = "/api/vehicles/bulk"
+
+
+def plates(app) -> list[str]:
+    with app.app_context():
+        return [v.plate_number for v in Vehicle.query.order_by(Vehicle.id)]
+
+
+def statuses(response) -> list[str]:
+    return [result["status"] for result in response.get_json()["results"]]
+
+
+def test_all_items_created(app, client):
+    response = client.post(URL, json=[{"plate_number": "A"}, {"plate_number": "B"}])
+    assert response.status_code == 201
+    data = response.get_json()
+    assert (data["created"], data["failed"]) == (2, 0)
+    assert [r["id"] for r in data["results"]] == [1, 2]
+    assert plates(app) == ["A", "B"]
+
+
+def test_failures_are_reported_per_item(app, client, vehicle_id):
+    response = client.post(
+        URL,
+        json=[
+            {"plate_number": "A"},
+            {"plate_number": "TEST-1"},
+            {"plate_number": "B", "company_id": 999},
+            {"plate_number": "A"},
+            {"vin": "no plate"},
+            {"plate_number": "C"},
+        ],
+    )
+    assert response.status_code == 207
+    assert statuses(response) == [
+        "created",
+        "conflict",
+        "rejected",
+        "conflict",
+        "rejected",
+        "created",
+    ]
+    messages = [r.get("message") for r in response.get_json()["results"]]
+    assert messages[1:5] == [
+        "plate_number TEST-1 already exists",
+        "unknown company_id 999",
+        "duplicate plate_number A in request",
+        "plate_number is required",
+    ]
+    assert plates(app) == ["TEST-1", "A", "C"]
+
+
+def test_only_conflicts_is_a_conflict(client, vehicle_id):
+    response = client.post(URL, json=[{"plate_number": "TEST-1"}])
+    assert response.status_code == 409
+    assert statuses(response) == ["conflict"]
+
+
+def test_only_rejections_is_a_bad_request(client):
+    response = client.post(URL, json=[{"plate_number": "A", "company_id": 999}])
+    assert response.status_code == 400
+    assert statuses(response) == ["rejected"]
+
+
+def test_atomic_batch_with_a_failure_stores_nothing(app, client, vehicle_id):
+    response = client.post(
+        URL,
+        query_string={"atomic": "true"},
+        json=[{"plate_number": "A"}, {"plate_number": "TEST-1"}],
+    )
+    assert response.status_code == 409
+    assert statuses(response) == ["skipped", "conflict"]
+    assert plates(app) == ["TEST-1"]
+
+
+@pytest.mark.parametrize(
+    "body, status", [({"plate_number": "A"}, 400), ([{}] * 3, 413)]
+)
+def test_body_must_be_a_short_array(make_app, body, status):
+    client = make_app(BULK_CREATE_MAX_ITEMS=2).test_client()
+    assert client.post(URL, json=body).status_code == status
+
+
+@pytest.fixture
+def racing(monkeypatch, vehicle_id):
+    """Let the first unique check miss rows a concurrent request inserts."""
+    find_conflicts = routes.find_conflicts
+    calls = []
+
+    def late_check(model, rows):
+        calls.append(len(rows))
+        if len(calls) == 1:
+            first = db.session.get(Vehicle, vehicle_id)
+            db.session.add(
+                Vehicle(
+                    plate_number="TAKEN",
+                    status="active",
+                    company_id=first.company_id,
+                    vehicle_type_id=first.vehicle_type_id,
+                )
+            )
+            db.session.commit()
+            return [None] * len(rows)
+        return find_conflicts(model, rows)
+
+    monkeypatch.setattr(routes, "find_conflicts", late_check)
+    return calls
+
+
+def test_concurrent_conflicts_are_reported_per_item(app, client, racing):
+    response = client.post(URL, json=[{"plate_number": "TAKEN"}, {"plate_number": "A"}])
+    assert response.status_code == 207
+    assert statuses(response) == ["conflict", "created"]
+    assert response.get_json()["results"][0]["message"] == (
+        "plate_number TAKEN already exists"
+    )
+    assert plates(app) == ["TEST-1", "TAKEN", "A"]
+    assert racing == [2, 2]
+
+
+def test_atomic_batch_losing_a_race_stores_nothing(app, client, racing):
+    response = client.post(
+        URL,
+        query_string={"atomic": "true"},
+        json=[{"plate_number": "TAKEN"}, {"plate_number": "A"}],
+    )
+    assert response.status_code == 409
+    assert statuses(response) == ["conflict", "skipped"]
+    assert plates(app) == ["TEST-1", "TAKEN"]
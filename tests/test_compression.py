@@ -0,0 +1,102 @@
+import gzip
+import json
+import zlib
+
+import pytest
+
+JSON = {"Content-Type": "application/json"}
+
+
+def post_reading(app, body: bytes, encoding: str):
+    return app.test_client().post(
+        "/api/telemetry", data=body, headers={**JSON, "Content-Encoding": encoding}
+    )
+
+
+@pytest.mark.parametrize(
+    "encoding, compress",
+    [("gzip", gzip.compress), ("x-gzip", gzip.compress), ("deflate", zlib.compress)],
+)
+def test_compressed_request_bodies_are_inflated(app, vehicle_id, encoding, compress):
+    body = json.dumps({"vehicle_id": vehicle_id, "speed_kmh": 5.0}).encode()
+    response = post_reading(app, compress(body), encoding)
+    assert response.status_code == 201
+
+
+def test_concatenated_gzip_members_are_read_in_turn(app, vehicle_id):
+    lines = [json.dumps({"vehicle_id": vehicle_id}).encode() + b"\n"] * 2
+    response = app.test_client().post(
+        "/api/telemetry/ndjson",
+        data=b"".join(gzip.compress(line) for line in lines),
+        headers={"Content-Type": "application/x-ndjson", "Content-Encoding": "gzip"},
+    )
+    assert response.get_json()["accepted"] == 2
+
+
+@pytest.mark.parametrize(
+    "body, message",
+    [
+        (b"not gzip at all", "invalid compressed request body"),
+        (
+            gzip.compress(b'{"vehicle_id": 1}')[:-10],
+            "truncated compressed request body",
+        ),
+    ],
+)
+def test_corrupt_bodies_are_json_bad_requests(app, body, message):
+    response = post_reading(app, body, "gzip")
+    assert response.status_code == 400
+    assert response.get_json() == {"message": message}
+
+
+def test_inflated_size_is_limited(make_app, vehicle_id):
+    app = make_app(REQUEST_DECOMPRESSION_MAX_BYTES=1000)
+    body = json.dumps({"vehicle_id": vehicle_id, "raw_payload": " " * 5000}).encode()
+    response = post_reading(app, gzip.compress(body), "gzip")
+    assert response.status_code == 413
+    assert response.get_json() == {
+        "message": "decompressed request body exceeds 1000 bytes"
+    }
+
+
+def test_unsupported_encodings_are_refused(app):
+    response = post_reading(app, b"{}", "compress")
+    assert response.status_code == 415
+    assert response.headers["Accept-Encoding"] == "gzip, deflate"
+
+
+def test_other_paths_are_not_inflated(make_app):
+    app = make_app(REQUEST_DECOMPRESSION_PATHS="/api/telemetry/ndjson")
+    response = post_reading(app, gzip.compress(b"{}"), "gzip")
+    assert response.status_code == 400
+    assert b"compressed request body" not in response.data
+
+
+@pytest.fixture
+def vehicles(make_app):
+    app = make_app(RESPONSE_COMPRESSION="gzip", RESPONSE_COMPRESSION_MIN_SIZE=200)
+    client = app.test_client()
+    for i in range(10):
+        client.post("/api/vehicles", json={"plate_number": f"PLATE-{i}"})
+    return client
+
+
+def test_responses_use_the_accepted_encoding(vehicles):
+    plain = vehicles.get("/api/vehicles")
+    assert "Content-Encoding" not in plain.headers
+    assert "Accept-Encoding" in plain.headers["Vary"]
+
+    response = vehicles.get("/api/vehicles", headers={"Accept-Encoding": "br, gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.data) == plain.data
+
+
+@pytest.mark.parametrize("accept", ["identity", "br", "gzip;q=0"])
+def test_unacceptable_encodings_are_not_used(vehicles, accept):
+    response = vehicles.get("/api/vehicles", headers={"Accept-Encoding": accept})
+    assert "Content-Encoding" not in response.headers
+
+
+def test_small_responses_are_not_compressed(vehicles):
+    response = vehicles.get("/", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
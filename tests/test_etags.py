@@ -0,0 +1,76 @@
+import os
+
+from backend.app.versions import MemoryVersionStore
+
+
+def test_matching_etag_gets_304(client):
+    first = client.get("/api/drivers")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    again = client.get("/api/drivers", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+    assert again.get_data() == b""
+
+
+def test_weak_and_compressed_variants_match(client):
+    etag = client.get("/api/drivers").headers["ETag"].strip('"')
+    for tag in (f'W/"{etag}"', f'"{etag}-gzip"'):
+        response = client.get("/api/drivers", headers={"If-None-Match": tag})
+        assert response.status_code == 304, tag
+
+
+def test_write_changes_the_etag(client):
+    etag = client.get("/api/drivers").headers["ETag"]
+    assert client.post("/api/drivers", json={"full_name": "A"}).status_code == 201
+
+    response = client.get("/api/drivers", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert [d["full_name"] for d in response.get_json()] == ["A"]
+
+
+def test_etag_depends_on_the_url(client):
+    plain = client.get("/api/drivers").headers["ETag"]
+    response = client.get("/api/drivers?limit=1", headers={"If-None-Match": plain})
+    assert response.status_code == 200
+
+
+def test_write_in_another_process_changes_the_etag(make_app):
+    # Two apps on the same database and version store stand in for two
+    # workers.
+    worker_a = make_app().test_client()
+    worker_b = make_app().test_client()
+    etag = worker_b.get("/api/drivers").headers["ETag"]
+
+    worker_a.post("/api/drivers", json={"full_name": "A"})
+
+    response = worker_b.get("/api/drivers", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.get_json()) == 1
+
+
+def test_shared_store_keeps_databases_apart(make_app, tmp_path):
+    # Same version store file, different databases.
+    app_a = make_app()
+    app_b = make_app(SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'other.db'}")
+    store_a = app_a.extensions["version_store"]
+    store_b = app_b.extensions["version_store"]
+    before = store_b.get("drivers")
+
+    app_a.test_client().post("/api/drivers", json={"full_name": "A"})
+
+    assert store_b.get("drivers") == before
+    assert store_a.get("drivers") != before
+
+
+def test_memory_store_draws_a_new_epoch_after_fork(monkeypatch):
+    store = MemoryVersionStore()
+    store.bump(["drivers"])
+    parent = store.get("drivers")
+
+    monkeypatch.setattr(os, "getpid", lambda: store.pid + 1)
+    child = store.get("drivers")
+    assert child != parent
+    assert child.endswith(".0")
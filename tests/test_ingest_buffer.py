@@ -0,0 +1,89 @@
+import time
+
+import pytest
+
+from backend.app.models import TelematicsReading
+
+
+@pytest.fixture
+def buffered(make_app):
+    def make(**config):
+        app = make_app(TELEMETRY_BUFFERED=True, **config)
+        return app, app.extensions["ingest_buffer"]
+
+    return make
+
+
+def post(app, *vehicle_ids):
+    client = app.test_client()
+    for vehicle_id in vehicle_ids:
+        response = client.post("/api/telemetry", json={"vehicle_id": vehicle_id})
+        assert response.status_code == 202
+
+
+def wait_for(buffer, written: int) -> dict:
+    deadline = time.monotonic() + 5
+    while buffer.stats()["written"] + buffer.stats()["failed"] < written:
+        assert time.monotonic() < deadline, buffer.stats()
+        time.sleep(0.01)
+    return buffer.stats()
+
+
+def stored(app) -> int:
+    with app.app_context():
+        return TelematicsReading.query.count()
+
+
+def test_full_batches_are_flushed_without_waiting(buffered, vehicle_id):
+    app, buffer = buffered(
+        TELEMETRY_BUFFER_FLUSH_SIZE=3, TELEMETRY_BUFFER_FLUSH_INTERVAL=30
+    )
+    post(app, *[vehicle_id] * 3)
+    stats = wait_for(buffer, 3)
+    assert (stats["written"], stats["flushes"]) == (3, 1)
+    assert stored(app) == 3
+
+
+def test_partial_batches_are_flushed_after_the_interval(buffered, vehicle_id):
+    app, buffer = buffered(
+        TELEMETRY_BUFFER_FLUSH_SIZE=100, TELEMETRY_BUFFER_FLUSH_INTERVAL=0.05
+    )
+    post(app, vehicle_id, vehicle_id)
+    stats = wait_for(buffer, 2)
+    assert (stats["written"], stats["queue_depth"]) == (2, 0)
+    assert stored(app) == 2
+
+
+def test_readings_with_unknown_references_are_counted_as_failed(buffered, vehicle_id):
+    app, buffer = buffered(TELEMETRY_BUFFER_FLUSH_INTERVAL=0.05)
+    post(app, vehicle_id, 999)
+    stats = wait_for(buffer, 2)
+    assert (stats["written"], stats["failed"]) == (1, 1)
+    assert stored(app) == 1
+
+
+def test_stop_flushes_queued_rows_at_once(buffered, vehicle_id):
+    app, buffer = buffered(
+        TELEMETRY_BUFFER_FLUSH_SIZE=100, TELEMETRY_BUFFER_FLUSH_INTERVAL=30
+    )
+    post(app, *[vehicle_id] * 3)
+    started = time.monotonic()
+    buffer.stop()
+    assert time.monotonic() - started < 5
+    assert buffer.stats()["written"] == 3
+    assert stored(app) == 3
+
+
+def test_invalid_readings_are_refused_before_queueing(buffered):
+    app, buffer = buffered()
+    response = app.test_client().post("/api/telemetry", json={"speed_kmh": 1})
+    assert response.status_code == 400
+    assert buffer.stats()["enqueued"] == 0
+
+
+def test_metrics_report_the_buffer(buffered, vehicle_id):
+    app, buffer = buffered(TELEMETRY_BUFFER_FLUSH_INTERVAL=0.05)
+    post(app, vehicle_id)
+    wait_for(buffer, 1)
+    stats = app.test_client().get("/api/metrics").get_json()["ingest_buffer"]
+    assert (stats["enqueued"], stats["written"]) == (1, 1)
@@ -0,0 +1,38 @@
+import json
+from datetime import date, datetime
+
+import pytest
+
+from backend.app.json_provider import OrjsonProvider, StdlibJSONProvider
+
+pytest.importorskip("orjson")
+
+COMPACT = {"separators": (",", ":")}
+SAMPLE = {
+    "b": [1, 2.5, None, True],
+    "a": {"name": "Čačak ☃ 𝄞", "at": datetime(2026, 3, 1, 8, 30, 1, 5)},
+    "day": date(2026, 3, 1),
+}
+
+
+@pytest.fixture
+def providers(app):
+    return OrjsonProvider(app), StdlibJSONProvider(app)
+
+
+def test_output_matches_the_stdlib_provider(providers):
+    fast, stdlib = providers
+    assert fast.dumps(SAMPLE, **COMPACT) == stdlib.dumps(SAMPLE, **COMPACT)
+
+
+@pytest.mark.parametrize("value", [float("nan"), float("inf"), float("-inf")])
+def test_non_finite_floats_fall_back_to_the_stdlib_encoder(providers, value):
+    fast, stdlib = providers
+    payload = [{"speed_kmh": None}, {"speed_kmh": value}]
+    assert fast.dumps(payload, **COMPACT) == stdlib.dumps(payload, **COMPACT)
+
+
+@pytest.mark.parametrize("value", [1e-5, 1e16, 0.1, -0.0, 123456789.123])
+def test_floats_parse_to_the_same_value(providers, value):
+    fast, stdlib = providers
+    assert json.loads(fast.dumps([value])) == json.loads(stdlib.dumps([value]))
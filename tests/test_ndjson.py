@@ -0,0 +1,105 @@
+import gzip
+import json
+
+import pytest
+
+from backend.app.models import TelematicsReading
+
+URL = "/api/telemetry/ndjson"
+
+
+def ndjson(*items) -> bytes:
+    return b"".join(
+        (item if isinstance(item, bytes) else json.dumps(item).encode()) + b"\n"
+        for item in items
+    )
+
+
+@pytest.fixture
+def ingest(make_app):
+    def post(body, headers=None, **config):
+        app = make_app(**config) if config else make_app()
+        response = app.test_client().post(
+            URL,
+            data=body,
+            headers={"Content-Type": "application/x-ndjson", **(headers or {})},
+        )
+        with app.app_context():
+            stored = [
+                r.speed_kmh
+                for r in TelematicsReading.query.order_by(TelematicsReading.id)
+            ]
+        return response, stored
+
+    return post
+
+
+def test_every_line_is_stored_across_chunks(ingest, vehicle_id):
+    body = ndjson(
+        *({"vehicle_id": vehicle_id, "speed_kmh": float(i)} for i in range(5))
+    )
+    response, stored = ingest(body, TELEMETRY_NDJSON_CHUNK_SIZE=2)
+    assert response.status_code == 201
+    assert response.get_json() == {
+        "accepted": 5,
+        "rejected": 0,
+        "errors": [],
+        "errors_truncated": False,
+    }
+    assert stored == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+
+def test_rejected_lines_are_listed_up_to_the_limit(ingest, vehicle_id):
+    body = ndjson(
+        {"vehicle_id": vehicle_id, "speed_kmh": 1.0},
+        b"{not json",
+        {"speed_kmh": 2.0},
+        {"vehicle_id": 999, "speed_kmh": 3.0},
+        b"",
+        {"vehicle_id": vehicle_id, "speed_kmh": 4.0},
+    )
+    response, stored = ingest(body, TELEMETRY_NDJSON_MAX_ERRORS=2)
+    assert response.status_code == 207
+    data = response.get_json()
+    assert (data["accepted"], data["rejected"]) == (2, 3)
+    assert [error["line"] for error in data["errors"]] == [2, 3]
+    assert data["errors"][0]["message"] == "invalid JSON"
+    assert data["errors_truncated"] is True
+    assert stored == [1.0, 4.0]
+
+
+def test_unknown_vehicle_is_reported_by_line(ingest, vehicle_id):
+    body = ndjson({"vehicle_id": 999}, {"vehicle_id": vehicle_id, "speed_kmh": 1.0})
+    response, stored = ingest(body)
+    assert response.status_code == 207
+    assert [error["line"] for error in response.get_json()["errors"]] == [1]
+    assert stored == [1.0]
+
+
+def test_overlong_lines_are_skipped_whole(ingest, vehicle_id):
+    long_line = {"vehicle_id": vehicle_id, "raw_payload": "x" * 500}
+    body = ndjson(long_line, {"vehicle_id": vehicle_id, "speed_kmh": 1.0})
+    response, stored = ingest(body, TELEMETRY_NDJSON_MAX_LINE_BYTES=100)
+    assert response.status_code == 207
+    assert response.get_json()["errors"] == [
+        {"line": 1, "message": "line longer than 100 bytes"}
+    ]
+    # The rest of the long line is not read as a line of its own.
+    assert response.get_json()["rejected"] == 1
+    assert stored == [1.0]
+
+
+def test_nothing_accepted_is_a_bad_request(ingest):
+    response, stored = ingest(ndjson(b"[]", {"speed_kmh": 1.0}))
+    assert response.status_code == 400
+    assert response.get_json()["rejected"] == 2
+    assert stored == []
+
+
+def test_gzip_body_is_inflated(ingest, vehicle_id):
+    body = ndjson(
+        *({"vehicle_id": vehicle_id, "speed_kmh": float(i)} for i in range(3))
+    )
+    response, stored = ingest(gzip.compress(body), {"Content-Encoding": "gzip"})
+    assert response.status_code == 201
+    assert stored == [0.0, 1.0, 2.0]
@@ -0,0 +1,155 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.app.pagination import encode_time_cursor
+
+START = datetime(2026, 3, 1, 8)
+
+
+@pytest.fixture
+def post_readings(client, vehicle_id):
+    def post(*minutes):
+        response = client.post(
+            "/api/telemetry/batch",
+            json=[
+                {
+                    "vehicle_id": vehicle_id,
+                    "timestamp": (START + timedelta(minutes=m)).isoformat(),
+                    "speed_kmh": float(m),
+                }
+                for m in minutes
+            ],
+        )
+        assert response.status_code == 201
+
+    return post
+
+
+def get(client, vehicle_id, **params):
+    response = client.get(f"/api/vehicles/{vehicle_id}/telemetry", query_string=params)
+    assert response.status_code == 200
+    return response
+
+
+def speeds(response) -> list[float]:
+    return [reading["speed_kmh"] for reading in response.get_json()]
+
+
+def test_cursor_walks_back_through_every_reading(client, vehicle_id, post_readings):
+    post_readings(*range(7))
+    # Two readings sharing a timestamp must not be split or repeated.
+    post_readings(3)
+
+    pages = []
+    response = get(client, vehicle_id, limit=3)
+    pages.append(speeds(response))
+    while "X-Next-Cursor" in response.headers:
+        response = get(
+            client, vehicle_id, limit=3, cursor=response.headers["X-Next-Cursor"]
+        )
+        pages.append(speeds(response))
+
+    assert pages == [[6.0, 5.0, 4.0], [3.0, 3.0, 2.0], [1.0, 0.0]]
+    assert "Link" not in response.headers
+
+
+def test_cursor_respects_the_time_window(client, vehicle_id, post_readings):
+    post_readings(*range(10))
+    since = (START + timedelta(minutes=2)).isoformat()
+    until = (START + timedelta(minutes=8)).isoformat()
+
+    first = get(client, vehicle_id, limit=4, since=since, until=until)
+    rest = get(
+        client,
+        vehicle_id,
+        limit=4,
+        since=since,
+        until=until,
+        cursor=first.headers["X-Next-Cursor"],
+    )
+    assert speeds(first) + speeds(rest) == [7.0, 6.0, 5.0, 4.0, 3.0, 2.0]
+    assert "X-Next-Cursor" not in rest.headers
+
+
+def test_delta_returns_readings_stored_since_the_cursor(
+    client, vehicle_id, post_readings
+):
+    post_readings(10, 11)
+    latest = get(client, vehicle_id).headers["X-Latest-Cursor"]
+
+    post_readings(12)
+    # Late and backfilled readings are older than what the poller has seen.
+    post_readings(5, 0)
+    delta = get(client, vehicle_id, newer_than=latest)
+    assert speeds(delta) == [12.0, 5.0, 0.0]
+
+    empty = get(client, vehicle_id, newer_than=delta.headers["X-Latest-Cursor"])
+    assert empty.get_json() == []
+    assert empty.headers["X-Latest-Cursor"] == delta.headers["X-Latest-Cursor"]
+
+
+def test_delta_pages_until_caught_up(client, vehicle_id, post_readings):
+    post_readings(0)
+    latest = get(client, vehicle_id).headers["X-Latest-Cursor"]
+    post_readings(*range(30, 25, -1))
+
+    received = []
+    while True:
+        response = get(client, vehicle_id, limit=2, newer_than=latest)
+        received += speeds(response)
+        latest = response.headers["X-Latest-Cursor"]
+        if len(response.get_json()) < 2:
+            break
+    assert received == [30.0, 29.0, 28.0, 27.0, 26.0]
+
+
+def test_time_cursors_from_earlier_releases_are_accepted(
+    client, vehicle_id, post_readings
+):
+    post_readings(0, 1)
+    first_id = get(client, vehicle_id).get_json()[-1]["id"]
+    post_readings(2)
+
+    # X-Latest-Cursor used to carry the timestamp as well as the id.
+    delta = get(client, vehicle_id, newer_than=encode_time_cursor(START, first_id))
+    assert speeds(delta) == [1.0, 2.0]
+
+
+@pytest.mark.parametrize("param", ["cursor", "newer_than"])
+def test_malformed_cursor_is_rejected(client, vehicle_id, param):
+    response = client.get(
+        f"/api/vehicles/{vehicle_id}/telemetry", query_string={param: "not-a-cursor"}
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("path", ["/api/drivers", "/api/vehicles/{}/telemetry"])
+@pytest.mark.parametrize("limit", ["abc", "0", "-1", "1.5", " 5", "1_0", ""])
+def test_malformed_limit_is_rejected(client, vehicle_id, path, limit):
+    response = client.get(path.format(vehicle_id), query_string={"limit": limit})
+    assert response.status_code == 400
+    assert response.get_json() == {"message": "limit must be a positive integer"}
+
+
+def test_limit_is_capped(make_app, vehicle_id, post_readings):
+    client = make_app(PAGE_MAX_LIMIT=2).test_client()
+    post_readings(0, 1, 2)
+    assert len(get(client, vehicle_id, limit=50).get_json()) == 2
+
+
+def test_delta_includes_late_readings_already_archived(
+    app, client, vehicle_id, post_readings
+):
+    pytest.importorskip("pyarrow")
+    from backend.app.archive import archive_readings
+
+    post_readings(600)
+    latest = get(client, vehicle_id).headers["X-Latest-Cursor"]
+    post_readings(0, 601)
+    with app.app_context():
+        archive_readings(
+            app.config["TELEMETRY_ARCHIVE_DIR"], START + timedelta(minutes=1), 100
+        )
+
+    assert speeds(get(client, vehicle_id, newer_than=latest)) == [0.0, 601.0]
@@ -0,0 +1,124 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event, inspect
+
+from backend.app.extensions import db
+from backend.app.models import TelematicsReading, TelematicsReadingPayload
+from backend.app.partitions import maintain_partitions, partition_status
+
+MONTHS = [datetime(2026, month, 10) for month in (1, 2, 3)]
+
+
+@pytest.fixture
+def partitioned(make_app):
+    """An app whose readings span three months, partitioned by month."""
+    client = make_app().test_client()
+    vehicle_id = client.post("/api/vehicles", json={"plate_number": "P"}).get_json()[
+        "id"
+    ]
+    response = client.post(
+        "/api/telemetry/batch",
+        json=[
+            {
+                "vehicle_id": vehicle_id,
+                "timestamp": month.isoformat(),
+                "raw_payload": f"payload {month:%m}",
+            }
+            for month in MONTHS
+        ],
+    )
+    assert response.status_code == 201
+    return make_app(TELEMETRY_PARTITIONING="month")
+
+
+def table_names(app) -> set:
+    with app.app_context():
+        return set(inspect(db.engine).get_table_names())
+
+
+def test_payloads_are_partitioned_like_readings(partitioned):
+    names = table_names(partitioned)
+    for month in ("p2026_01", "p2026_02", "p2026_03", "pmax"):
+        assert f"telematics_readings_{month}" in names
+        assert f"telematics_reading_payloads_{month}" in names
+
+    with partitioned.app_context():
+        readings = TelematicsReading.query.order_by(TelematicsReading.timestamp)
+        assert [r.raw_payload for r in readings] == [
+            "payload 01",
+            "payload 02",
+            "payload 03",
+        ]
+
+
+def test_retention_drops_readings_and_payloads_without_deleting_rows(partitioned):
+    statements = []
+    with partitioned.app_context():
+        engine = db.engine
+
+        def listener(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            changes = maintain_partitions(
+                engine, "month", 0, retention_days=40, now=datetime(2026, 4, 15)
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+
+        assert changes["dropped"] == ["p2026_01", "p2026_02"]
+        assert not [s for s in statements if s.lstrip().upper().startswith("DELETE")]
+        assert [p["name"] for p in partition_status(engine)][0] == "p2026_03"
+
+        readings = TelematicsReading.query.all()
+        assert [r.timestamp for r in readings] == [MONTHS[2]]
+        assert readings[0].raw_payload == "payload 03"
+        assert TelematicsReadingPayload.query.count() == 1
+
+    names = table_names(partitioned)
+    assert "telematics_reading_payloads_p2026_01" not in names
+    assert "telematics_readings_p2026_02" not in names
+
+
+def test_new_readings_take_ids_from_the_sequence(partitioned, make_app, tmp_path):
+    client = partitioned.test_client()
+    single = client.post("/api/telemetry", json={"vehicle_id": 1})
+    batch = client.post(
+        "/api/telemetry/batch",
+        json=[{"vehicle_id": 1, "raw_payload": "x"}, {"vehicle_id": 1}],
+    )
+    assert single.get_json()["id"] == 4
+    assert [r["id"] for r in batch.get_json()["results"]] == [5, 6]
+
+    # Another app in the same process, on an unpartitioned database, keeps
+    # its own ids.
+    other = make_app(SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'other.db'}")
+    client = other.test_client()
+    vehicle_id = client.post("/api/vehicles", json={"plate_number": "O"}).get_json()[
+        "id"
+    ]
+    response = client.post("/api/telemetry", json={"vehicle_id": vehicle_id})
+    assert response.get_json()["id"] == 1
+
+
+def test_retention_invalidates_cached_telemetry_and_positions(partitioned):
+    client = partitioned.test_client()
+    url = "/api/vehicles/1/telemetry"
+    assert len(client.get(url).get_json()) == 3
+    cache = partitioned.extensions["position_cache"]
+    with partitioned.app_context():
+        cache.sync()
+    assert [p["vehicle_id"] for p in cache.snapshot()] == [1]
+
+    with partitioned.app_context():
+        changes = maintain_partitions(
+            db.engine, "month", 0, retention_days=40, now=datetime(2026, 6, 15)
+        )
+        assert "p2026_03" in changes["dropped"]
+
+        cache.sync()
+    assert cache.snapshot() == []
+
+    assert client.get(url).get_json() == []
@@ -0,0 +1,84 @@
+import sqlite3
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event, inspect
+
+from backend.app.bootstrap import bootstrap_database
+from backend.app.extensions import db
+from backend.app.models import TelematicsReading, TelematicsReadingPayload
+from backend.app.payloads import migrate_raw_payloads
+
+PAYLOAD = '{"can": [' + ", ".join(f'{{"id": {i}}}' for i in range(40)) + "]}"
+
+
+def test_payload_is_compressed_and_loaded_on_demand(app, client, vehicle_id):
+    response = client.post(
+        "/api/telemetry/batch",
+        json=[{"vehicle_id": vehicle_id, "raw_payload": PAYLOAD}, {"vehicle_id": 1}],
+    )
+    assert response.status_code == 201
+
+    with app.app_context():
+        stored = TelematicsReadingPayload.query.one()
+        assert stored.codec in ("zstd", "zlib")
+        assert len(stored.data) < len(PAYLOAD)
+
+        statements = []
+        event.listen(
+            db.engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: statements.append(statement),
+        )
+        readings = TelematicsReading.query.order_by(TelematicsReading.id).all()
+        assert not any("telematics_reading_payloads" in s for s in statements)
+        assert [r.raw_payload for r in readings] == [PAYLOAD, None]
+
+
+@pytest.fixture
+def legacy(app, tmp_path, vehicle_id):
+    """Readings written by the old schema, with payloads in the readings row."""
+    conn = sqlite3.connect(tmp_path / "test.db")
+    conn.execute("ALTER TABLE telematics_readings ADD COLUMN raw_payload TEXT")
+    conn.executemany(
+        "INSERT INTO telematics_readings (vehicle_id, timestamp, raw_payload) "
+        "VALUES (?, ?, ?)",
+        [
+            (
+                vehicle_id,
+                datetime(2026, 1, 1, 0, 0, i).strftime("%Y-%m-%d %H:%M:%S.%f"),
+                payload,
+            )
+            for i, payload in enumerate([PAYLOAD, None, "short"])
+        ],
+    )
+    conn.commit()
+    conn.close()
+    return app
+
+
+def payloads(app) -> list:
+    with app.app_context():
+        readings = TelematicsReading.query.order_by(TelematicsReading.id)
+        return [reading.raw_payload for reading in readings]
+
+
+def test_unmigrated_payloads_fall_back_to_the_legacy_column(legacy):
+    assert payloads(legacy) == [PAYLOAD, None, "short"]
+
+
+def test_init_db_migrates_legacy_payloads(legacy):
+    with legacy.app_context():
+        done = bootstrap_database()
+        assert "Moved 2 raw payloads into telematics_reading_payloads" in done
+        assert TelematicsReadingPayload.query.count() == 2
+    assert payloads(legacy) == [PAYLOAD, None, "short"]
+
+
+def test_migration_resumes_in_batches_and_drops_the_column(legacy):
+    with legacy.app_context():
+        assert migrate_raw_payloads(1)["rows"] == 2
+        assert migrate_raw_payloads(1, drop_column=True)["rows"] == 0
+        columns = inspect(db.engine).get_columns("telematics_readings")
+        assert "raw_payload" not in {c["name"] for c in columns}
+    assert payloads(legacy) == [PAYLOAD, None, "short"]
@@ -0,0 +1,49 @@
+import time
+
+from sqlalchemy import event
+
+from backend.app.extensions import db
+
+
+def test_cache_is_warmed_at_startup(make_app, client, vehicle_id):
+    response = client.post(
+        "/api/telemetry", json={"vehicle_id": vehicle_id, "latitude": 45.0}
+    )
+    assert response.status_code == 201
+
+    cache = make_app().extensions["position_cache"]
+    assert [p["vehicle_id"] for p in cache.snapshot()] == [vehicle_id]
+
+
+def test_startup_before_init_db_leaves_warming_to_the_sync_thread(app):
+    # conftest creates the tables only after create_app has returned.
+    cache = app.extensions["position_cache"]
+    assert cache.snapshot() == []
+    assert app.test_client().get("/api/fleet/snapshot").status_code == 200
+
+
+def test_snapshot_route_runs_no_query(app, client, vehicle_id):
+    client.post("/api/telemetry", json={"vehicle_id": vehicle_id, "latitude": 45.0})
+    statements = []
+    with app.app_context():
+        engine = db.engine
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        response = client.get("/api/fleet/snapshot")
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert [p["latitude"] for p in response.get_json()] == [45.0]
+    assert statements == []
+
+
+def test_sync_thread_picks_up_other_workers_readings(make_app, client, vehicle_id):
+    reader = make_app(POSITION_CACHE_SYNC_SECONDS=0.05)
+    cache = reader.extensions["position_cache"]
+    assert cache.snapshot() == []
+
+    client.post("/api/telemetry", json={"vehicle_id": vehicle_id, "latitude": 45.0})
+    deadline = time.monotonic() + 5
+    while not cache.snapshot() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert [p["vehicle_id"] for p in cache.snapshot()] == [vehicle_id]
@@ -0,0 +1,89 @@
+import pytest
+from sqlalchemy import event, insert
+
+from backend.app.extensions import db
+from backend.app.models import Company
+from backend.app.refdata import reference_data
+
+
+@pytest.fixture
+def queries(app):
+    """Statements run while the fixture is used, with a warmed cache."""
+    statements = []
+    with app.app_context():
+        reference_data().reload()
+        engine = db.engine
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def insert_company_elsewhere(app) -> int:
+    # Written outside the session, as another worker with its own version
+    # store would: no version is bumped.
+    with app.app_context(), db.engine.begin() as conn:
+        return conn.execute(
+            insert(Company).values(name="Elsewhere", status="active")
+        ).inserted_primary_key[0]
+
+
+def test_known_ids_are_served_from_memory(app, vehicle_id, queries):
+    with app.app_context():
+        company_id = reference_data().first_id("companies")
+        assert reference_data().known_ids("companies", [company_id, None]) == {
+            company_id
+        }
+        vehicle_type_id = reference_data().first_id("vehicle_types")
+        assert reference_data().exists("vehicle_types", vehicle_type_id)
+    assert queries == []
+
+
+def test_unknown_id_reloads_once(app, queries):
+    with app.app_context():
+        assert reference_data().known_ids("companies", [999]) == set()
+    reloads = len(queries)
+    assert reloads > 0
+
+    queries.clear()
+    company_id = insert_company_elsewhere(app)
+    with app.app_context():
+        assert reference_data().exists("companies", company_id)
+    assert len(queries) == 1 + reloads  # the insert, then one reload
+
+
+def test_ids_written_by_another_worker_are_accepted(app, client):
+    with app.app_context():
+        reference_data().reload()
+    company_id = insert_company_elsewhere(app)
+    response = client.post(
+        "/api/drivers/bulk", json=[{"full_name": "D", "company_id": company_id}]
+    )
+    assert response.status_code == 201
+
+
+def test_committed_deletes_reload_through_versions(app):
+    with app.app_context():
+        company = Company(name="Closing", status="active")
+        db.session.add(company)
+        db.session.commit()
+        company_id = company.id
+        assert reference_data().exists("companies", company_id)
+
+        db.session.delete(company)
+        db.session.commit()
+        assert not reference_data().exists("companies", company_id)
+
+
+def test_health_status_codes_reload_on_unknown_code(app):
+    with app.app_context():
+        reference_data().reload()
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql(
+                "INSERT INTO driver_health_statuses (code) VALUES ('NEW')"
+            )
+        assert reference_data().health_status_id("NEW") is not None
+        assert reference_data().health_status_id("MISSING") is None
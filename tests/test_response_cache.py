@@ -0,0 +1,56 @@
+import pytest
+
+
+def stats(app) -> dict:
+    return app.extensions["response_cache"].stats.as_dict()
+
+
+def test_repeated_get_is_served_from_the_cache(app, client, vehicle_id):
+    first = client.get(f"/api/vehicles/{vehicle_id}")
+    second = client.get(f"/api/vehicles/{vehicle_id}")
+
+    assert second.get_data() == first.get_data()
+    assert second.headers["Content-Type"] == first.headers["Content-Type"]
+    assert stats(app)["hits"] == 1
+
+
+def test_write_makes_cached_entries_unreachable(app, client, vehicle_id):
+    url = f"/api/vehicles/{vehicle_id}/telemetry"
+    assert client.get(url).get_json() == []
+
+    client.post("/api/telemetry", json={"vehicle_id": vehicle_id, "speed_kmh": 5})
+
+    assert [r["speed_kmh"] for r in client.get(url).get_json()] == [5.0]
+    assert stats(app)["hits"] == 0
+
+
+@pytest.mark.parametrize("cache", ["shared", "memory"])
+def test_write_in_another_worker_invalidates(make_app, cache):
+    # Two apps on the same database and version store stand in for two
+    # workers; with a memory cache each keeps its own entries.
+    overrides = {} if cache == "shared" else {"RESPONSE_CACHE": "memory"}
+    worker_a = make_app(**overrides).test_client()
+    worker_b = make_app(**overrides).test_client()
+    vehicle_id = worker_a.post("/api/vehicles", json={"plate_number": "A"}).get_json()[
+        "id"
+    ]
+    url = f"/api/vehicles/{vehicle_id}/telemetry"
+    assert worker_b.get(url).get_json() == []
+
+    worker_a.post("/api/telemetry", json={"vehicle_id": vehicle_id, "speed_kmh": 7})
+
+    assert [r["speed_kmh"] for r in worker_b.get(url).get_json()] == [7.0]
+
+
+def test_apps_on_other_databases_do_not_share_entries(make_app, tmp_path):
+    # Both use the same response cache and version store files.
+    app_a = make_app().test_client()
+    app_b = make_app(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'other.db'}"
+    ).test_client()
+    app_a.post("/api/drivers", json={"full_name": "Only in A"})
+
+    assert [d["full_name"] for d in app_a.get("/api/drivers").get_json()] == [
+        "Only in A"
+    ]
+    assert app_b.get("/api/drivers").get_json() == []
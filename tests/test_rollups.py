@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from backend.app.extensions import db
+from backend.app.models import DriverHealthStatus, TelemetryHourlyRollup
+from backend.app.refdata import reference_data
+from backend.app.rollups import rebuild_rollups
+
+HOUR = datetime(2026, 3, 1, 10)
+COMPARED = (
+    "reading_count",
+    "speed_count",
+    "speed_sum",
+    "speed_min",
+    "speed_max",
+    "health_status_counts",
+    "last_timestamp",
+    "last_latitude",
+    "last_longitude",
+    "last_speed_kmh",
+)
+
+
+@pytest.fixture
+def status_ids(app):
+    with app.app_context():
+        statuses = [DriverHealthStatus(code="ok"), DriverHealthStatus(code="tired")]
+        db.session.add_all(statuses)
+        db.session.commit()
+        reference_data().reload()
+        return [status.id for status in statuses]
+
+
+def reading(vehicle_id, minute, speed=None, position=True, status_id=None):
+    payload = {
+        "vehicle_id": vehicle_id,
+        "timestamp": (HOUR + timedelta(minutes=minute)).isoformat(),
+        "speed_kmh": speed,
+        "driver_health_status_id": status_id,
+    }
+    if position:
+        payload["latitude"] = 55.0 + minute * 0.001
+        payload["longitude"] = 37.0 + minute * 0.001
+    return payload
+
+
+def rollups(app) -> list[dict]:
+    with app.app_context():
+        return [
+            {
+                name: getattr(row, name)
+                for name in ("vehicle_id", "hour_start", "distance_km") + COMPARED
+            }
+            for row in db.session.execute(
+                select(TelemetryHourlyRollup).order_by(
+                    TelemetryHourlyRollup.vehicle_id, TelemetryHourlyRollup.hour_start
+                )
+            ).scalars()
+        ]
+
+
+def rebuilt(app) -> list[dict]:
+    with app.app_context():
+        rebuild_rollups(HOUR - timedelta(days=1), HOUR + timedelta(days=1))
+    return rollups(app)
+
+
+def assert_same(got: dict, want: dict, names) -> None:
+    for name in names:
+        if isinstance(want[name], float):
+            assert got[name] == pytest.approx(want[name]), name
+        else:
+            assert got[name] == want[name], name
+
+
+def post_batches(client, batches):
+    for batch in batches:
+        response = client.post("/api/telemetry/batch", json=batch)
+        assert response.status_code == 201, response.get_json()
+
+
+def test_in_order_ingest_matches_a_rebuild(app, client, vehicle_id, status_ids):
+    post_batches(
+        client,
+        [
+            [reading(vehicle_id, 0, 10.0, status_id=status_ids[0])],
+            [
+                reading(vehicle_id, 5, 30.0, status_id=status_ids[1]),
+                reading(vehicle_id, 10, None, status_id=status_ids[0]),
+            ],
+            [reading(vehicle_id, 20, 5.0), reading(vehicle_id, 70, 50.0)],
+            [reading(vehicle_id, 30, 20.0, position=False)],
+        ],
+    )
+
+    incremental = rollups(app)
+    expected = rebuilt(app)
+    assert [r["hour_start"] for r in incremental] == [HOUR, HOUR + timedelta(hours=1)]
+    for got, want in zip(incremental, expected):
+        assert_same(got, want, COMPARED + ("distance_km",))
+    assert incremental[0]["reading_count"] == 5
+    assert incremental[0]["speed_min"] == 5.0
+    assert incremental[0]["speed_max"] == 30.0
+    assert incremental[0]["health_status_counts"] == {
+        str(status_ids[0]): 2,
+        str(status_ids[1]): 1,
+    }
+
+
+def test_late_readings_keep_counts_and_last_reading_exact(app, client, vehicle_id):
+    post_batches(
+        client,
+        [
+            [reading(vehicle_id, 40, 20.0)],
+            [reading(vehicle_id, 10, 80.0), reading(vehicle_id, 20, 1.0)],
+        ],
+    )
+
+    incremental = rollups(app)
+    expected = rebuilt(app)
+    assert_same(incremental[0], expected[0], COMPARED)
+    assert incremental[0]["last_speed_kmh"] == 20.0
+
+
+def test_ingest_does_not_touch_rollups_when_disabled(make_app):
+    app = make_app(TELEMETRY_ROLLUPS_ON_INGEST=False)
+    client = app.test_client()
+    vehicle_id = client.post("/api/vehicles", json={"plate_number": "T"}).get_json()[
+        "id"
+    ]
+    post_batches(client, [[reading(vehicle_id, 0, 10.0)]])
+    assert rollups(app) == []
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+
+@pytest.fixture
+def streaming(make_app):
+    app = make_app(STREAM_BATCH_SIZE=3)
+    client = app.test_client()
+    response = client.post(
+        "/api/drivers/bulk", json=[{"full_name": f"Driver {i}"} for i in range(7)]
+    )
+    assert response.status_code == 201
+    return client
+
+
+def chunks(client, url: str) -> list[str]:
+    response = client.get(url, buffered=False)
+    assert response.is_streamed
+    assert response.mimetype == "application/json"
+    assert "X-Next-Cursor" not in response.headers
+    try:
+        return [chunk.decode() for chunk in response.response]
+    finally:
+        response.close()
+
+
+def test_whole_table_is_streamed_in_batches(streaming):
+    parts = chunks(streaming, "/api/drivers?all=true")
+    rows = [json.loads(f"[{part.lstrip(',')}]") for part in parts[1:-1]]
+    assert [len(batch) for batch in rows] == [3, 3, 1]
+    assert (parts[0], parts[-1]) == ("[", "]\n")
+
+
+def test_streamed_rows_match_the_pages(streaming):
+    streamed = json.loads("".join(chunks(streaming, "/api/drivers?all=1")))
+    paged = streaming.get("/api/drivers", query_string={"limit": 100}).get_json()
+    assert streamed == paged
+    assert [d["full_name"] for d in streamed] == [f"Driver {i}" for i in range(7)]
+
+
+def test_empty_table_streams_an_empty_array(streaming):
+    assert "".join(chunks(streaming, "/api/vehicles?all=yes")) == "[]\n"
+
+
+def test_vehicles_stream_like_their_pages(streaming, vehicle_id):
+    streamed = json.loads("".join(chunks(streaming, "/api/vehicles?all=true")))
+    assert streamed == streaming.get("/api/vehicles").get_json()
+    assert [v["id"] for v in streamed] == [vehicle_id]
+
+
+def test_other_values_keep_pagination(streaming):
+    response = streaming.get("/api/drivers", query_string={"all": "no", "limit": 5})
+    assert len(response.get_json()) == 5
+    assert "X-Next-Cursor" in response.headers
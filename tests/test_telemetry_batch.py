@@ -0,0 +1,100 @@
+import pytest
+
+from backend.app.models import TelematicsReading
+
+URL = "/api/telemetry/batch"
+
+
+def stored(app) -> list[tuple]:
+    with app.app_context():
+        return [
+            (r.id, r.timestamp.isoformat(), r.speed_kmh)
+            for r in TelematicsReading.query.order_by(TelematicsReading.id)
+        ]
+
+
+def test_all_readings_created_with_their_ids(app, client, vehicle_id):
+    response = client.post(
+        URL,
+        json=[
+            {
+                "vehicle_id": vehicle_id,
+                "timestamp": "2026-01-01T08:00:00Z",
+                "speed_kmh": 10,
+            },
+            {
+                "vehicle_id": vehicle_id,
+                "timestamp": "2026-01-01T10:00:00+02:00",
+                "speed_kmh": 20.5,
+            },
+        ],
+    )
+    assert response.status_code == 201
+    assert response.get_json() == {
+        "accepted": 2,
+        "rejected": 0,
+        "results": [
+            {"index": 0, "status": "created", "id": 1},
+            {"index": 1, "status": "created", "id": 2},
+        ],
+    }
+    # Timestamps are stored as naive UTC.
+    assert stored(app) == [
+        (1, "2026-01-01T08:00:00", 10.0),
+        (2, "2026-01-01T08:00:00", 20.5),
+    ]
+
+
+def test_invalid_readings_do_not_stop_the_others(app, client, vehicle_id):
+    response = client.post(
+        URL,
+        json=[
+            {"vehicle_id": vehicle_id, "speed_kmh": 1.0},
+            "not an object",
+            {"speed_kmh": 2.0},
+            {"vehicle_id": vehicle_id, "speed_kmh": "fast"},
+            {"vehicle_id": vehicle_id, "timestamp": "yesterday"},
+            {"vehicle_id": 999},
+            {"vehicle_id": vehicle_id, "driver_id": 999},
+            {"vehicle_id": vehicle_id, "speed_kmh": 3.0},
+        ],
+    )
+    assert response.status_code == 207
+    data = response.get_json()
+    assert (data["accepted"], data["rejected"]) == (2, 6)
+    assert [r["status"] for r in data["results"]] == [
+        "created",
+        *["rejected"] * 6,
+        "created",
+    ]
+    assert [r["message"] for r in data["results"][1:7]] == [
+        "reading must be an object",
+        "vehicle_id is required",
+        "speed_kmh must be a number",
+        "timestamp must be an ISO 8601 string",
+        "unknown vehicle_id 999",
+        "unknown driver_id 999",
+    ]
+    assert [speed for _, _, speed in stored(app)] == [1.0, 3.0]
+
+
+def test_nothing_accepted_is_a_bad_request(app, client):
+    response = client.post(URL, json=[{"vehicle_id": 999}])
+    assert response.status_code == 400
+    assert response.get_json()["rejected"] == 1
+    assert stored(app) == []
+
+
+@pytest.mark.parametrize(
+    "body, status, message",
+    [
+        ({"vehicle_id": 1}, 400, "body must be an array of readings"),
+        ([{}] * 3, 413, "at most 2 readings per request"),
+    ],
+)
+def test_unusable_batches_are_refused_whole(make_app, body, status, message):
+    app = make_app(TELEMETRY_BATCH_MAX_ITEMS=2)
+    response = app.test_client().post(URL, json=body)
+    assert response.status_code == status
+    assert response.get_json() == {"message": message}
+    assert stored(app) == []
@@ -0,0 +1,170 @@
+"""
+Compare the sync (gunicorn, Flask) and async (uvicorn, asgi.py) telemetry
+ingest paths under many concurrent vehicle connections.
+
+    python tools/bench_async_ingest.py [--connections 1000] [--requests 20]
+
+Both servers are started with one worker process against the same
+throwaway SQLite database (or DATABASE_URI if set, e.g. a MySQL test
+instance). Each connection keeps its socket open and sends POST
+/api/telemetry requests back to back.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+async def exchange(reader, writer, request) -> bytes:
+    """Send one request and read the response; returns the status line."""
+    writer.write(request)
+    status_line = await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status_line
+
+
+async def vehicle(host, port, vehicle_id, requests, timeout, latencies, errors):
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError:
+        errors.append("connect")
+        return
+    body = (
+        b'{"vehicle_id":%d,"speed_kmh":42.5,"latitude":55.75,"longitude":37.61}'
+        % vehicle_id
+    )
+    request = (
+        b"POST /api/telemetry HTTP/1.1\r\nHost: bench\r\n"
+        b"Content-Type: application/json\r\nContent-Length: %d\r\n\r\n%s"
+        % (len(body), body)
+    )
+    try:
+        for _ in range(requests):
+            started = time.perf_counter()
+            status_line = await asyncio.wait_for(
+                exchange(reader, writer, request), timeout
+            )
+            latencies.append(time.perf_counter() - started)
+            if b" 201 " not in status_line:
+                errors.append(status_line.decode().strip())
+    except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError) as exc:
+        errors.append(type(exc).__name__)
+    finally:
+        writer.close()
+
+
+async def load(port, connections, requests, timeout):
+    latencies, errors = [], []
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(
+            vehicle("127.0.0.1", port, 1, requests, timeout, latencies, errors)
+            for _ in range(connections)
+        )
+    )
+    return time.perf_counter() - started, latencies, errors
+
+
+def wait_until_up(port, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1).read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def report(name, elapsed, latencies, errors):
+    if not latencies:
+        print(f"{name:<6} no successful requests, errors {len(errors)}")
+        return
+    latencies.sort()
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+    print(
+        f"{name:<6} {len(latencies) / elapsed:8.0f} req/s  "
+        f"p50 {pct(0.5) * 1000:7.1f} ms  p99 {pct(0.99) * 1000:7.1f} ms  "
+        f"mean {statistics.mean(latencies) * 1000:7.1f} ms  errors {len(errors)}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--connections", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--port", type=int, default=8901)
+    parser.add_argument(
+        "--timeout", type=float, default=30.0, help="seconds per request"
+    )
+    args = parser.parse_args()
+
+    database = os.path.join(tempfile.mkdtemp(), "bench.db")
+    env = {
+        **os.environ,
+        "SQLALCHEMY_DATABASE_URI": os.getenv("DATABASE_URI", f"sqlite:///{database}"),
+        "DB_BOOTSTRAP_ON_STARTUP": "true",
+        "DOCS_ENABLED": "false",
+        # Measure the request path itself, not the hourly rollup refresh.
+        "TELEMETRY_ROLLUPS_ON_INGEST": "false",
+        "RESPONSE_CACHE": "none",
+        "WEB_CONCURRENCY": "1",
+        "GUNICORN_ACCESS_LOG": "/dev/null",
+    }
+    servers = {
+        "sync": [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"]
+        + ["--bind", f"127.0.0.1:{args.port}", "--backlog", "4096", "wsgi:app"],
+        "async": [sys.executable, "-m", "uvicorn", "asgi:app", "--no-access-log"]
+        + ["--host", "127.0.0.1", "--port", str(args.port), "--backlog", "4096"],
+    }
+
+    print(f"{args.connections} connections x {args.requests} requests")
+    for name, command in servers.items():
+        server = subprocess.Popen(
+            command,
+            cwd=ROOT,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_until_up(args.port)
+            urllib.request.urlopen(
+                urllib.request.Request(
+                    f"http://127.0.0.1:{args.port}/api/vehicles",
+                    data=b'{"plate_number":"BENCH-%s"}' % name.encode(),
+                    headers={"Content-Type": "application/json"},
+                )
+            ).read()
+            elapsed, latencies, errors = asyncio.run(
+                load(args.port, args.connections, args.requests, args.timeout)
+            )
+            report(name, elapsed, latencies, errors)
+            for error in sorted(set(errors))[:5]:
+                print(f"       {errors.count(error)} x {error}")
+        finally:
+            server.terminate()
+            server.wait(30)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Compare loading telemetry rows as ORM instances with selecting only the
+columns the list endpoints return.
+
+    python tools/bench_projection.py [ROWS]
+
+Runs against a throwaway SQLite database. raw_payload is filled with a
+realistic blob; it is stored in telematics_reading_payloads, so neither
+way of loading rows reads it.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.app import create_app  # noqa: E402
+from backend.app.config import Config  # noqa: E402
+from backend.app.extensions import db  # noqa: E402
+from backend.app.models import (  # noqa: E402
+    Company,
+    TelematicsReading,
+    Vehicle,
+    VehicleType,
+)
+from backend.app.payloads import bulk_insert_readings  # noqa: E402
+from backend.app.routes import READING_COLUMNS  # noqa: E402
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+RAW_PAYLOAD = '{"can": "' + "0" * 400 + '"}'
+
+
+def orm_rows():
+    return [
+        {
+            "id": r.id,
+            "timestamp": r.timestamp.isoformat(),
+            "latitude": r.latitude,
+            "longitude": r.longitude,
+            "speed_kmh": r.speed_kmh,
+        }
+        for r in TelematicsReading.query.order_by(TelematicsReading.id).all()
+    ]
+
+
+def projected_rows():
+    query = db.session.query(*READING_COLUMNS).order_by(TelematicsReading.id)
+    return [
+        {
+            "id": r.id,
+            "timestamp": r.timestamp.isoformat(),
+            "latitude": r.latitude,
+            "longitude": r.longitude,
+            "speed_kmh": r.speed_kmh,
+        }
+        for r in query.all()
+    ]
+
+
+def measure(name, load):
+    db.session.expunge_all()
+    tracemalloc.start()
+    started = time.perf_counter()
+    rows = load()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    per_row_us = elapsed / len(rows) * 1e6
+    print(
+        f"{name:<10} {elapsed:8.3f} s  {per_row_us:7.2f} us/row  "
+        f"peak {peak / 2**20:8.1f} MiB  {peak / len(rows):7.0f} B/row"
+    )
+
+
+def main():
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+        DB_BOOTSTRAP_ON_STARTUP = True
+        DOCS_ENABLED = False
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        vehicle = Vehicle(
+            company=Company.query.first(),
+            vehicle_type=VehicleType(name="Bench truck"),
+            plate_number="BENCH-1",
+        )
+        db.session.add(vehicle)
+        db.session.flush()
+        start = datetime(2025, 1, 1)
+        bulk_insert_readings(
+            [
+                {
+                    "vehicle_id": vehicle.id,
+                    "timestamp": start + timedelta(seconds=i),
+                    "latitude": 55.0 + i * 1e-6,
+                    "longitude": 37.0 + i * 1e-6,
+                    "speed_kmh": float(i % 60),
+                    "raw_payload": RAW_PAYLOAD,
+                }
+                for i in range(ROWS)
+            ],
+        )
+        db.session.commit()
+
+        print(f"{ROWS} readings")
+        for name, load in (("orm", orm_rows), ("projected", projected_rows)):
+            load()  # warm the statement cache
+            measure(name, load)
+
+
+if __name__ == "__main__":
+    main()
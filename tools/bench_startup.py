@@ -0,0 +1,91 @@
+"""
+Measure cold-start time: importing the app package, create_app and the
+first request, each in a fresh interpreter, with and without the API docs.
+
+    python tools/bench_startup.py [--runs 5]
+
+Uses a throwaway SQLite database (or DATABASE_URI if set) bootstrapped
+once with `flask init-db`, the way a deployment does. Times are medians;
+create_app and the first request are compared with STARTUP_BUDGET_MS and
+FIRST_REQUEST_BUDGET_MS.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, time
+started = time.perf_counter()
+from backend.app import create_app
+imported = time.perf_counter()
+app = create_app()
+report = app.extensions["startup"].report()
+app.test_client().get("/api/vehicles")
+report = app.extensions["startup"].report()
+report["import_ms"] = (imported - started) * 1000
+print(json.dumps(report))
+"""
+
+
+def probe(env) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    database = os.path.join(tempfile.mkdtemp(), "startup.db")
+    env = {
+        **os.environ,
+        "SQLALCHEMY_DATABASE_URI": os.getenv("DATABASE_URI", f"sqlite:///{database}"),
+    }
+    subprocess.run(
+        [sys.executable, "-m", "flask", "--app", "wsgi", "init-db"],
+        cwd=ROOT,
+        env=env,
+        check=True,
+        capture_output=True,
+    )
+
+    print(f"{'':<10} {'import':>9} {'create_app':>11} {'first req':>10}  phases")
+    for name, docs in (("docs", "true"), ("no docs", "false")):
+        reports = [probe({**env, "DOCS_ENABLED": docs}) for _ in range(args.runs)]
+
+        def median(key):
+            return statistics.median(r[key] for r in reports)
+
+        phases = {
+            phase: statistics.median(r["phases_ms"].get(phase, 0) for r in reports)
+            for phase in reports[0]["phases_ms"]
+        }
+        budget = reports[0]
+        print(
+            f"{name:<10} {median('import_ms'):7.1f}ms {median('create_app_ms'):9.1f}ms"
+            f" {median('first_request_ms'):8.1f}ms  "
+            + ", ".join(f"{phase} {ms:.1f}ms" for phase, ms in phases.items())
+        )
+    print(
+        f"budgets: create_app {budget['create_app_budget_ms']:.0f}ms, "
+        f"first request {budget['first_request_budget_ms']:.0f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Freeze the OpenAPI spec that flasgger builds from the route docstrings into
+backend/app/openapi.json (OPENAPI_SPEC_FILE), which the app then serves.
+
+    python tools/build_openapi.py           # write the frozen spec
+    python tools/build_openapi.py --check   # exit 1 if it is out of date
+
+Run it after changing a route docstring; the Docker build runs --check.
+"""
+
+import argparse
+import difflib
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.app import create_app  # noqa: E402
+from backend.app.config import Config  # noqa: E402
+from backend.app.docs import render_spec, runtime_spec  # noqa: E402
+
+
+class BuildConfig(Config):
+    SQLALCHEMY_DATABASE_URI = "sqlite://"
+    POSITION_CACHE_WARM_ON_STARTUP = False
+    DOCS_ENABLED = True
+    OPENAPI_FROZEN = False
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--check", action="store_true", help="fail if the frozen spec is stale"
+    )
+    args = parser.parse_args()
+
+    app = create_app(BuildConfig)
+    spec = render_spec(runtime_spec(app))
+    path = app.config["OPENAPI_SPEC_FILE"]
+    try:
+        with open(path, encoding="utf-8") as fh:
+            frozen = fh.read()
+    except FileNotFoundError:
+        frozen = ""
+
+    if frozen == spec:
+        print(f"{path} is up to date.")
+        return
+    if args.check:
+        sys.stdout.writelines(
+            difflib.unified_diff(
+                frozen.splitlines(keepends=True),
+                spec.splitlines(keepends=True),
+                fromfile=f"{path} (frozen)",
+                tofile="route docstrings",
+            )
+        )
+        print(f"\n{path} is out of date; run python tools/build_openapi.py")
+        sys.exit(1)
+
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write(spec)
+    print(f"Wrote {path}.")
+
+
+if __name__ == "__main__":
+    main()